@@ -0,0 +1,406 @@
+"""
+================================================================================
+SUITE DE BENCHMARKS : INGESTION, REQUÊTES, LANDMARKS, INFÉRENCE
+================================================================================
+Fonctionne entièrement hors ligne: la base est un fichier SQLite (ou DuckDB)
+temporaire remplie avec des données WLASL synthétiques (synthetic_wlasl.py).
+
+Mesures:
+  - WLASLDatabaseManager.insert_words_and_videos
+  - chaque requête de DatabaseQueryHelper
+  - landmark_dataset.fetch_landmark_sequences
+  - débit de model.predict (ignoré si TensorFlow n'est pas installé)
+  - débit et mémoire des blocs Transformer full / local / linear sur des
+    séquences longues (--attention)
+
+Les résultats sont écrits en JSON (un fichier par commit) pour comparer les
+régressions d'un commit à l'autre:
+
+    python benchmark_suite.py --scale 1 10
+    python benchmark_suite.py --scale 1 --compare benchmark_results/bench_<commit>.json
+    python benchmark_suite.py --scale 1 --attention 30 64 128 256
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from db_backend import get_backend
+from synthetic_wlasl import NUM_GLOSSES, generate_wlasl_data, insert_synthetic_landmarks
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _measure(func, repeat=1):
+    """Exécuter func `repeat` fois (sortie standard masquée) et retourner la médiane en secondes"""
+    durations = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def _rss_bytes():
+    """Mémoire résidente actuelle du processus (Linux: /proc/self/statm)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # Repli: pic depuis le démarrage (ko sous Linux, octets sous macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _PeakRSS:
+    """
+    Pic de mémoire résidente pendant un bloc, relevé par un thread toutes les
+    `interval` secondes; `delta` = pic - mémoire au début du bloc
+
+    tracemalloc ne voit pas les allocations de TensorFlow (allocateur C++),
+    d'où l'échantillonnage du RSS.
+    """
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.delta = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self._peak = max(self._peak, _rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._baseline = self._peak = _rss_bytes()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.delta = max(self._peak, _rss_bytes()) - self._baseline
+        return False
+
+
+def attention_state_bytes(attention_type, batch, heads, length, head_dim, window_size):
+    """
+    Estimation de la taille de l'état d'attention d'un bloc (float32):
+    matrice des scores pour full (T x T) et local (T x 3w), état kv
+    (d x d par tête) et normaliseur (d par tête) pour linear
+    """
+    if attention_type == "full":
+        values = heads * length * length
+    elif attention_type == "local":
+        values = heads * length * 3 * window_size
+    else:
+        values = heads * (head_dim * head_dim + head_dim)
+    return 4 * batch * values
+
+
+class BenchmarkSuite:
+    def __init__(self, backend_name="sqlite", repeat=3, landmark_videos=500,
+                 frames_per_video=40, predict_batch=64, predict_batches=10, work_dir=None):
+        """
+        Initialiser la suite
+
+        Args:
+            backend_name: Backend embarqué servant de base locale ('sqlite' ou 'duckdb')
+            repeat: Nombre de répétitions par requête (médiane retenue)
+            landmark_videos: Nombre de vidéos recevant des landmarks synthétiques
+            frames_per_video: Nombre de frames synthétiques par vidéo
+            predict_batch: Taille de batch pour model.predict
+            predict_batches: Nombre de batches mesurés pour model.predict
+            work_dir: Dossier des bases temporaires (par défaut un dossier temporaire)
+        """
+        self.backend_name = backend_name
+        self.repeat = repeat
+        self.landmark_videos = landmark_videos
+        self.frames_per_video = frames_per_video
+        self.predict_batch = predict_batch
+        self.predict_batches = predict_batches
+        self.work_dir = work_dir
+        self.results = {}
+
+    def record(self, name, seconds, items=None):
+        entry = {"seconds": round(seconds, 6)}
+        if items is not None:
+            entry["items"] = items
+            entry["items_per_sec"] = round(items / seconds, 2) if seconds > 0 else None
+        self.results[name] = entry
+        rate = f"  ({entry['items_per_sec']} /s)" if items is not None else ""
+        print(f"   {name:<48}{seconds * 1000:>12.2f} ms{rate}")
+
+    # ------------------------------------------------------------------
+    # Base de données
+    # ------------------------------------------------------------------
+
+    def run_database(self, scale, directory):
+        """Ingestion, requêtes et chargement des landmarks à une échelle donnée"""
+        from database_queries import DatabaseQueryHelper
+        from landmark_dataset import fetch_landmark_sequences
+        from populate_database import WLASLDatabaseManager
+
+        prefix = f"x{scale:g}"
+        extension = "duckdb" if self.backend_name == "duckdb" else "db"
+        backend = get_backend(self.backend_name, path=os.path.join(directory, f"bench_{prefix}.{extension}"))
+
+        connection = backend.connect()
+        backend.create_schema(connection)
+        backend.close(connection)
+
+        print(f"\n📦 Échelle {prefix} ({int(NUM_GLOSSES * scale)} mots)")
+        data = generate_wlasl_data(scale)
+        num_videos = sum(len(entry["instances"]) for entry in data)
+
+        manager = WLASLDatabaseManager(backend=backend)
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager.connect()
+        seconds = _measure(lambda: manager.insert_words_and_videos(data))
+        self.record(f"{prefix}.insert_words_and_videos", seconds, num_videos)
+
+        helper = DatabaseQueryHelper(backend=backend)
+        helper.cursor.execute("SELECT id FROM videos ORDER BY id LIMIT 1")
+        first_video = helper.cursor.fetchone()[0]
+        gloss = data[0]["gloss"]
+
+        queries = {
+            "show_sample_words": lambda: helper.show_sample_words(10),
+            "show_videos_for_word": lambda: helper.show_videos_for_word(gloss, limit=5),
+            "show_download_statistics": helper.show_download_statistics,
+            "show_split_distribution": helper.show_split_distribution,
+            "show_database_stats": helper.show_database_stats,
+            "get_videos_to_download": lambda: helper.get_videos_to_download(20),
+            "get_word_id_by_gloss": lambda: helper.get_word_id_by_gloss(gloss),
+            "mark_video_downloaded": lambda: helper.mark_video_downloaded(first_video, "/tmp/bench.mp4"),
+        }
+        for name, query in queries.items():
+            self.record(f"{prefix}.query.{name}", _measure(query, self.repeat))
+
+        # Landmarks synthétiques puis lecture en masse
+        helper.cursor.execute("SELECT id FROM videos ORDER BY id LIMIT %s", (self.landmark_videos,))
+        video_ids = [row[0] for row in helper.cursor.fetchall()]
+        start = time.perf_counter()
+        insert_synthetic_landmarks(helper.connection, helper.cursor, video_ids, self.frames_per_video)
+        self.record(f"{prefix}.insert_landmarks", time.perf_counter() - start,
+                    len(video_ids) * self.frames_per_video)
+
+        seconds = _measure(lambda: fetch_landmark_sequences(helper.cursor, video_ids), self.repeat)
+        self.record(f"{prefix}.fetch_landmark_sequences", seconds, len(video_ids))
+
+        helper.close()
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager.close()
+
+    # ------------------------------------------------------------------
+    # Modèle
+    # ------------------------------------------------------------------
+
+    def run_model(self):
+        """Débit de model.predict sur des séquences synthétiques"""
+        print(f"\n🧠 Inférence")
+        from model import build_asl_model
+        from synthetic_wlasl import generate_landmark_sequences
+
+        try:
+            model = build_asl_model(num_classes=NUM_GLOSSES)
+        except ImportError as e:
+            print(f"   ⚠️  Ignoré: {e}")
+            self.results["model.predict"] = {"skipped": str(e)}
+            return
+
+        samples = generate_landmark_sequences(self.predict_batch * self.predict_batches)
+        model.predict(samples[:self.predict_batch], batch_size=self.predict_batch, verbose=0)
+
+        start = time.perf_counter()
+        model.predict(samples, batch_size=self.predict_batch, verbose=0)
+        self.record("model.predict", time.perf_counter() - start, len(samples))
+
+    def run_attention(self, lengths=(30, 64, 128, 256), num_blocks=4, window_size=16):
+        """
+        Débit et mémoire d'une pile de TransformerBlock par type d'attention
+
+        La mémoire mesurée est le pic GPU (tf.config.experimental) ou, sans
+        GPU, le pic de RSS au-dessus de la mémoire d'avant la passe
+        (peak_bytes). L'estimation analytique de l'état d'attention d'un
+        bloc est ajoutée à part (estimated_attention_bytes).
+        """
+        print(f"\n🔭 Attention ({num_blocks} blocs, fenêtre {window_size})")
+        try:
+            import tensorflow as tf
+        except ImportError as e:
+            print(f"   ⚠️  Ignoré: {e}")
+            self.results["attention"] = {"skipped": str(e)}
+            return
+
+        from model import DEFAULT_MODEL_CONFIG
+        from model_layers import ATTENTION_TYPES, TransformerBlock
+
+        dim = DEFAULT_MODEL_CONFIG["transformer_dim"]
+        heads = DEFAULT_MODEL_CONFIG["transformer_heads"]
+        gpus = tf.config.list_physical_devices("GPU")
+
+        for length in lengths:
+            inputs = tf.random.normal((self.predict_batch, length, dim))
+            for attention_type in ATTENTION_TYPES:
+                blocks = [
+                    TransformerBlock(dim, heads, DEFAULT_MODEL_CONFIG["ff_dim"],
+                                     attention_type=attention_type, window_size=window_size)
+                    for _ in range(num_blocks)
+                ]
+
+                @tf.function
+                def forward(x):
+                    for block in blocks:
+                        x = block(x)
+                    return x
+
+                forward(inputs)  # trace + build
+                if gpus:
+                    tf.config.experimental.reset_memory_stats("GPU:0")
+
+                with _PeakRSS() as rss:
+                    start = time.perf_counter()
+                    for _ in range(self.predict_batches):
+                        forward(inputs).numpy()
+                    elapsed = time.perf_counter() - start
+                name = f"attention.{attention_type}.T{length}"
+                self.record(name, elapsed, self.predict_batch * self.predict_batches)
+
+                if gpus:
+                    self.results[name]["peak_bytes"] = tf.config.experimental.get_memory_info("GPU:0")["peak"]
+                    self.results[name]["memory_source"] = "gpu_peak"
+                else:
+                    self.results[name]["peak_bytes"] = rss.delta
+                    self.results[name]["memory_source"] = "rss_delta"
+                self.results[name]["estimated_attention_bytes"] = attention_state_bytes(
+                    attention_type, self.predict_batch, heads, length, dim // heads, window_size
+                )
+
+    # ------------------------------------------------------------------
+    # Orchestration
+    # ------------------------------------------------------------------
+
+    def run(self, scales=(1,), include_model=True, attention_lengths=None):
+        """
+        Exécuter tous les benchmarks
+
+        Returns:
+            Dictionnaire {"meta": ..., "results": {nom: mesure}}
+        """
+        print("=" * 70)
+        print("  BENCHMARKS ASL")
+        print("=" * 70)
+
+        with tempfile.TemporaryDirectory(prefix="asl_bench_", dir=self.work_dir) as directory:
+            for scale in scales:
+                self.run_database(scale, directory)
+
+        if include_model:
+            self.run_model()
+        if attention_lengths:
+            self.run_attention(attention_lengths)
+
+        return {
+            "meta": {
+                "commit": _git_commit(),
+                "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "backend": self.backend_name,
+                "scales": list(scales),
+                "repeat": self.repeat,
+            },
+            "results": self.results,
+        }
+
+
+def compare_results(current, baseline, threshold=0.10):
+    """
+    Comparer deux fichiers de résultats
+
+    Args:
+        current: Résultats du commit courant
+        baseline: Résultats de référence
+        threshold: Ralentissement relatif toléré (0.10 = +10%)
+
+    Returns:
+        Liste des noms de benchmarks en régression
+    """
+    print(f"\n📈 COMPARAISON avec {baseline['meta'].get('commit')} (seuil +{threshold:.0%})")
+    print("-" * 70)
+    regressions = []
+    for name, entry in current["results"].items():
+        reference = baseline["results"].get(name)
+        if not reference or "seconds" not in entry or "seconds" not in reference:
+            continue
+        ratio = entry["seconds"] / reference["seconds"] if reference["seconds"] > 0 else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "⚠️  régression"
+        print(f"   {name:<48}{ratio:>8.2f}x  {flag}")
+    return regressions
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne du projet ASL")
+    parser.add_argument("--scale", type=float, nargs="+", default=[1], help="Échelles (1, 10, 100)")
+    parser.add_argument("--backend", choices=["sqlite", "duckdb"], default="sqlite")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--landmark-videos", type=int, default=500)
+    parser.add_argument("--no-model", action="store_true", help="Ne pas mesurer model.predict")
+    parser.add_argument("--attention", type=int, nargs="*", metavar="T",
+                        help="Mesurer les types d'attention sur ces longueurs de séquence (défaut 30 64 128 256)")
+    parser.add_argument("--output", help="Fichier JSON (par défaut benchmark_results/bench_<commit>.json)")
+    parser.add_argument("--compare", help="Fichier JSON de référence")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    suite = BenchmarkSuite(
+        backend_name=args.backend,
+        repeat=args.repeat,
+        landmark_videos=args.landmark_videos
+    )
+    attention_lengths = None
+    if args.attention is not None:
+        attention_lengths = args.attention or [30, 64, 128, 256]
+    report = suite.run(scales=args.scale, include_model=not args.no_model,
+                       attention_lengths=attention_lengths)
+
+    output = args.output or os.path.join("benchmark_results", f"bench_{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Résultats écrits dans: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare_results(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+ASL Sign Language Recognition - Class-balanced, signer-stratified sampling
+Person 4 - Model Architecture
+
+WLASL is heavily skewed: a few glosses have dozens of clips, most have a
+handful, so uniformly shuffled batches are dominated by the frequent
+glosses. ClassBalancedSampler draws training rows in two O(1) steps:
+
+  1. a class, from a Vose alias table over class weights
+     (count ** alpha: alpha=0 is fully balanced, alpha=1 the natural skew)
+  2. a signer among the signers of that class (uniform), then a clip of
+     that signer (uniform), so one prolific signer cannot dominate a class
+
+Everything is precomputed from the videos table once (per split and class
+subset) into flat index arrays; drawing a batch is a handful of vectorized
+NumPy ops and no database query is made during training. make_tf_dataset()
+feeds the sampled rows of the memory-mapped landmark cache (see
+hyperparameter_sweep.prepare_dataset) into a tf.data pipeline.
+
+Usage:
+    sampler = ClassBalancedSampler(labels, signers, alpha=0.0, seed=0)
+    dataset = make_tf_dataset(x_train, y_train, sampler, num_classes, batch_size=64)
+    model.fit(dataset, steps_per_epoch=sampler.steps_per_epoch(64), epochs=10)
+"""
+
+import numpy as np
+
+
+# =============================================================================
+# ALIAS TABLE
+# =============================================================================
+
+class AliasTable:
+    """
+    Vose's alias method: O(n) construction, O(1) per draw.
+
+    Draw i uniformly among n buckets, then keep i with probability prob[i],
+    otherwise take alias[i].
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0 or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("weights must be a non-empty 1-D array of non-negative values with a positive sum")
+
+        n = len(weights)
+        scaled = weights * n / weights.sum()
+        self.prob = np.ones(n, dtype=np.float64)
+        self.alias = np.arange(n, dtype=np.int64)
+
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding error (never let a zero weight through)
+        for i in small + large:
+            if weights[i] > 0:
+                self.prob[i] = 1.0
+            else:
+                self.prob[i] = 0.0
+                self.alias[i] = int(np.argmax(weights))
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng, size):
+        """Draw `size` bucket indices."""
+        buckets = rng.integers(0, len(self.prob), size)
+        keep = rng.random(size) < self.prob[buckets]
+        return np.where(keep, buckets, self.alias[buckets])
+
+
+# =============================================================================
+# SAMPLER
+# =============================================================================
+
+class ClassBalancedSampler:
+    """
+    Class-balanced, signer-stratified sampler over the rows of one split.
+
+    Rows are grouped by (class, signer) into one flat index array:
+    `order` lists the rows sorted by class then signer, `group_offsets`
+    delimits each (class, signer) group and `class_groups` the range of
+    groups of each class. Videos without a signer form their own group.
+    """
+
+    def __init__(self, labels, signers=None, num_classes=None, alpha=0.0, seed=0):
+        """
+        Args:
+            labels: Class id of each row (np.ndarray of int)
+            signers: Signer id of each row (None or negative: unknown)
+            num_classes: Number of classes (default: max label + 1)
+            alpha: Class weight exponent (0 = balanced, 1 = natural frequencies)
+            seed: Random seed
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        if signers is None:
+            signers = np.full(len(labels), -1, dtype=np.int64)
+        signers = np.asarray(signers, dtype=np.int64)
+        if len(labels) == 0:
+            raise ValueError("Cannot sample from an empty split")
+
+        self.num_classes = num_classes or int(labels.max()) + 1
+        self.num_rows = len(labels)
+        self.rng = np.random.default_rng(seed)
+
+        # Rows sorted by (class, signer), then one group per distinct pair
+        self.order = np.lexsort((signers, labels))
+        sorted_labels = labels[self.order]
+        sorted_signers = signers[self.order]
+        starts = np.flatnonzero(
+            np.r_[True, (sorted_labels[1:] != sorted_labels[:-1]) | (sorted_signers[1:] != sorted_signers[:-1])]
+        )
+        self.group_offsets = np.r_[starts, len(labels)].astype(np.int64)
+        self.group_sizes = np.diff(self.group_offsets)
+        group_labels = sorted_labels[starts]
+
+        # Range of groups of each class (empty range for absent classes)
+        self.class_groups = np.searchsorted(group_labels, np.arange(self.num_classes + 1)).astype(np.int64)
+        self.class_counts = np.bincount(labels, minlength=self.num_classes)
+        self.signers_per_class = np.diff(self.class_groups)
+
+        weights = np.where(self.class_counts > 0, self.class_counts.astype(np.float64) ** alpha, 0.0)
+        self.class_table = AliasTable(weights)
+
+    def sample(self, size):
+        """Draw `size` row indices (class, then signer, then clip)."""
+        classes = self.class_table.sample(self.rng, size)
+        groups = self.class_groups[classes] + (
+            self.rng.random(size) * self.signers_per_class[classes]
+        ).astype(np.int64)
+        clips = self.group_offsets[groups] + (self.rng.random(size) * self.group_sizes[groups]).astype(np.int64)
+        return self.order[clips]
+
+    def batches(self, batch_size):
+        """Yield batches of row indices forever."""
+        while True:
+            yield self.sample(batch_size)
+
+    def steps_per_epoch(self, batch_size):
+        """Steps that draw as many rows as the split contains."""
+        return max(1, -(-self.num_rows // batch_size))
+
+
+def fetch_video_signers(cursor, video_ids, chunk_size=1000):
+    """
+    signer_id of each video (-1 when unknown), in the order of video_ids.
+
+    One query per chunk; meant to be run once when the cache is built.
+    """
+    video_ids = [int(v) for v in video_ids]
+    signer_of = {}
+    for start in range(0, len(video_ids), chunk_size):
+        chunk = video_ids[start:start + chunk_size]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"SELECT id, signer_id FROM videos WHERE id IN ({placeholders})", tuple(chunk))
+        signer_of.update(cursor.fetchall())
+    return np.asarray(
+        [signer_of.get(v) if signer_of.get(v) is not None else -1 for v in video_ids], dtype=np.int64
+    )
+
+
+# =============================================================================
+# BATCHES
+# =============================================================================
+
+def make_tf_dataset(x, y, sampler, num_classes, batch_size=64, num_parallel_calls=4):
+    """
+    tf.data pipeline of sampled batches.
+
+    The index batches are drawn in Python (cheap); gathering rows from the
+    memory-mapped arrays runs in parallel map calls and is prefetched.
+
+    Args:
+        x: (N, num_frames, num_landmarks) array (np.load(..., mmap_mode="r"))
+        y: (N,) class ids
+        sampler: ClassBalancedSampler over y
+        num_classes: Number of classes (one-hot depth)
+        batch_size: Batch size
+        num_parallel_calls: Parallel gathers
+
+    Returns:
+        tf.data.Dataset of (inputs, one-hot labels), infinite
+    """
+    import tensorflow as tf
+
+    def gather(index):
+        index = np.sort(index)
+        return np.asarray(x[index], dtype=np.float32), np.asarray(y[index], dtype=np.int32)
+
+    def load(index):
+        inputs, labels = tf.numpy_function(gather, [index], (tf.float32, tf.int32))
+        inputs.set_shape([None] + list(x.shape[1:]))
+        labels.set_shape([None])
+        return inputs, tf.one_hot(labels, num_classes)
+
+    indices = tf.data.Dataset.from_generator(
+        lambda: sampler.batches(batch_size),
+        output_signature=tf.TensorSpec([batch_size], tf.int64)
+    )
+    return indices.map(load, num_parallel_calls=num_parallel_calls).prefetch(tf.data.AUTOTUNE)
@@ -1,42 +1,90 @@
 """
 Script pour créer automatiquement la base de données et le schéma
 Fonctionne sur Windows/PowerShell sans problème
+
+Avec ASL_DB_BACKEND=sqlite (ou duckdb), la base est un simple fichier local:
+aucun serveur MySQL ni mot de passe n'est nécessaire.
 """
 
-import mysql.connector
-from mysql.connector import Error
 import os
+import sys
 
-def create_database_and_schema():
-    """Créer la base de données et exécuter le schéma SQL"""
+from db_backend import get_backend, parse_sql_commands
+
+
+def load_schema_sections(schema_file):
+    """
+    Lire schema.sql et le séparer en sections
+    
+    Returns:
+        Tuple (commandes tables/vues, procédures stockées)
+    """
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        sql_content = f.read()
     
-    def _parse_sql_commands(sql_text):
-        """Parser les commandes SQL en ignorant les commentaires"""
-        commands = []
-        current_command = []
+    # 1. Tables et vues (avant DELIMITER)
+    # 2. Procédures stockées (entre DELIMITER // et DELIMITER ;)
+    parts = sql_content.split('DELIMITER //')
+    commands = parse_sql_commands(parts[0]) if parts[0] else []
+    
+    procedures = []
+    if len(parts) > 1:
+        procedure_section = parts[1].split('DELIMITER ;')[0]
+        
+        # Séparer les procédures par '//'
+        procedures = [
+            p.strip() for p in procedure_section.split('//')
+            if p.strip() and ('CREATE PROCEDURE' in p.upper() or 'CREATE FUNCTION' in p.upper())
+        ]
+    
+    return commands, procedures
+
+
+def create_embedded_database(backend):
+    """Créer le schéma dans un backend embarqué (SQLite ou DuckDB)"""
+    print("=" * 70)
+    print("  CRÉATION AUTOMATIQUE DE LA BASE DE DONNÉES")
+    print("=" * 70)
+    print(f"\nBackend: {backend.describe()}")
+    
+    try:
+        connection = backend.connect()
+        backend.create_schema(connection)
+        cursor = backend.cursor(connection)
+        
+        print("\n📊 Tables créées:")
+        for table in backend.list_tables(cursor):
+            print(f"   ✅ {table}")
+        
+        print("\n👁️  Vues créées:")
+        for view in backend.list_views(cursor):
+            print(f"   ✅ {view}")
         
-        for line in sql_text.split('\n'):
-            # Ignorer les commentaires
-            if line.strip().startswith('--') or line.strip().startswith('#'):
-                continue
-            
-            # Ignorer les lignes vides
-            if not line.strip():
-                continue
-            
-            # Ignorer DELIMITER, USE, SHOW
-            if any(line.strip().upper().startswith(x) for x in ['DELIMITER', 'USE ', 'SHOW ']):
-                continue
-            
-            current_command.append(line)
-            
-            # Si la ligne se termine par ';', c'est la fin de la commande
-            if line.strip().endswith(';'):
-                command = '\n'.join(current_command)
-                commands.append(command)
-                current_command = []
+        backend.close(connection, cursor)
         
-        return commands
+        print("\n" + "=" * 70)
+        print("✅ BASE DE DONNÉES CRÉÉE AVEC SUCCÈS!")
+        print("=" * 70)
+        return True
+    
+    except backend.Error as e:
+        print(f"\n❌ ERREUR: {e}")
+        return False
+    
+    except FileNotFoundError:
+        print(f"\n❌ Fichier {backend.schema_file} non trouvé!")
+        return False
+
+
+def create_database_and_schema(backend_name=None):
+    """Créer la base de données et exécuter le schéma SQL"""
+    
+    backend_name = (backend_name or os.environ.get("ASL_DB_BACKEND", "mysql")).lower()
+    if backend_name != "mysql":
+        return create_embedded_database(get_backend(backend_name))
+    
+    import mysql.connector
+    from mysql.connector import Error
     
     print("=" * 70)
     print("  CRÉATION AUTOMATIQUE DE LA BASE DE DONNÉES")
@@ -45,7 +93,9 @@ def create_database_and_schema():
     # Configuration
     host = "localhost"
     user = "root"
-    password = input("\nEntrez le mot de passe MySQL root: ")
+    password = os.environ.get("MYSQL_PASSWORD")
+    if password is None:
+        password = input("\nEntrez le mot de passe MySQL root: ")
     database = "asl_recognition"
     schema_file = "database/schema.sql"
     
@@ -81,19 +131,11 @@ def create_database_and_schema():
             # Étape 4: Lire et exécuter le fichier SQL
             print(f"\n[4/4] Exécution du schéma SQL...")
             
-            with open(schema_file, 'r', encoding='utf-8') as f:
-                sql_content = f.read()
-            
-            # Séparer le contenu en sections
-            # 1. Tables et vues (avant DELIMITER)
-            # 2. Procédures stockées (entre DELIMITER // et DELIMITER ;)
-            
-            parts = sql_content.split('DELIMITER //')
+            commands, procedures = load_schema_sections(schema_file)
             
             # Partie 1: Tables et vues
             print("   Création des tables et vues...")
-            if parts[0]:
-                commands = _parse_sql_commands(parts[0])
+            if commands:
                 commands_executed = 0
                 for cmd in commands:
                     if cmd:
@@ -108,22 +150,17 @@ def create_database_and_schema():
                 print(f"   ✅ {commands_executed} commandes exécutées")
             
             # Partie 2: Procédures stockées
-            if len(parts) > 1:
+            if procedures:
                 print("   Création des procédures stockées...")
-                procedure_section = parts[1].split('DELIMITER ;')[0]
-                
-                # Séparer les procédures par '//'
-                procedures = [p.strip() for p in procedure_section.split('//') if p.strip()]
                 
                 proc_count = 0
                 for proc in procedures:
-                    if proc and ('CREATE PROCEDURE' in proc.upper() or 'CREATE FUNCTION' in proc.upper()):
-                        try:
-                            cursor.execute(proc)
-                            proc_count += 1
-                        except Error as e:
-                            if "already exists" not in str(e).lower():
-                                print(f"   ⚠️  Erreur procédure: {str(e)[:80]}")
+                    try:
+                        cursor.execute(proc)
+                        proc_count += 1
+                    except Error as e:
+                        if "already exists" not in str(e).lower():
+                            print(f"   ⚠️  Erreur procédure: {str(e)[:80]}")
                 
                 connection.commit()
                 print(f"   ✅ {proc_count} procédures créées")
@@ -202,4 +239,5 @@ if __name__ == "__main__":
     
     create_database_and_schema()
     
-    input("\nAppuyez sur Entrée pour quitter...")
\ No newline at end of file
+    if sys.stdin.isatty():
+        input("\nAppuyez sur Entrée pour quitter...")
\ No newline at end of file
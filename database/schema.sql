@@ -33,6 +33,9 @@ CREATE TABLE IF NOT EXISTS videos (
     split ENUM('train', 'val', 'test') DEFAULT 'train',
     downloaded BOOLEAN DEFAULT FALSE,
     processed BOOLEAN DEFAULT FALSE,
+    availability ENUM('available', 'missing', 'unreachable') DEFAULT 'available',
+    probe_attempts INT DEFAULT 0,
+    next_probe_at DATETIME NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     
@@ -40,12 +43,15 @@ CREATE TABLE IF NOT EXISTS videos (
     INDEX idx_word_id (word_id),
     INDEX idx_downloaded (downloaded),
     INDEX idx_processed (processed),
-    INDEX idx_split (split)
+    INDEX idx_split (split),
+    INDEX idx_availability (availability, next_probe_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ================================================================================
 -- TABLE 3: frames (images extraites des vidéos)
 -- ================================================================================
+-- À grande échelle, frames et landmarks peuvent être partitionnées par video_id:
+--   python partition_maintenance.py migrate --scheme range
 CREATE TABLE IF NOT EXISTS frames (
     id INT AUTO_INCREMENT PRIMARY KEY,
     video_id INT NOT NULL,
@@ -80,6 +86,7 @@ CREATE TABLE IF NOT EXISTS landmarks (
 CREATE TABLE IF NOT EXISTS processing_logs (
     id INT AUTO_INCREMENT PRIMARY KEY,
     video_id INT,
+    stage VARCHAR(20) DEFAULT 'processing',
     status ENUM('pending', 'downloading', 'success', 'failed') DEFAULT 'pending',
     error_message TEXT,
     processing_time_sec FLOAT,
@@ -87,7 +94,48 @@ CREATE TABLE IF NOT EXISTS processing_logs (
     
     FOREIGN KEY (video_id) REFERENCES videos(id) ON DELETE CASCADE,
     INDEX idx_video_id (video_id),
-    INDEX idx_status (status)
+    INDEX idx_status (status),
+    INDEX idx_stage_video (stage, video_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ================================================================================
+-- TABLE 6: predictions (top-k du modèle par vidéo, voir evaluate_model.py)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS predictions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    video_id INT NOT NULL,
+    model_tag VARCHAR(100) NOT NULL,
+    rank_position INT NOT NULL,
+    class_index INT NOT NULL,
+    gloss VARCHAR(100),
+    confidence FLOAT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (video_id) REFERENCES videos(id) ON DELETE CASCADE,
+    UNIQUE KEY unique_prediction (model_tag, video_id, rank_position),
+    INDEX idx_video_id (video_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ================================================================================
+-- TABLE 7: sweep_trials (résultats des recherches d'hyperparamètres)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS sweep_trials (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    sweep_name VARCHAR(100) NOT NULL,
+    trial_id INT NOT NULL,
+    rung INT NOT NULL,
+    epochs INT NOT NULL,
+    config JSON,
+    val_accuracy FLOAT,
+    val_top5_accuracy FLOAT,
+    val_loss FLOAT,
+    train_seconds FLOAT,
+    status ENUM('success', 'failed', 'stopped') DEFAULT 'success',
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    UNIQUE KEY unique_trial_rung (sweep_name, trial_id, rung),
+    INDEX idx_val_accuracy (sweep_name, val_accuracy)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- ================================================================================
@@ -119,7 +167,7 @@ SELECT
     w.gloss as word
 FROM videos v
 JOIN words w ON v.word_id = w.id
-WHERE v.downloaded = FALSE
+WHERE v.downloaded = FALSE AND v.availability = 'available'
 ORDER BY w.gloss;
 
 -- ================================================================================
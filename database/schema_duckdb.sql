@@ -0,0 +1,154 @@
+-- ================================================================================
+-- SCHÉMA DUCKDB POUR RECONNAISSANCE ASL (backend embarqué, moteur colonnes)
+-- Même tables et vues que schema.sql, pour les analyses locales (répartition
+-- des splits, statistiques par mot) sans serveur.
+-- Pas d'index secondaires ni de clés étrangères: DuckDB s'appuie sur ses
+-- zone maps pour les scans, et ses index ART ralentissent le chargement.
+-- Les contraintes UNIQUE de schema.sql sont conservées: sans elles, une
+-- seconde exécution dupliquerait silencieusement frames, predictions et
+-- sweep_trials.
+-- ================================================================================
+
+CREATE SEQUENCE IF NOT EXISTS words_id_seq;
+CREATE SEQUENCE IF NOT EXISTS videos_id_seq;
+CREATE SEQUENCE IF NOT EXISTS frames_id_seq;
+CREATE SEQUENCE IF NOT EXISTS landmarks_id_seq;
+CREATE SEQUENCE IF NOT EXISTS processing_logs_id_seq;
+CREATE SEQUENCE IF NOT EXISTS predictions_id_seq;
+CREATE SEQUENCE IF NOT EXISTS sweep_trials_id_seq;
+
+-- ================================================================================
+-- TABLE 1: words (mots ASL)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY DEFAULT nextval('words_id_seq'),
+    gloss VARCHAR NOT NULL UNIQUE,
+    sample_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ================================================================================
+-- TABLE 2: videos
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY DEFAULT nextval('videos_id_seq'),
+    word_id INTEGER NOT NULL,
+    video_id VARCHAR,
+    video_url VARCHAR,
+    local_path VARCHAR,
+    duration_sec FLOAT,
+    fps INTEGER,
+    signer_id INTEGER,
+    split VARCHAR DEFAULT 'train' CHECK (split IN ('train', 'val', 'test')),
+    downloaded BOOLEAN DEFAULT FALSE,
+    processed BOOLEAN DEFAULT FALSE,
+    availability VARCHAR DEFAULT 'available' CHECK (availability IN ('available', 'missing', 'unreachable')),
+    probe_attempts INTEGER DEFAULT 0,
+    next_probe_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ================================================================================
+-- TABLE 3: frames (images extraites des vidéos)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS frames (
+    id INTEGER PRIMARY KEY DEFAULT nextval('frames_id_seq'),
+    video_id INTEGER NOT NULL,
+    frame_number INTEGER NOT NULL,
+    frame_path VARCHAR,
+    timestamp_sec FLOAT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (video_id, frame_number)
+);
+
+-- ================================================================================
+-- TABLE 4: landmarks (points de repère MediaPipe)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS landmarks (
+    id INTEGER PRIMARY KEY DEFAULT nextval('landmarks_id_seq'),
+    frame_id INTEGER NOT NULL,
+    landmark_data JSON,
+    num_hands INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ================================================================================
+-- TABLE 5: processing_logs (logs de traitement)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS processing_logs (
+    id INTEGER PRIMARY KEY DEFAULT nextval('processing_logs_id_seq'),
+    video_id INTEGER,
+    stage VARCHAR DEFAULT 'processing',
+    status VARCHAR DEFAULT 'pending' CHECK (status IN ('pending', 'downloading', 'success', 'failed')),
+    error_message VARCHAR,
+    processing_time_sec FLOAT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ================================================================================
+-- TABLE 6: predictions (top-k du modèle par vidéo, voir evaluate_model.py)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY DEFAULT nextval('predictions_id_seq'),
+    video_id INTEGER NOT NULL,
+    model_tag VARCHAR NOT NULL,
+    rank_position INTEGER NOT NULL,
+    class_index INTEGER NOT NULL,
+    gloss VARCHAR,
+    confidence FLOAT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (model_tag, video_id, rank_position)
+);
+
+-- ================================================================================
+-- TABLE 7: sweep_trials (résultats des recherches d'hyperparamètres)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS sweep_trials (
+    id INTEGER PRIMARY KEY DEFAULT nextval('sweep_trials_id_seq'),
+    sweep_name VARCHAR NOT NULL,
+    trial_id INTEGER NOT NULL,
+    rung INTEGER NOT NULL,
+    epochs INTEGER NOT NULL,
+    config JSON,
+    val_accuracy FLOAT,
+    val_top5_accuracy FLOAT,
+    val_loss FLOAT,
+    train_seconds FLOAT,
+    status VARCHAR DEFAULT 'success' CHECK (status IN ('success', 'failed', 'stopped')),
+    error_message VARCHAR,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (sweep_name, trial_id, rung)
+);
+
+-- ================================================================================
+-- VUES UTILES
+-- ================================================================================
+
+-- Vue pour voir les statistiques par mot
+CREATE OR REPLACE VIEW word_statistics AS
+SELECT 
+    w.id,
+    w.gloss,
+    w.sample_count,
+    COUNT(v.id) as total_videos,
+    SUM(CASE WHEN v.downloaded = TRUE THEN 1 ELSE 0 END) as downloaded_count,
+    SUM(CASE WHEN v.processed = TRUE THEN 1 ELSE 0 END) as processed_count,
+    SUM(CASE WHEN v.split = 'train' THEN 1 ELSE 0 END) as train_count,
+    SUM(CASE WHEN v.split = 'val' THEN 1 ELSE 0 END) as val_count,
+    SUM(CASE WHEN v.split = 'test' THEN 1 ELSE 0 END) as test_count
+FROM words w
+LEFT JOIN videos v ON w.id = v.word_id
+GROUP BY w.id, w.gloss, w.sample_count;
+
+-- Vue pour les vidéos non téléchargées
+CREATE OR REPLACE VIEW videos_to_download AS
+SELECT 
+    v.id,
+    v.video_id,
+    v.video_url,
+    w.gloss as word
+FROM videos v
+JOIN words w ON v.word_id = w.id
+WHERE v.downloaded = FALSE AND v.availability = 'available'
+ORDER BY w.gloss;
@@ -0,0 +1,167 @@
+-- ================================================================================
+-- SCHÉMA SQLITE POUR RECONNAISSANCE ASL (backend embarqué, sans serveur)
+-- Même tables et vues que schema.sql; les procédures stockées sont remplacées
+-- par des méthodes du backend (voir db_backend.py)
+-- ================================================================================
+
+-- ================================================================================
+-- TABLE 1: words (mots ASL)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    gloss VARCHAR(100) NOT NULL UNIQUE,
+    sample_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ================================================================================
+-- TABLE 2: videos
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    word_id INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+    video_id VARCHAR(50),
+    video_url VARCHAR(500),
+    local_path VARCHAR(500),
+    duration_sec REAL,
+    fps INTEGER,
+    signer_id INTEGER,
+    split TEXT DEFAULT 'train' CHECK (split IN ('train', 'val', 'test')),
+    downloaded BOOLEAN DEFAULT FALSE,
+    processed BOOLEAN DEFAULT FALSE,
+    availability TEXT DEFAULT 'available' CHECK (availability IN ('available', 'missing', 'unreachable')),
+    probe_attempts INTEGER DEFAULT 0,
+    next_probe_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_videos_word_id ON videos (word_id);
+CREATE INDEX IF NOT EXISTS idx_videos_downloaded ON videos (downloaded);
+CREATE INDEX IF NOT EXISTS idx_videos_processed ON videos (processed);
+CREATE INDEX IF NOT EXISTS idx_videos_split ON videos (split);
+CREATE INDEX IF NOT EXISTS idx_videos_availability ON videos (availability, next_probe_at);
+
+-- Équivalent de ON UPDATE CURRENT_TIMESTAMP
+CREATE TRIGGER IF NOT EXISTS trg_videos_updated_at
+AFTER UPDATE ON videos
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE videos SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+
+-- ================================================================================
+-- TABLE 3: frames (images extraites des vidéos)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS frames (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id INTEGER NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+    frame_number INTEGER NOT NULL,
+    frame_path VARCHAR(500),
+    timestamp_sec REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (video_id, frame_number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_frames_frame_number ON frames (frame_number);
+
+-- ================================================================================
+-- TABLE 4: landmarks (points de repère MediaPipe)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS landmarks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    frame_id INTEGER NOT NULL REFERENCES frames(id) ON DELETE CASCADE,
+    landmark_data JSON,
+    num_hands INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_landmarks_frame_id ON landmarks (frame_id);
+
+-- ================================================================================
+-- TABLE 5: processing_logs (logs de traitement)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS processing_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id INTEGER REFERENCES videos(id) ON DELETE CASCADE,
+    stage VARCHAR(20) DEFAULT 'processing',
+    status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'downloading', 'success', 'failed')),
+    error_message TEXT,
+    processing_time_sec REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_processing_logs_video_id ON processing_logs (video_id);
+CREATE INDEX IF NOT EXISTS idx_processing_logs_status ON processing_logs (status);
+CREATE INDEX IF NOT EXISTS idx_processing_logs_stage_video ON processing_logs (stage, video_id);
+
+-- ================================================================================
+-- TABLE 6: predictions (top-k du modèle par vidéo, voir evaluate_model.py)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id INTEGER NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+    model_tag VARCHAR(100) NOT NULL,
+    rank_position INTEGER NOT NULL,
+    class_index INTEGER NOT NULL,
+    gloss VARCHAR(100),
+    confidence REAL NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (model_tag, video_id, rank_position)
+);
+
+CREATE INDEX IF NOT EXISTS idx_predictions_video_id ON predictions (video_id);
+
+-- ================================================================================
+-- TABLE 7: sweep_trials (résultats des recherches d'hyperparamètres)
+-- ================================================================================
+CREATE TABLE IF NOT EXISTS sweep_trials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sweep_name VARCHAR(100) NOT NULL,
+    trial_id INTEGER NOT NULL,
+    rung INTEGER NOT NULL,
+    epochs INTEGER NOT NULL,
+    config JSON,
+    val_accuracy REAL,
+    val_top5_accuracy REAL,
+    val_loss REAL,
+    train_seconds REAL,
+    status TEXT DEFAULT 'success' CHECK (status IN ('success', 'failed', 'stopped')),
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (sweep_name, trial_id, rung)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sweep_trials_val_accuracy ON sweep_trials (sweep_name, val_accuracy);
+
+-- ================================================================================
+-- VUES UTILES
+-- ================================================================================
+
+-- Vue pour voir les statistiques par mot
+CREATE VIEW IF NOT EXISTS word_statistics AS
+SELECT 
+    w.id,
+    w.gloss,
+    w.sample_count,
+    COUNT(v.id) as total_videos,
+    SUM(CASE WHEN v.downloaded = TRUE THEN 1 ELSE 0 END) as downloaded_count,
+    SUM(CASE WHEN v.processed = TRUE THEN 1 ELSE 0 END) as processed_count,
+    SUM(CASE WHEN v.split = 'train' THEN 1 ELSE 0 END) as train_count,
+    SUM(CASE WHEN v.split = 'val' THEN 1 ELSE 0 END) as val_count,
+    SUM(CASE WHEN v.split = 'test' THEN 1 ELSE 0 END) as test_count
+FROM words w
+LEFT JOIN videos v ON w.id = v.word_id
+GROUP BY w.id, w.gloss, w.sample_count;
+
+-- Vue pour les vidéos non téléchargées
+CREATE VIEW IF NOT EXISTS videos_to_download AS
+SELECT 
+    v.id,
+    v.video_id,
+    v.video_url,
+    w.gloss as word
+FROM videos v
+JOIN words w ON v.word_id = w.id
+WHERE v.downloaded = FALSE AND v.availability = 'available'
+ORDER BY w.gloss;
@@ -5,18 +5,19 @@ Personne 1 : Base de données & Ingestion
 ================================================================================
 """
 
-import mysql.connector
+import os
+
 from tabulate import tabulate
 
+from db_backend import MySQLBackend, get_backend
+from metrics import REGISTRY, log_processing
+
 class DatabaseQueryHelper:
-    def __init__(self, host="localhost", user="root", password="", database="asl_recognition"):
-        self.connection = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database
-        )
-        self.cursor = self.connection.cursor()
+    def __init__(self, host="localhost", user="root", password="", database="asl_recognition", backend=None):
+        # Par défaut MySQL; sinon un backend de db_backend (SQLite, DuckDB)
+        self.backend = backend or MySQLBackend(host=host, user=user, password=password, database=database)
+        self.connection = self.backend.connect()
+        self.cursor = self.backend.cursor(self.connection)
     
     def show_sample_words(self, limit=10):
         """Afficher un échantillon de mots"""
@@ -62,6 +63,7 @@ class DatabaseQueryHelper:
             "Total vidéos": "SELECT COUNT(*) FROM videos",
             "Vidéos téléchargées": "SELECT COUNT(*) FROM videos WHERE downloaded = TRUE",
             "Vidéos non téléchargées": "SELECT COUNT(*) FROM videos WHERE downloaded = FALSE",
+            "Vidéos indisponibles (missing/unreachable)": "SELECT COUNT(*) FROM videos WHERE availability <> 'available'",
             "Vidéos traitées": "SELECT COUNT(*) FROM videos WHERE processed = TRUE",
             "Vidéos non traitées": "SELECT COUNT(*) FROM videos WHERE processed = FALSE"
         }
@@ -94,6 +96,16 @@ class DatabaseQueryHelper:
         headers = ["Split", "Nombre", "Pourcentage (%)"]
         print(tabulate(results, headers=headers, tablefmt="grid"))
     
+    def show_database_stats(self):
+        """Afficher les statistiques globales (équivalent de CALL get_database_stats())"""
+        print(f"\n📊 STATISTIQUES GLOBALES:")
+        print("=" * 70)
+        
+        results = self.backend.get_database_stats(self.cursor)
+        print(tabulate(results, headers=["Métrique", "Valeur"], tablefmt="grid"))
+        
+        return results
+    
     def get_videos_to_download(self, limit=20):
         """Obtenir la liste des vidéos à télécharger"""
         print(f"\n⬇️  VIDÉOS À TÉLÉCHARGER (Top {limit}):")
@@ -103,7 +115,7 @@ class DatabaseQueryHelper:
             SELECT v.id, w.gloss, v.video_url, v.split
             FROM videos v
             JOIN words w ON v.word_id = w.id
-            WHERE v.downloaded = FALSE
+            WHERE v.downloaded = FALSE AND v.availability = 'available'
             LIMIT %s
         """
         self.cursor.execute(query, (limit,))
@@ -114,15 +126,25 @@ class DatabaseQueryHelper:
         
         return results
     
-    def mark_video_downloaded(self, video_id, local_path):
-        """Marquer une vidéo comme téléchargée"""
+    def mark_video_downloaded(self, video_id, local_path, processing_time_sec=None):
+        """
+        Marquer une vidéo comme téléchargée
+        
+        Si processing_time_sec est fourni (durée du téléchargement), une ligne
+        'success' est aussi ajoutée dans processing_logs.
+        """
         query = """
             UPDATE videos 
-            SET downloaded = TRUE, local_path = %s, updated_at = NOW()
+            SET downloaded = TRUE, local_path = %s, updated_at = CURRENT_TIMESTAMP
             WHERE id = %s
         """
-        self.cursor.execute(query, (local_path, video_id))
-        self.connection.commit()
+        with REGISTRY.timer("db_round_trip_seconds", op="mark_video_downloaded"):
+            self.cursor.execute(query, (local_path, video_id))
+        if processing_time_sec is not None:
+            REGISTRY.observe("download_seconds", processing_time_sec)
+            log_processing(self.cursor, video_id, "success", processing_time_sec, stage="download")
+        with REGISTRY.timer("batch_commit_seconds"):
+            self.connection.commit()
         print(f"✅ Vidéo {video_id} marquée comme téléchargée")
     
     def get_word_id_by_gloss(self, gloss):
@@ -134,8 +156,7 @@ class DatabaseQueryHelper:
     
     def close(self):
         """Fermer la connexion"""
-        self.cursor.close()
-        self.connection.close()
+        self.backend.close(self.connection, self.cursor)
 
 
 # ================================================================================
@@ -150,16 +171,20 @@ if __name__ == "__main__":
     ================================================================================
     """)
     
-    # Configuration
+    # Configuration (ASL_DB_BACKEND=sqlite|duckdb pour un backend embarqué)
     db = DatabaseQueryHelper(
-        host="localhost",
-        user="root",
-        password="1234",  # METTEZ VOTRE MOT DE PASSE
-        database="asl_recognition"
+        backend=get_backend(
+            os.environ.get("ASL_DB_BACKEND", "mysql"),
+            host="localhost",
+            user="root",
+            password="1234",  # METTEZ VOTRE MOT DE PASSE
+            database="asl_recognition"
+        )
     )
     
     # Afficher diverses statistiques
     db.show_sample_words(10)
+    db.show_database_stats()
     db.show_download_statistics()
     db.show_split_distribution()
     db.get_videos_to_download(10)
@@ -0,0 +1,450 @@
+"""
+================================================================================
+BACKENDS DE STOCKAGE : MySQL, SQLite (WAL) ET DuckDB
+Personne 1 : Base de données & Ingestion
+================================================================================
+WLASLDatabaseManager et DatabaseQueryHelper passent par un backend au lieu
+d'appeler mysql.connector directement. Les backends embarqués (SQLite, DuckDB)
+n'ont besoin d'aucun serveur: pratique pour la CI, les portables et les
+machines d'entraînement hors ligne.
+
+    MySQL  : database/schema.sql          (serveur, procédures stockées)
+    SQLite : database/schema_sqlite.sql   (fichier local, journal WAL)
+    DuckDB : database/schema_duckdb.sql   (fichier local, moteur colonnes)
+
+Les requêtes de l'application sont écrites avec des paramètres %s (style
+MySQL); pour SQLite et DuckDB ils sont traduits en ? par le curseur.
+
+Sélection par variables d'environnement:
+    ASL_DB_BACKEND=sqlite ASL_DB_PATH=database/asl_recognition.db
+"""
+
+import functools
+import os
+import re
+import sqlite3
+
+
+# Requête portable équivalente à la procédure stockée get_database_stats()
+DATABASE_STATS_QUERY = """
+    SELECT 'Total Words' as metric, COUNT(*) as value FROM words
+    UNION ALL
+    SELECT 'Total Videos', COUNT(*) FROM videos
+    UNION ALL
+    SELECT 'Downloaded Videos', COUNT(*) FROM videos WHERE downloaded = TRUE
+    UNION ALL
+    SELECT 'Processed Videos', COUNT(*) FROM videos WHERE processed = TRUE
+    UNION ALL
+    SELECT 'Total Frames', COUNT(*) FROM frames
+    UNION ALL
+    SELECT 'Total Landmarks', COUNT(*) FROM landmarks
+"""
+
+# Requête portable équivalente à la procédure stockée update_sample_counts()
+UPDATE_SAMPLE_COUNTS_QUERY = """
+    UPDATE words
+    SET sample_count = (
+        SELECT COUNT(*)
+        FROM videos v
+        WHERE v.word_id = words.id
+    )
+"""
+
+
+def parse_sql_commands(sql_text):
+    """
+    Découper un script SQL en commandes, en ignorant les commentaires
+
+    Les lignes DELIMITER, USE et SHOW sont ignorées; une commande se termine
+    par une ligne qui finit par ';'.
+    """
+    commands = []
+    current_command = []
+
+    for line in sql_text.split('\n'):
+        # Ignorer les commentaires
+        if line.strip().startswith('--') or line.strip().startswith('#'):
+            continue
+
+        # Ignorer les lignes vides
+        if not line.strip():
+            continue
+
+        # Ignorer DELIMITER, USE, SHOW
+        if any(line.strip().upper().startswith(x) for x in ['DELIMITER', 'USE ', 'SHOW ']):
+            continue
+
+        current_command.append(line)
+
+        # Si la ligne se termine par ';', c'est la fin de la commande
+        if line.strip().endswith(';'):
+            command = '\n'.join(current_command)
+            commands.append(command)
+            current_command = []
+
+    return commands
+
+
+def table_columns(cursor, table):
+    """
+    Noms des colonnes d'une table, sans passer par un chemin d'erreur
+    (pas de rollback nécessaire, identique sur les trois backends)
+    """
+    cursor.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+    cursor.fetchall()
+    return [column[0] for column in cursor.description]
+
+
+# Chaînes entre quotes (recopiées telles quelles) ou paramètre %s
+_PLACEHOLDER_OR_LITERAL = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|%s")
+
+
+@functools.lru_cache(maxsize=1024)
+def to_qmark(query):
+    """Traduire les paramètres %s en ?, sans toucher aux %s des chaînes littérales"""
+    return _PLACEHOLDER_OR_LITERAL.sub(lambda m: '?' if m.group(0) == '%s' else m.group(0), query)
+
+
+class _QmarkCursor:
+    """Curseur qui traduit les paramètres %s en ? (SQLite, DuckDB)"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=None):
+        if params is None:
+            self._cursor.execute(to_qmark(query))
+        else:
+            self._cursor.execute(to_qmark(query), params)
+        return self
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(to_qmark(query), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    def close(self):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        # lastrowid, rowcount, description...
+        return getattr(self._cursor, name)
+
+
+class _DuckDBCursor:
+    """
+    Curseur qui exécute sur la connexion DuckDB elle-même
+
+    connection.cursor() de DuckDB ouvre une connexion dupliquée, avec sa
+    propre transaction: ses écritures échapperaient au commit()/rollback()
+    de la connexion principale.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def execute(self, query, params=None):
+        if params is None:
+            self._connection.execute(query)
+        else:
+            self._connection.execute(query, params)
+        return self
+
+    def executemany(self, query, seq_of_params):
+        self._connection.executemany(query, seq_of_params)
+        return self
+
+    def close(self):
+        # La connexion est fermée par StorageBackend.close()
+        pass
+
+    def __getattr__(self, name):
+        # fetchone, fetchall, fetchmany, description...
+        return getattr(self._connection, name)
+
+
+class _DuckDBConnection:
+    """
+    Connexion DuckDB en transactions explicites
+
+    DuckDB est en autocommit par défaut: commit() et rollback() n'y font
+    rien, et chaque INSERT est validé seul (lent et non annulable). Comme
+    sqlite3 et mysql.connector, la connexion garde ici une transaction
+    ouverte en permanence: begin() à l'ouverture et après chaque
+    commit()/rollback().
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._connection.begin()
+
+    def cursor(self):
+        return _DuckDBCursor(self._connection)
+
+    def commit(self):
+        self._connection.commit()
+        self._connection.begin()
+
+    def rollback(self):
+        self._connection.rollback()
+        self._connection.begin()
+
+    def close(self):
+        # La transaction ouverte est annulée, comme avec les autres drivers
+        self._connection.close()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class StorageBackend:
+    """
+    Interface commune des backends
+
+    Un backend sait ouvrir une connexion, créer le schéma et fournit les
+    quelques requêtes qui diffèrent d'un moteur à l'autre.
+    """
+
+    name = None
+    schema_file = None
+    Error = Exception
+
+    def connect(self):
+        """Ouvrir et retourner une connexion"""
+        raise NotImplementedError
+
+    def cursor(self, connection):
+        """Retourner un curseur acceptant les paramètres %s"""
+        return _QmarkCursor(connection.cursor())
+
+    def close(self, connection, cursor=None):
+        """Fermer le curseur et la connexion"""
+        if cursor is not None:
+            cursor.close()
+        connection.close()
+
+    def describe(self):
+        """Description courte de la cible (pour les messages)"""
+        raise NotImplementedError
+
+    def create_schema(self, connection):
+        """Exécuter le fichier de schéma du backend"""
+        with open(self.schema_file, 'r', encoding='utf-8') as f:
+            sql_content = f.read()
+
+        cursor = connection.cursor()
+        commands = parse_sql_commands(sql_content)
+        for cmd in commands:
+            cursor.execute(cmd)
+        connection.commit()
+        cursor.close()
+        return len(commands)
+
+    def upsert_word(self, cursor, gloss, sample_count):
+        """Insérer ou mettre à jour un mot et retourner son id"""
+        cursor.execute("""
+            INSERT INTO words (gloss, sample_count)
+            VALUES (%s, %s)
+            ON CONFLICT (gloss) DO UPDATE SET sample_count = excluded.sample_count
+            RETURNING id
+        """, (gloss, sample_count))
+        return cursor.fetchone()[0]
+
+    def get_database_stats(self, cursor):
+        """Équivalent de CALL get_database_stats(): liste de (métrique, valeur)"""
+        cursor.execute(DATABASE_STATS_QUERY)
+        return cursor.fetchall()
+
+    def update_sample_counts(self, cursor):
+        """Équivalent de CALL update_sample_counts()"""
+        cursor.execute(UPDATE_SAMPLE_COUNTS_QUERY)
+
+    def list_tables(self, cursor):
+        """Noms des tables du schéma"""
+        raise NotImplementedError
+
+    def list_views(self, cursor):
+        """Noms des vues du schéma"""
+        raise NotImplementedError
+
+
+class MySQLBackend(StorageBackend):
+    name = "mysql"
+    schema_file = "database/schema.sql"
+
+    def __init__(self, host="localhost", user="root", password="", database="asl_recognition", **connect_kwargs):
+        import mysql.connector
+
+        self._driver = mysql.connector
+        self.Error = mysql.connector.Error
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        self.connect_kwargs = connect_kwargs
+
+    def connect(self):
+        return self._driver.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            **self.connect_kwargs
+        )
+
+    def cursor(self, connection):
+        return connection.cursor()
+
+    def close(self, connection, cursor=None):
+        if connection and connection.is_connected():
+            super().close(connection, cursor)
+
+    def describe(self):
+        return f"MySQL - Base: {self.database}"
+
+    def create_schema(self, connection):
+        # Le schéma MySQL (procédures stockées) est créé par create_database.py
+        raise NotImplementedError("Utilisez create_database.py pour le schéma MySQL")
+
+    def upsert_word(self, cursor, gloss, sample_count):
+        cursor.execute("""
+            INSERT INTO words (gloss, sample_count)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE sample_count = %s
+        """, (gloss, sample_count, sample_count))
+        word_id = cursor.lastrowid
+
+        # Si le mot existait déjà, récupérer son ID
+        if word_id == 0:
+            cursor.execute("SELECT id FROM words WHERE gloss = %s", (gloss,))
+            word_id = cursor.fetchone()[0]
+        return word_id
+
+    def get_database_stats(self, cursor):
+        cursor.callproc("get_database_stats")
+        rows = []
+        for result in cursor.stored_results():
+            rows.extend(result.fetchall())
+        return rows
+
+    def update_sample_counts(self, cursor):
+        cursor.callproc("update_sample_counts")
+
+    def list_tables(self, cursor):
+        cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+        return [row[0] for row in cursor.fetchall()]
+
+    def list_views(self, cursor):
+        cursor.execute("SHOW FULL TABLES WHERE Table_type = 'VIEW'")
+        return [row[0] for row in cursor.fetchall()]
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+    schema_file = "database/schema_sqlite.sql"
+    Error = sqlite3.Error
+
+    def __init__(self, path="database/asl_recognition.db", **kwargs):
+        self.path = path
+
+    def connect(self):
+        # timeout: attente du verrou d'écriture quand plusieurs threads écrivent
+        connection = sqlite3.connect(self.path, timeout=30)
+        # WAL: lecteurs et écrivain ne se bloquent pas mutuellement
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        connection.execute("PRAGMA cache_size = -65536")
+        return connection
+
+    def describe(self):
+        return f"SQLite (WAL) - Fichier: {self.path}"
+
+    def create_schema(self, connection):
+        # executescript gère aussi les triggers (BEGIN ... END;)
+        with open(self.schema_file, 'r', encoding='utf-8') as f:
+            connection.executescript(f.read())
+        connection.commit()
+        return len(self.list_tables(connection.cursor())) + len(self.list_views(connection.cursor()))
+
+    def list_tables(self, cursor):
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+        return [row[0] for row in cursor.fetchall()]
+
+    def list_views(self, cursor):
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'view' ORDER BY name")
+        return [row[0] for row in cursor.fetchall()]
+
+
+class DuckDBBackend(StorageBackend):
+    name = "duckdb"
+    schema_file = "database/schema_duckdb.sql"
+
+    def __init__(self, path="database/asl_recognition.duckdb", threads=None, **kwargs):
+        import duckdb
+
+        self._driver = duckdb
+        self.Error = duckdb.Error
+        self.path = path
+        self.threads = threads
+
+    def connect(self):
+        connection = self._driver.connect(self.path)
+        if self.threads:
+            connection.execute(f"SET threads = {int(self.threads)}")
+        return _DuckDBConnection(connection)
+
+    def describe(self):
+        return f"DuckDB - Fichier: {self.path}"
+
+    def list_tables(self, cursor):
+        cursor.execute("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_type = 'BASE TABLE' ORDER BY table_name
+        """)
+        return [row[0] for row in cursor.fetchall()]
+
+    def list_views(self, cursor):
+        cursor.execute("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_type = 'VIEW' ORDER BY table_name
+        """)
+        return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+    "duckdb": DuckDBBackend,
+}
+
+
+def get_backend(name=None, **kwargs):
+    """
+    Instancier un backend par son nom
+
+    Args:
+        name: 'mysql', 'sqlite' ou 'duckdb' (par défaut $ASL_DB_BACKEND, sinon mysql)
+        **kwargs: Paramètres du backend (host/user/password/database pour
+            MySQL, path pour SQLite et DuckDB). Pour les backends embarqués,
+            path vaut $ASL_DB_PATH s'il est défini.
+
+    Returns:
+        Instance de StorageBackend
+    """
+    name = (name or os.environ.get("ASL_DB_BACKEND", "mysql")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Backend inconnu: {name} (choix: {', '.join(BACKENDS)})")
+
+    if name != "mysql" and "path" not in kwargs and os.environ.get("ASL_DB_PATH"):
+        kwargs["path"] = os.environ["ASL_DB_PATH"]
+    return BACKENDS[name](**kwargs)
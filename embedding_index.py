@@ -0,0 +1,338 @@
+"""
+ASL Sign Language Recognition - Nearest-neighbour sign retrieval
+Person 4 - Model Architecture
+
+Extracts the `global_avg_pool` embedding of build_asl_model for every
+processed video and stores it in an on-disk IVF (inverted file) index keyed
+by videos.id, to answer "which clips look like this one" for annotation QA
+and few-shot expansion to glosses outside the class list.
+
+Index layout (one directory):
+    meta.json       dim, nlist, count, model_key (model.model_cache_key of
+                    the model that produced the embeddings)
+    centroids.npy   (nlist, dim) float32 coarse quantizer
+    offsets.npy     (nlist + 1,) int64 start of each inverted list
+    ids.npy         (count,) int64 videos.id, grouped by list
+    vectors.npy     (count, dim) float16 L2-normalized embeddings
+
+ids/vectors are memory-mapped on load, so opening the index is instant and
+a query only touches the `nprobe` lists closest to it.
+
+Usage:
+    python embedding_index.py build --weights asl_model.weights.h5 --num-classes 2000
+    python embedding_index.py update --weights asl_model.weights.h5 --num-classes 2000
+    python embedding_index.py query --video-id 1234 --k 10
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from db_backend import get_backend
+from landmark_dataset import fetch_landmark_sequences
+from metrics import REGISTRY
+from model import DEFAULT_MODEL_CONFIG
+
+INDEX_DIR = "embedding_index"
+
+
+# =============================================================================
+# EMBEDDINGS
+# =============================================================================
+
+def build_embedding_model(model, layer_name="global_avg_pool"):
+    """Truncate a classification model at its pooled embedding layer."""
+    from model import Model
+    return Model(inputs=model.input, outputs=model.get_layer(layer_name).output, name="ASL_embedding")
+
+
+def fetch_processed_video_ids(cursor, exclude=None):
+    """
+    videos.id of the processed videos, minus those in `exclude`.
+
+    Videos finish processing out of id order (pipeline_orchestrator runs
+    them concurrently), so an update compares against the ids already in
+    the index rather than a high-water mark.
+    """
+    cursor.execute("SELECT id FROM videos WHERE processed = TRUE ORDER BY id")
+    video_ids = np.asarray([row[0] for row in cursor.fetchall()], dtype=np.int64)
+    if exclude is not None and len(exclude):
+        video_ids = np.setdiff1d(video_ids, exclude, assume_unique=True)
+    return video_ids
+
+
+def extract_embeddings(cursor, embedding_model, video_ids, chunk_size=1024, batch_size=256,
+                       num_frames=DEFAULT_MODEL_CONFIG["num_frames"],
+                       num_landmarks=DEFAULT_MODEL_CONFIG["num_landmarks"], streams=None):
+    """
+    Compute the embeddings of a list of videos, chunk by chunk.
+
+    Returns:
+        np.ndarray float32 of shape (len(video_ids), embedding_dim)
+    """
+    outputs = []
+    for start in range(0, len(video_ids), chunk_size):
+        chunk = [int(v) for v in video_ids[start:start + chunk_size]]
+        sequences = fetch_landmark_sequences(cursor, chunk, num_frames, num_landmarks, streams=streams)
+        with REGISTRY.timer("embedding_seconds"):
+            outputs.append(embedding_model.predict(sequences, batch_size=batch_size, verbose=0))
+        print(f"   {start + len(chunk)}/{len(video_ids)} embeddings")
+    if not outputs:
+        return np.zeros((0, embedding_model.output_shape[-1]), dtype=np.float32)
+    return np.concatenate(outputs, axis=0).astype(np.float32)
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# =============================================================================
+# IVF INDEX
+# =============================================================================
+
+def train_centroids(vectors, nlist, iterations=20, sample_size=50000, seed=0):
+    """Spherical k-means on a sample of the (normalized) vectors."""
+    rng = np.random.default_rng(seed)
+    vectors = _normalize(vectors)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    nlist = min(nlist, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=nlist)
+        empty = counts == 0
+        # Re-seed empty lists with random points
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file index over cosine similarity.
+
+    Each vector is stored in the list of its closest centroid; a query scans
+    the `nprobe` closest lists only. Vectors are kept in float16.
+    model_key identifies the model whose embeddings the index holds.
+    """
+
+    def __init__(self, centroids, model_key=None):
+        self.centroids = _normalize(centroids)
+        self.model_key = model_key
+        self.dim = self.centroids.shape[1]
+        nlist = len(self.centroids)
+        self._ids = [np.zeros(0, dtype=np.int64) for _ in range(nlist)]
+        self._vectors = [np.zeros((0, self.dim), dtype=np.float16) for _ in range(nlist)]
+
+    @classmethod
+    def train(cls, vectors, nlist=256, model_key=None, **kwargs):
+        """Create an empty index whose centroids are learned from `vectors`."""
+        return cls(train_centroids(vectors, nlist, **kwargs), model_key)
+
+    def __len__(self):
+        return sum(len(ids) for ids in self._ids)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @property
+    def ids(self):
+        """videos.id of every indexed vector (grouped by list)."""
+        return np.concatenate(self._ids)
+
+    def add(self, video_ids, vectors):
+        """Add vectors; only the inverted lists that receive vectors are copied."""
+        video_ids = np.asarray(video_ids, dtype=np.int64)
+        vectors = _normalize(vectors)
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for list_id in np.unique(assignment):
+            members = assignment == list_id
+            self._ids[list_id] = np.concatenate([self._ids[list_id], video_ids[members]])
+            self._vectors[list_id] = np.concatenate(
+                [self._vectors[list_id], vectors[members].astype(np.float16)]
+            )
+
+    def search(self, query, k=10, nprobe=8):
+        """
+        Top-k most similar videos.
+
+        Args:
+            query: (dim,) or (n, dim) embeddings
+            k: Number of neighbours
+            nprobe: Number of inverted lists scanned per query
+
+        Returns:
+            (ids, scores) of shape (n, k); missing neighbours have id -1
+        """
+        queries = _normalize(np.atleast_2d(query))
+        nprobe = min(nprobe, self.nlist)
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        result_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        result_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for row, (q, lists) in enumerate(zip(queries, probes)):
+            ids = np.concatenate([self._ids[i] for i in lists])
+            if not len(ids):
+                continue
+            vectors = np.concatenate([self._vectors[i] for i in lists])
+            scores = vectors.astype(np.float32) @ q
+            n = min(k, len(ids))
+            best = np.argpartition(-scores, n - 1)[:n]
+            best = best[np.argsort(-scores[best])]
+            result_ids[row, :n] = ids[best]
+            result_scores[row, :n] = scores[best]
+        return result_ids, result_scores
+
+    def get_vector(self, video_id):
+        """Stored (normalized) embedding of a video, or None."""
+        for ids, vectors in zip(self._ids, self._vectors):
+            position = np.flatnonzero(ids == video_id)
+            if len(position):
+                return vectors[position[0]].astype(np.float32)
+        return None
+
+    def save(self, directory=INDEX_DIR):
+        """Write the index (lists laid out contiguously)."""
+        os.makedirs(directory, exist_ok=True)
+        sizes = [len(ids) for ids in self._ids]
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        np.save(os.path.join(directory, "centroids.npy"), self.centroids)
+        np.save(os.path.join(directory, "offsets.npy"), offsets)
+        np.save(os.path.join(directory, "ids.npy"), np.concatenate(self._ids))
+        np.save(os.path.join(directory, "vectors.npy"), np.concatenate(self._vectors))
+        with open(os.path.join(directory, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump({
+                "dim": self.dim,
+                "nlist": self.nlist,
+                "count": len(self),
+                "model_key": self.model_key,
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, directory=INDEX_DIR, mmap=True):
+        """
+        Open a saved index.
+
+        With mmap=True (queries) ids and vectors are memory-mapped; load with
+        mmap=False before adding vectors and saving over the same directory.
+        """
+        with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        index = cls(np.load(os.path.join(directory, "centroids.npy")), meta.get("model_key"))
+        offsets = np.load(os.path.join(directory, "offsets.npy"))
+        mmap_mode = 'r' if mmap else None
+        ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode=mmap_mode)
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode=mmap_mode)
+        index._ids = [ids[offsets[i]:offsets[i + 1]] for i in range(index.nlist)]
+        index._vectors = [vectors[offsets[i]:offsets[i + 1]] for i in range(index.nlist)]
+        return index
+
+
+# =============================================================================
+# BUILD / UPDATE
+# =============================================================================
+
+def index_videos(backend, embedding_model, model_key, index=None, nlist=256, **extract_kwargs):
+    """
+    Embed the processed videos not yet in the index and add them.
+
+    Args:
+        backend: Storage backend (db_backend)
+        embedding_model: Model returned by build_embedding_model
+        model_key: model.model_cache_key of the model behind embedding_model
+        index: Existing IVFIndex (None: train a new one on all videos)
+        nlist: Number of inverted lists of a new index
+
+    Returns:
+        IVFIndex
+
+    Raises:
+        ValueError if `index` was built with another model: its vectors and
+        the new ones would not live in the same embedding space
+    """
+    if index is not None and index.model_key != model_key:
+        raise ValueError(f"Index built with model {index.model_key}, not {model_key} "
+                         f"(weights or configuration changed): rebuild it with `build`")
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        video_ids = fetch_processed_video_ids(cursor, index.ids if index is not None else None)
+        print(f"Videos to index: {len(video_ids)}")
+        embeddings = extract_embeddings(cursor, embedding_model, video_ids, **extract_kwargs)
+    finally:
+        backend.close(connection, cursor)
+
+    if index is None:
+        if not len(embeddings):
+            raise ValueError("No processed video to train the index on")
+        index = IVFIndex.train(embeddings, nlist, model_key=model_key)
+    index.add(video_ids, embeddings)
+    return index
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding index for nearest-neighbour sign retrieval")
+    parser.add_argument("command", choices=["build", "update", "query"])
+    parser.add_argument("--weights", help="Trained weights (.weights.h5)")
+    parser.add_argument("--num-classes", type=int, default=DEFAULT_MODEL_CONFIG["num_classes"])
+    parser.add_argument("--streams", nargs="+", help="Landmark streams of a multi-stream model")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--video-id", type=int, help="Query video (videos.id)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    args = parser.parse_args()
+
+    if args.command == "query":
+        index = IVFIndex.load(args.index_dir)
+        query = index.get_vector(args.video_id)
+        if query is None:
+            parser.error(f"video {args.video_id} is not in the index")
+        start = time.perf_counter()
+        ids, scores = index.search(query, args.k + 1, args.nprobe)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Nearest neighbours of video {args.video_id} ({elapsed_ms:.2f} ms):")
+        for video_id, score in zip(ids[0], scores[0]):
+            if video_id >= 0 and video_id != args.video_id:
+                print(f"  {video_id:<10} {score:.4f}")
+        return
+
+    from model import build_asl_model, model_cache_key
+
+    hparams = {"num_classes": args.num_classes, "streams": args.streams}
+    model = build_asl_model(**dict(DEFAULT_MODEL_CONFIG, **hparams))
+    if args.weights:
+        model.load_weights(args.weights)
+    embedding_model = build_embedding_model(model)
+    backend = get_backend(password=args.password)
+
+    model_key = model_cache_key(args.weights, **hparams)
+    index = None
+    if args.command == "update":
+        index = IVFIndex.load(args.index_dir, mmap=False)
+        if index.model_key != model_key:
+            parser.error(f"{args.index_dir} was built with another model (weights or configuration "
+                         f"changed): rebuild it with `build`")
+
+    index = index_videos(backend, embedding_model, model_key, index, nlist=args.nlist, streams=args.streams)
+    index.save(args.index_dir)
+    print(f"Index saved to {args.index_dir}: {len(index)} videos, {index.nlist} lists")
+
+
+if __name__ == "__main__":
+    main()
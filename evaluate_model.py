@@ -0,0 +1,301 @@
+"""
+ASL Sign Language Recognition - Batch evaluation on the test split
+Person 4 - Model Architecture
+
+Streams the landmark sequences of every processed test-split video, predicts
+with large batches and writes the top-k predictions of each video into the
+`predictions` table. Accuracy, top-5 accuracy, per-class accuracy and the
+confusion matrix are accumulated chunk by chunk with vectorized NumPy ops.
+
+Memory stays bounded whatever the split size: at most `prefetch` chunks of
+landmarks are in flight (loaded by a background thread on its own DB
+connection while the current chunk is being predicted), plus one
+num_classes x num_classes confusion matrix.
+
+Usage:
+    python evaluate_model.py --weights asl_model.weights.h5 --num-classes 2000 --tag nslt2000_v1
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from db_backend import get_backend
+from landmark_dataset import fetch_landmark_sequences
+from metrics import REGISTRY
+from model import DEFAULT_MODEL_CONFIG, get_serving_model, load_class_list
+
+
+# =============================================================================
+# DATA
+# =============================================================================
+
+def fetch_split_videos(cursor, glosses, split="test"):
+    """
+    List the processed videos of a split whose gloss is one of the model classes.
+
+    Args:
+        cursor: Database cursor
+        glosses: Model class list (index = class id)
+        split: Split to evaluate
+
+    Returns:
+        (video_ids, labels, skipped): NumPy arrays of videos.id and class ids,
+        and the number of videos whose gloss is not a model class
+    """
+    class_index = {gloss: i for i, gloss in enumerate(glosses)}
+    cursor.execute("""
+        SELECT v.id, w.gloss
+        FROM videos v
+        JOIN words w ON v.word_id = w.id
+        WHERE v.split = %s AND v.processed = TRUE
+        ORDER BY v.id
+    """, (split,))
+
+    video_ids, labels, skipped = [], [], 0
+    for video_id, gloss in cursor.fetchall():
+        label = class_index.get(gloss)
+        if label is None:
+            skipped += 1
+            continue
+        video_ids.append(video_id)
+        labels.append(label)
+    return np.asarray(video_ids, dtype=np.int64), np.asarray(labels, dtype=np.int64), skipped
+
+
+def _put(out_queue, item, stop):
+    """Put an item unless the consumer has stopped (never blocks on a full queue)."""
+    while not stop.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _prefetch_chunks(backend, video_ids, chunk_size, num_frames, num_landmarks, streams, out_queue, stop):
+    """Producer thread: load landmark chunks on a dedicated connection until stop is set."""
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        for start in range(0, len(video_ids), chunk_size):
+            chunk_ids = video_ids[start:start + chunk_size]
+            sequences = fetch_landmark_sequences(
+                cursor, chunk_ids.tolist(), num_frames, num_landmarks, streams=streams
+            )
+            if not _put(out_queue, (start, sequences), stop):
+                return
+    except Exception as e:
+        _put(out_queue, e, stop)
+    finally:
+        _put(out_queue, None, stop)
+        backend.close(connection, cursor)
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+def top_k(probabilities, k):
+    """Return (indices, scores) of the k best classes per row, best first."""
+    k = min(k, probabilities.shape[1])
+    indices = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(probabilities, indices, axis=1)
+    order = np.argsort(-scores, axis=1)
+    return np.take_along_axis(indices, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def per_class_accuracy(confusion):
+    """Accuracy of each class (NaN for classes absent from the split)."""
+    support = confusion.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(support > 0, np.diag(confusion) / support, np.nan)
+
+
+# =============================================================================
+# EVALUATION
+# =============================================================================
+
+def evaluate(backend, serving_model, glosses, model_tag, split="test", top_k_size=5,
+             chunk_size=2048, batch_size=512, prefetch=2,
+             num_frames=DEFAULT_MODEL_CONFIG["num_frames"],
+             num_landmarks=DEFAULT_MODEL_CONFIG["num_landmarks"], streams=None):
+    """
+    Score a whole split and write the predictions back to the database.
+
+    Args:
+        backend: Storage backend (db_backend)
+        serving_model: Object with predict(inputs, batch_size) -> probabilities
+        glosses: Model class list (index = class id)
+        model_tag: Identifier stored in predictions.model_tag (previous rows
+            with the same tag are replaced in a single transaction, so they
+            are kept if the evaluation fails)
+        split: Split to evaluate
+        top_k_size: Number of predictions stored per video
+        chunk_size: Videos loaded per database round trip
+        batch_size: Inference batch size
+        prefetch: Number of chunks loaded ahead of inference
+        streams: Landmark streams of a multi-stream model (None: single stream)
+
+    Returns:
+        Dictionary with accuracy, top5_accuracy, per_class_accuracy, confusion
+    """
+    num_classes = len(glosses)
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        video_ids, labels, skipped = fetch_split_videos(cursor, glosses, split)
+        print(f"Videos to score: {len(video_ids)} ({skipped} skipped: gloss outside the model classes)")
+
+        # Committed only once every chunk is written
+        cursor.execute("DELETE FROM predictions WHERE model_tag = %s", (model_tag,))
+
+        confusion = np.zeros((num_classes, num_classes), dtype=np.int32)
+        top1_correct = 0
+        top5_correct = 0
+        scored = 0
+
+        chunks = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=_prefetch_chunks,
+            args=(backend, video_ids, chunk_size, num_frames, num_landmarks, streams, chunks, stop),
+            daemon=True
+        )
+        producer.start()
+        start_time = time.perf_counter()
+
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                start, sequences = item
+                chunk_ids = video_ids[start:start + len(sequences)]
+                chunk_labels = labels[start:start + len(sequences)]
+
+                with REGISTRY.timer("inference_seconds"):
+                    probabilities = serving_model.predict(sequences, batch_size=batch_size)
+                REGISTRY.inc("inference_samples_total", len(sequences))
+
+                # Top-5 accuracy needs 5 candidates even when fewer are stored
+                indices, scores = top_k(probabilities, max(top_k_size, 5))
+                predicted = indices[:, 0]
+
+                top1_correct += int((predicted == chunk_labels).sum())
+                top5_correct += int((indices[:, :5] == chunk_labels[:, None]).any(axis=1).sum())
+                np.add.at(confusion, (chunk_labels, predicted), 1)
+                scored += len(sequences)
+
+                rows = [
+                    (int(video_id), model_tag, rank + 1, int(class_id), glosses[class_id], float(score))
+                    for video_id, row_ids, row_scores in zip(chunk_ids, indices[:, :top_k_size],
+                                                             scores[:, :top_k_size])
+                    for rank, (class_id, score) in enumerate(zip(row_ids, row_scores))
+                ]
+                with REGISTRY.timer("db_round_trip_seconds", op="insert_predictions"):
+                    cursor.executemany("""
+                        INSERT INTO predictions
+                        (video_id, model_tag, rank_position, class_index, gloss, confidence)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                    """, rows)
+
+                elapsed = time.perf_counter() - start_time
+                print(f"   {scored}/{len(video_ids)} videos scored ({scored / elapsed:.0f} videos/s)")
+        finally:
+            # Unblock the producer if we stop early, then wait for it to close its connection
+            stop.set()
+            producer.join()
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        backend.close(connection, cursor)
+
+    return {
+        "videos": scored,
+        "accuracy": top1_correct / scored if scored else 0.0,
+        "top5_accuracy": top5_correct / scored if scored else 0.0,
+        "per_class_accuracy": per_class_accuracy(confusion),
+        "confusion": confusion,
+    }
+
+
+def save_results(results, glosses, output_dir):
+    """Save the confusion matrix (.npy) and per-class accuracy (.csv)."""
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, "confusion_matrix.npy"), results["confusion"])
+
+    support = results["confusion"].sum(axis=1)
+    with open(os.path.join(output_dir, "per_class_accuracy.csv"), 'w', encoding='utf-8') as f:
+        f.write("class_index,gloss,support,accuracy\n")
+        for i, (gloss, accuracy) in enumerate(zip(glosses, results["per_class_accuracy"])):
+            value = "" if np.isnan(accuracy) else f"{accuracy:.4f}"
+            f.write(f"{i},{gloss},{support[i]},{value}\n")
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch evaluation of the ASL model on the test split")
+    parser.add_argument("--weights", help="Trained weights (.weights.h5)")
+    parser.add_argument("--num-classes", type=int, default=DEFAULT_MODEL_CONFIG["num_classes"])
+    parser.add_argument("--tag", default="default", help="predictions.model_tag")
+    parser.add_argument("--split", default="test", choices=["train", "val", "test"])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--streams", nargs="+", help="Landmark streams of a multi-stream model")
+    parser.add_argument("--output-dir", default="evaluation_results")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ASL Model - Batch Evaluation")
+    print("=" * 60)
+
+    glosses = load_class_list()[:args.num_classes]
+    backend = get_backend(password=args.password)
+    serving_model = get_serving_model(
+        weights_path=args.weights, num_classes=args.num_classes, streams=args.streams
+    )
+
+    results = evaluate(
+        backend, serving_model, glosses, args.tag,
+        split=args.split,
+        top_k_size=args.top_k,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        streams=args.streams
+    )
+
+    print("\n" + "-" * 60)
+    print(f"Videos scored:  {results['videos']}")
+    print(f"Accuracy:       {results['accuracy']:.4f}")
+    print(f"Top-5 accuracy: {results['top5_accuracy']:.4f}")
+
+    accuracy = results["per_class_accuracy"]
+    evaluated = np.flatnonzero(~np.isnan(accuracy))
+    worst = evaluated[np.argsort(accuracy[evaluated])[:10]]
+    print("\nWorst classes:")
+    for i in worst:
+        print(f"  {glosses[i]:<20} {accuracy[i]:.3f}")
+
+    output_dir = os.path.join(args.output_dir, args.tag)
+    save_results(results, glosses, output_dir)
+    REGISTRY.summary()
+    print(f"\nResults saved to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+================================================================================
+RECONSTRUCTION RAPIDE DE LA BASE (BOOTSTRAP)
+Personne 1 : Base de données & Ingestion
+================================================================================
+Mode "from scratch" plus rapide que create_database.py + populate_database.py:
+
+  1. schéma   : tables créées SANS index secondaires ni clés étrangères
+  2. export   : words/videos générés en TSV (ids attribués côté client)
+  3. chargement: LOAD DATA LOCAL INFILE en parallèle (une connexion par table),
+                 ou INSERT par lots si local_infile est désactivé sur le serveur
+  4. index    : index et clés étrangères ajoutés après coup, un ALTER TABLE
+                 par table, tables traitées en parallèle
+  5. contrôle : les clés étrangères ayant été ajoutées avec
+                 foreign_key_checks = 0, MySQL ne les a pas vérifiées; on
+                 cherche explicitement les lignes orphelines (LEFT JOIN)
+  6. vues     : vues et procédures stockées de schema.sql
+
+Les mots présents plusieurs fois dans le JSON sont fusionnés comme dans
+populate_database.py: un seul id, toutes les vidéos rattachées, et le
+sample_count de la dernière occurrence (celui laissé par upsert_word).
+
+La durée de chaque phase est affichée à la fin.
+
+Usage:
+    python fast_bootstrap.py --json database/WLASL_v0.3.json --drop-existing
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from create_database import load_schema_sections
+from db_backend import MySQLBackend
+from populate_database import prepare_video_row
+from video_availability import AvailabilityIndex
+
+
+# Lignes de CREATE TABLE reportées à la phase d'indexation
+DEFERRED_DEFINITION = re.compile(r"^(INDEX|KEY|UNIQUE KEY|UNIQUE INDEX|FOREIGN KEY)\b", re.I)
+FOREIGN_KEY_CLAUSE = re.compile(r"^ADD FOREIGN KEY \((\w+)\) REFERENCES (\w+)\s*\((\w+)\)", re.I)
+
+WORD_COLUMNS = ("id", "gloss", "sample_count")
+VIDEO_COLUMNS = ("id", "word_id", "video_id", "video_url", "duration_sec", "fps",
+                 "signer_id", "split", "downloaded", "processed", "availability", "next_probe_at")
+
+# Tables reconstruites par le bootstrap (remplies depuis le JSON ou dépendant
+# des ids de videos); les autres tables de schema.sql (predictions,
+# sweep_trials, ...) sont seulement créées si elles manquent
+REBUILT_TABLES = ("words", "videos", "frames", "landmarks", "processing_logs")
+
+
+def split_create_table(statement):
+    """
+    Séparer un CREATE TABLE en DDL nue et définitions différées
+
+    Args:
+        statement: CREATE TABLE IF NOT EXISTS ... tel que dans schema.sql
+
+    Returns:
+        Tuple (nom de table, DDL sans index ni FK, liste de clauses ADD ...)
+    """
+    match = re.match(r"\s*CREATE TABLE IF NOT EXISTS (\w+) \((.*)\)([^)]*);\s*$", statement, re.S)
+    table, body, options = match.group(1), match.group(2), match.group(3)
+
+    kept, deferred = [], []
+    for line in body.split('\n'):
+        definition = line.strip().rstrip(',')
+        if not definition:
+            continue
+        if DEFERRED_DEFINITION.match(definition):
+            deferred.append(f"ADD {definition}")
+        else:
+            kept.append(definition)
+
+    ddl = f"CREATE TABLE {table} (\n    " + ",\n    ".join(kept) + f"\n){options}"
+    return table, ddl, deferred
+
+
+class FastBootstrap:
+    def __init__(self, host="localhost", user="root", password="", database="asl_recognition",
+                 schema_file="database/schema.sql", batch_size=5000, workers=4):
+        """
+        Initialiser le bootstrap
+
+        Args:
+            host: Hôte MySQL
+            user: Utilisateur MySQL
+            password: Mot de passe MySQL
+            database: Nom de la base de données
+            schema_file: Schéma de référence (database/schema.sql)
+            batch_size: Taille des lots pour le chargement sans LOAD DATA
+            workers: Nombre de connexions parallèles
+        """
+        self.backend = MySQLBackend(host=host, user=user, password=password,
+                                    database=database, allow_local_infile=True)
+        self.database = database
+        self.schema_file = schema_file
+        self.batch_size = batch_size
+        self.workers = workers
+        self.timings = {}
+
+    def _session(self):
+        """Connexion sans vérification des contraintes pour la durée du bootstrap"""
+        connection = self.backend.connect()
+        cursor = connection.cursor()
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+        return connection, cursor
+
+    def _timed(self, phase, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.timings[phase] = time.perf_counter() - start
+        print(f"   ✅ {phase}: {self.timings[phase]:.2f}s")
+        return result
+
+    # ------------------------------------------------------------------
+    # Phases
+    # ------------------------------------------------------------------
+
+    def create_bare_tables(self, drop_existing=False):
+        """
+        Phase 1: créer les tables sans index secondaires ni clés étrangères
+
+        Seules les tables de REBUILT_TABLES sont (re)construites; les autres
+        sont créées avec leur DDL complète si elles n'existent pas encore.
+
+        Raises:
+            RuntimeError si une table à reconstruire existe déjà et que
+            drop_existing est faux (vérifié avant toute modification)
+        """
+        commands, procedures = load_schema_sections(self.schema_file)
+        tables = {}
+        kept_tables = []
+        other_commands = []
+        for cmd in commands:
+            if cmd.lstrip().upper().startswith("CREATE TABLE"):
+                table, ddl, deferred = split_create_table(cmd)
+                if table in REBUILT_TABLES:
+                    tables[table] = (ddl, deferred)
+                else:
+                    kept_tables.append(cmd)
+            elif not cmd.lstrip().upper().startswith("CREATE DATABASE"):
+                other_commands.append(cmd)
+
+        # Créer la base si nécessaire (connexion sans base par défaut)
+        server = MySQLBackend(host=self.backend.host, user=self.backend.user,
+                              password=self.backend.password, database=None)
+        connection = server.connect()
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+        server.close(connection, cursor)
+
+        connection, cursor = self._session()
+        try:
+            existing = [table for table in tables if table in self.backend.list_tables(cursor)]
+            if existing and not drop_existing:
+                raise RuntimeError(
+                    f"Tables déjà présentes dans {self.database}: {', '.join(existing)} "
+                    f"(relancer avec --drop-existing pour les reconstruire)"
+                )
+            # Tables créées dans l'ordre de schema.sql, supprimées dans l'ordre inverse
+            for table in reversed(existing):
+                cursor.execute(f"DROP TABLE {table}")
+            for ddl, _ in tables.values():
+                cursor.execute(ddl)
+            for cmd in kept_tables:
+                cursor.execute(cmd)
+            connection.commit()
+        finally:
+            self.backend.close(connection, cursor)
+
+        deferred = {table: clauses for table, (_, clauses) in tables.items() if clauses}
+        return deferred, other_commands, procedures
+
+    def export_tsv(self, wlasl_data, directory):
+        """Phase 2: générer words.tsv et videos.tsv avec des ids attribués côté client"""
+        words_path = os.path.join(directory, "words.tsv")
+        videos_path = os.path.join(directory, "videos.tsv")
+        word_id = 0
+        video_pk = 0
+        availability = AvailabilityIndex.load()
+
+        # Même fusion que upsert_word: id de la première occurrence,
+        # sample_count de la dernière
+        words = {}
+        with open(videos_path, 'w', encoding='utf-8', newline='') as vf:
+            for entry in wlasl_data:
+                gloss = entry.get('gloss')
+                instances = entry.get('instances') or []
+                if not instances:
+                    continue
+                if gloss in words:
+                    gloss_id = words[gloss][0]
+                else:
+                    word_id += 1
+                    gloss_id = word_id
+                words[gloss] = (gloss_id, len(instances))
+
+                for idx, instance in enumerate(instances):
+                    video_pk += 1
+                    row = prepare_video_row(gloss, idx, instance)
+                    vf.write(_tsv_line((video_pk, gloss_id) + row + (0, 0) + availability.initial_columns(row[0])))
+
+        with open(words_path, 'w', encoding='utf-8', newline='') as wf:
+            for gloss, (gloss_id, sample_count) in words.items():
+                wf.write(_tsv_line((gloss_id, gloss, sample_count)))
+
+        print(f"      {len(words)} mots, {video_pk} vidéos")
+        return {"words": (words_path, WORD_COLUMNS), "videos": (videos_path, VIDEO_COLUMNS)}
+
+    def load_table(self, table, path, columns, use_load_data=True):
+        """Phase 3: charger un TSV dans une table (LOAD DATA ou INSERT par lots)"""
+        connection, cursor = self._session()
+        try:
+            if use_load_data:
+                try:
+                    cursor.execute(f"""
+                        LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+                        CHARACTER SET utf8mb4
+                        FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                        LINES TERMINATED BY '\\n'
+                        ({', '.join(columns)})
+                    """, (os.path.abspath(path),))
+                    connection.commit()
+                    return f"{table}: LOAD DATA ({cursor.rowcount} lignes)"
+                except self.backend.Error as e:
+                    print(f"   ⚠️  LOAD DATA indisponible pour {table} ({str(e)[:60]}), INSERT par lots")
+                    connection.rollback()
+
+            query = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join(['%s'] * len(columns))})")
+            total = 0
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                batch = []
+                for line in f:
+                    batch.append([_tsv_unescape(v) for v in line.rstrip('\n').split('\t')])
+                    if len(batch) >= self.batch_size:
+                        cursor.executemany(query, batch)
+                        connection.commit()
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    cursor.executemany(query, batch)
+                    connection.commit()
+                    total += len(batch)
+            return f"{table}: INSERT par lots ({total} lignes)"
+        finally:
+            self.backend.close(connection, cursor)
+
+    def load_all(self, tsv_files, use_load_data=True):
+        """Phase 3: charger toutes les tables en parallèle"""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(self.load_table, table, path, columns, use_load_data)
+                for table, (path, columns) in tsv_files.items()
+            ]
+            for future in futures:
+                print(f"      {future.result()}")
+
+    def add_table_indexes(self, table, clauses):
+        """Phase 4: ajouter index et clés étrangères d'une table en un seul ALTER"""
+        connection, cursor = self._session()
+        try:
+            cursor.execute(f"ALTER TABLE {table} {', '.join(clauses)}")
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+            return f"{table}: {len(clauses)} index/contraintes"
+        finally:
+            self.backend.close(connection, cursor)
+
+    def build_indexes(self, deferred):
+        """Phase 4: construire les index de toutes les tables en parallèle"""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(self.add_table_indexes, table, clauses)
+                for table, clauses in deferred.items()
+            ]
+            for future in futures:
+                print(f"      {future.result()}")
+
+    def check_foreign_keys(self, deferred):
+        """
+        Phase 5: chercher les lignes orphelines
+
+        ADD FOREIGN KEY avec foreign_key_checks = 0 ne vérifie pas les
+        lignes existantes; on le fait ici avant de déclarer la base prête.
+
+        Raises:
+            RuntimeError si une clé étrangère référence une ligne absente
+        """
+        connection = self.backend.connect()
+        cursor = connection.cursor()
+        orphans = []
+        try:
+            for table, clauses in deferred.items():
+                for clause in clauses:
+                    match = FOREIGN_KEY_CLAUSE.match(clause)
+                    if not match:
+                        continue
+                    column, parent, parent_column = match.groups()
+                    cursor.execute(f"""
+                        SELECT COUNT(*)
+                        FROM {table} c
+                        LEFT JOIN {parent} p ON c.{column} = p.{parent_column}
+                        WHERE c.{column} IS NOT NULL AND p.{parent_column} IS NULL
+                    """)
+                    count = cursor.fetchone()[0]
+                    print(f"      {table}.{column} -> {parent}.{parent_column}: {count} orphelines")
+                    if count:
+                        orphans.append(f"{table}.{column} ({count})")
+        finally:
+            self.backend.close(connection, cursor)
+
+        if orphans:
+            raise RuntimeError(f"Lignes orphelines: {', '.join(orphans)}")
+
+    def create_views_and_procedures(self, commands, procedures):
+        """Phase 6: vues et procédures stockées"""
+        connection = self.backend.connect()
+        cursor = connection.cursor()
+        for cmd in commands:
+            cursor.execute(cmd)
+        for proc in procedures:
+            name = re.search(r"CREATE PROCEDURE (\w+)", proc, re.I)
+            if name:
+                cursor.execute(f"DROP PROCEDURE IF EXISTS {name.group(1)}")
+            cursor.execute(proc)
+        connection.commit()
+        self.backend.close(connection, cursor)
+
+    # ------------------------------------------------------------------
+    # Orchestration
+    # ------------------------------------------------------------------
+
+    def run(self, wlasl_data, drop_existing=False, use_load_data=True):
+        """
+        Exécuter toutes les phases et afficher leur durée
+
+        Returns:
+            Dictionnaire {phase: secondes}
+        """
+        print(f"\n🚀 BOOTSTRAP RAPIDE - Base: {self.database}")
+        print("=" * 70)
+        total_start = time.perf_counter()
+
+        deferred, other_commands, procedures = self._timed(
+            "1. tables sans index", self.create_bare_tables, drop_existing)
+
+        with tempfile.TemporaryDirectory(prefix="asl_bootstrap_") as directory:
+            tsv_files = self._timed("2. export TSV", self.export_tsv, wlasl_data, directory)
+            self._timed("3. chargement", self.load_all, tsv_files, use_load_data)
+
+        self._timed("4. index et clés étrangères", self.build_indexes, deferred)
+        self._timed("5. contrôle des clés étrangères", self.check_foreign_keys, deferred)
+        self._timed("6. vues et procédures", self.create_views_and_procedures, other_commands, procedures)
+
+        self.timings["total"] = time.perf_counter() - total_start
+
+        print(f"\n⏱️  DURÉE PAR PHASE")
+        print("-" * 70)
+        for phase, seconds in self.timings.items():
+            print(f"   {phase:<32}{seconds:>10.2f}s")
+        return self.timings
+
+
+TSV_ESCAPES = {'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'}
+TSV_UNESCAPES = {'\\': '\\', 't': '\t', 'n': '\n', 'r': '\r', '0': '\0'}
+
+
+def _tsv_line(values):
+    """Formater une ligne au format LOAD DATA par défaut (NULL -> \\N, échappement par \\)"""
+    fields = []
+    for value in values:
+        if value is None:
+            fields.append('\\N')
+        elif isinstance(value, str):
+            fields.append(re.sub(r'[\\\t\n\r\0]', lambda m: TSV_ESCAPES[m.group(0)], value))
+        else:
+            fields.append(str(value))
+    return '\t'.join(fields) + '\n'
+
+
+def _tsv_unescape(field):
+    """Décoder un champ TSV (inverse de _tsv_line)"""
+    if field == '\\N':
+        return None
+    return re.sub(r'\\(.)', lambda m: TSV_UNESCAPES.get(m.group(1), m.group(1)), field)
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Reconstruction rapide de la base ASL")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    parser.add_argument("--database", default="asl_recognition")
+    parser.add_argument("--json", default="database/WLASL_v0.3.json", help="Fichier WLASL_v0.3.json")
+    parser.add_argument("--drop-existing", action="store_true", help="Supprimer les tables reconstruites si elles existent")
+    parser.add_argument("--no-load-data", action="store_true", help="Forcer les INSERT par lots")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with open(args.json, 'r', encoding='utf-8') as f:
+        wlasl_data = json.load(f)
+
+    bootstrap = FastBootstrap(
+        host=args.host,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        batch_size=args.batch_size,
+        workers=args.workers
+    )
+    bootstrap.run(wlasl_data, drop_existing=args.drop_existing, use_load_data=not args.no_load_data)
+
+
+if __name__ == "__main__":
+    main()
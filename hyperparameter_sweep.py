@@ -0,0 +1,395 @@
+"""
+ASL Sign Language Recognition - Hyperparameter sweep
+Person 4 - Model Architecture
+
+Searches the build_asl_model hyperparameters (cnn_filters, transformer_heads,
+transformer_dim, ff_dim, dropout_rate) and the learning rate with successive
+halving:
+
+  rung 0: every trial trains for `min_epochs` epochs
+  rung r: the best 1/eta trials of rung r-1 continue from their checkpoint
+          up to min_epochs * eta^r epochs in total; the others are stopped
+
+Trials run in a process pool ("spawn", one TensorFlow runtime per worker),
+each worker limited to `threads_per_trial` intra/inter-op threads so that
+workers don't oversubscribe the cores. The train/val landmark sequences are
+loaded from the database once and cached as .npy files; every trial opens
+them with mmap_mode='r', so all workers share the same page-cache copy.
+With --balanced, training batches are drawn by class_sampler (class-balanced,
+signer-stratified) instead of a uniform shuffle. With --nslt, the splits and
+labels come from the NSLT subset files (nslt_subsets) instead of the
+videos.split column; --num-classes must then be 100, 300, 1000 or 2000.
+
+Every (trial, rung) result is written to the `sweep_trials` table:
+
+    SELECT trial_id, rung, val_accuracy, config FROM sweep_trials
+    WHERE sweep_name = 'sweep_1' ORDER BY val_accuracy DESC;
+
+Usage:
+    python hyperparameter_sweep.py --name sweep_1 --trials 27 --workers 4 --num-classes 100
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from class_sampler import ClassBalancedSampler, fetch_video_signers, make_tf_dataset
+from db_backend import get_backend
+from evaluate_model import fetch_split_videos
+from landmark_dataset import fetch_landmark_sequences
+from model import DEFAULT_MODEL_CONFIG, load_class_list
+from nslt_subsets import fetch_nslt_split_videos, load_nslt_table
+
+
+SEARCH_SPACE = {
+    "cnn_filters": [[32, 64], [64, 128], [128, 256]],
+    "transformer_heads": [2, 4, 8],
+    "transformer_dim": [64, 128, 256],
+    "ff_dim": [128, 256, 512],
+    "dropout_rate": [0.1, 0.2, 0.3, 0.4],
+    "learning_rate": [3e-4, 1e-3, 3e-3],
+}
+
+SWEEP_CACHE_DIR = "sweep_cache"
+
+
+# =============================================================================
+# DATASET CACHE (prepared once, memory-mapped by every trial)
+# =============================================================================
+
+def prepare_dataset(backend, num_classes, cache_dir=SWEEP_CACHE_DIR, refresh=False,
+                    num_frames=DEFAULT_MODEL_CONFIG["num_frames"],
+                    num_landmarks=DEFAULT_MODEL_CONFIG["num_landmarks"], nslt=False):
+    """
+    Load the train/val splits from the database once and cache them as .npy.
+
+    With nslt=True, the videos of each split are those of nslt_<num_classes>.json.
+
+    Returns:
+        Dictionary {split: (x_path, y_path, signers_path)}
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    glosses = load_class_list()[:num_classes]
+    table = load_nslt_table() if nslt else None
+    tag = f"nslt{num_classes}" if nslt else f"{num_classes}c"
+    paths = {}
+    connection = None
+
+    for split in ("train", "val"):
+        prefix = os.path.join(cache_dir, f"{split}_{tag}_{num_frames}x{num_landmarks}")
+        x_path, y_path, signers_path = f"{prefix}_x.npy", f"{prefix}_y.npy", f"{prefix}_signers.npy"
+        paths[split] = (x_path, y_path, signers_path)
+        if not refresh and all(os.path.exists(path) for path in paths[split]):
+            continue
+
+        if connection is None:
+            connection = backend.connect()
+            cursor = backend.cursor(connection)
+        if nslt:
+            video_ids, labels, _ = fetch_nslt_split_videos(cursor, table, num_classes, split)
+        else:
+            video_ids, labels, _ = fetch_split_videos(cursor, glosses, split)
+        print(f"Caching {split}: {len(video_ids)} videos")
+
+        # Written chunk by chunk into a memory-mapped .npy: never fully in RAM
+        x = np.lib.format.open_memmap(
+            x_path + ".tmp", mode="w+", dtype=np.float32,
+            shape=(len(video_ids), num_frames, num_landmarks)
+        )
+        chunk_size = 2048
+        for start in range(0, len(video_ids), chunk_size):
+            chunk = video_ids[start:start + chunk_size].tolist()
+            x[start:start + len(chunk)] = fetch_landmark_sequences(cursor, chunk, num_frames, num_landmarks)
+        x.flush()
+        del x
+        os.replace(x_path + ".tmp", x_path)
+        np.save(y_path, labels.astype(np.int32))
+        np.save(signers_path, fetch_video_signers(cursor, video_ids))
+
+    if connection is not None:
+        backend.close(connection, cursor)
+    return paths
+
+
+def _batches(x, y, num_classes, batch_size, shuffle, seed=0):
+    """Yield (inputs, one-hot labels) batches from memory-mapped arrays, forever."""
+    rng = np.random.default_rng(seed)
+    eye = np.eye(num_classes, dtype=np.float32)
+    n = len(y)
+    while True:
+        order = rng.permutation(n) if shuffle else np.arange(n)
+        for start in range(0, n, batch_size):
+            # Sorted indices: sequential reads from the memory-mapped file
+            index = np.sort(order[start:start + batch_size])
+            yield np.asarray(x[index]), eye[y[index]]
+
+
+# =============================================================================
+# TRIAL (runs in a worker process)
+# =============================================================================
+
+def _init_worker(threads_per_trial):
+    """Limit the threads of each worker before TensorFlow is imported."""
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_trial)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads_per_trial)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_trial)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_trial(trial_id, config, num_classes, dataset_paths, initial_epoch, epochs,
+              checkpoint_path, batch_size=64, balanced=False):
+    """
+    Train one configuration for `epochs` more epochs and evaluate it on val.
+
+    Training resumes from checkpoint_path when it exists (previous rung): a
+    tf.train.Checkpoint prefix holding the weights and the optimizer state
+    (Adam moments and iteration count), so a promoted trial continues exactly
+    where its previous rung stopped.
+    With balanced=True, training batches come from a ClassBalancedSampler.
+
+    Returns:
+        Dictionary of results for the sweep_trials table
+    """
+    import tensorflow as tf
+    from model import build_asl_model, compile_model
+
+    start = time.perf_counter()
+    x_train = np.load(dataset_paths["train"][0], mmap_mode="r")
+    y_train = np.load(dataset_paths["train"][1], mmap_mode="r")
+    x_val = np.load(dataset_paths["val"][0], mmap_mode="r")
+    y_val = np.load(dataset_paths["val"][1], mmap_mode="r")
+
+    model_config = {key: value for key, value in config.items() if key != "learning_rate"}
+    model = build_asl_model(
+        num_frames=x_train.shape[1],
+        num_landmarks=x_train.shape[2],
+        num_classes=num_classes,
+        **model_config
+    )
+    model = compile_model(model, learning_rate=config["learning_rate"])
+    checkpoint = tf.train.Checkpoint(model=model, optimizer=model.optimizer)
+    if initial_epoch > 0 and os.path.exists(checkpoint_path + ".index"):
+        # Optimizer slots must exist before they can be restored
+        model.optimizer.build(model.trainable_variables)
+        checkpoint.read(checkpoint_path).assert_existing_objects_matched()
+
+    steps = max(1, -(-len(y_train) // batch_size))
+    val_steps = max(1, -(-len(y_val) // batch_size))
+    if balanced:
+        signers = np.load(dataset_paths["train"][2])
+        sampler = ClassBalancedSampler(y_train, signers, num_classes, seed=trial_id + initial_epoch)
+        # tf.data pipeline: gathers from the memory-mapped cache run in parallel and are prefetched
+        train_batches = make_tf_dataset(x_train, y_train, sampler, num_classes, batch_size)
+    else:
+        train_batches = _batches(x_train, y_train, num_classes, batch_size, shuffle=True, seed=trial_id)
+    model.fit(
+        train_batches,
+        steps_per_epoch=steps,
+        initial_epoch=initial_epoch,
+        epochs=initial_epoch + epochs,
+        verbose=0
+    )
+    checkpoint.write(checkpoint_path)
+
+    val_loss, val_accuracy, val_top5 = model.evaluate(
+        _batches(x_val, y_val, num_classes, batch_size, shuffle=False),
+        steps=val_steps,
+        verbose=0
+    )
+    return {
+        "trial_id": trial_id,
+        "epochs": initial_epoch + epochs,
+        "val_loss": float(val_loss),
+        "val_accuracy": float(val_accuracy),
+        "val_top5_accuracy": float(val_top5),
+        "train_seconds": time.perf_counter() - start,
+    }
+
+
+# =============================================================================
+# SWEEP (successive halving)
+# =============================================================================
+
+def sample_configs(num_trials, search_space=SEARCH_SPACE, seed=0):
+    """Draw distinct random configurations from the search space."""
+    rng = random.Random(seed)
+    configs, seen = [], set()
+    for _ in range(num_trials * 20):
+        if len(configs) == num_trials:
+            break
+        config = {key: rng.choice(values) for key, values in search_space.items()}
+        if config["transformer_dim"] % config["transformer_heads"]:
+            continue
+        key = json.dumps(config, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def _record_trial(cursor, connection, sweep_name, trial_id, rung, config, result=None, status="success", error=None):
+    """Insert one (trial, rung) row into sweep_trials."""
+    result = result or {}
+    cursor.execute("""
+        INSERT INTO sweep_trials
+        (sweep_name, trial_id, rung, epochs, config, val_accuracy, val_top5_accuracy,
+         val_loss, train_seconds, status, error_message)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (
+        sweep_name, trial_id, rung, result.get("epochs", 0), json.dumps(config),
+        result.get("val_accuracy"), result.get("val_top5_accuracy"), result.get("val_loss"),
+        result.get("train_seconds"), status, error
+    ))
+    connection.commit()
+
+
+def run_sweep(backend, sweep_name, num_trials=27, num_classes=DEFAULT_MODEL_CONFIG["num_classes"],
+              workers=None, threads_per_trial=None, min_epochs=2, eta=3, max_rungs=3,
+              batch_size=64, seed=0, refresh_data=False, cache_dir=SWEEP_CACHE_DIR, balanced=False,
+              nslt=False):
+    """
+    Run a successive-halving sweep and record every trial in sweep_trials.
+
+    Args:
+        backend: Storage backend (db_backend)
+        sweep_name: Name stored in sweep_trials.sweep_name
+        num_trials: Number of configurations in rung 0
+        num_classes: Number of classes (first classes of wlasl_class_list.txt)
+        workers: Parallel trials (default: cores // threads_per_trial)
+        threads_per_trial: TensorFlow threads per trial (default: 2)
+        min_epochs: Epochs of rung 0
+        eta: Keep 1/eta of the trials at each rung (budget grows by eta)
+        max_rungs: Maximum number of rungs
+        balanced: Train on class-balanced, signer-stratified batches
+        nslt: Take the splits from nslt_<num_classes>.json
+
+    Returns:
+        List of (trial_id, config, val_accuracy) of the final rung, best first
+    """
+    cores = os.cpu_count() or 1
+    threads_per_trial = threads_per_trial or min(2, cores)
+    workers = workers or max(1, cores // threads_per_trial)
+
+    print("=" * 60)
+    print(f"Hyperparameter sweep '{sweep_name}': {num_trials} trials, "
+          f"{workers} workers x {threads_per_trial} threads")
+    print("=" * 60)
+
+    dataset_paths = prepare_dataset(backend, num_classes, cache_dir, refresh_data, nslt=nslt)
+    checkpoint_dir = os.path.join(cache_dir, sweep_name)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    cursor.execute("DELETE FROM sweep_trials WHERE sweep_name = %s", (sweep_name,))
+    connection.commit()
+
+    configs = sample_configs(num_trials, seed=seed)
+    survivors = list(range(len(configs)))
+    trained_epochs = {trial_id: 0 for trial_id in survivors}
+    scores = {}
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads_per_trial,)) as pool:
+        for rung in range(max_rungs):
+            if not survivors:
+                break
+            budget = min_epochs * eta ** rung - trained_epochs[survivors[0]]
+            print(f"\nRung {rung}: {len(survivors)} trials, +{budget} epochs")
+
+            futures = {
+                pool.submit(
+                    run_trial, trial_id, configs[trial_id], num_classes, dataset_paths,
+                    trained_epochs[trial_id], budget,
+                    os.path.join(checkpoint_dir, f"trial_{trial_id}"), batch_size, balanced
+                ): trial_id
+                for trial_id in survivors
+            }
+            scores = {}
+            for future in as_completed(futures):
+                trial_id = futures[future]
+                config = configs[trial_id]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"   trial {trial_id}: failed ({e})")
+                    _record_trial(cursor, connection, sweep_name, trial_id, rung, config,
+                                  status="failed", error=str(e)[:1000])
+                    continue
+                trained_epochs[trial_id] = result["epochs"]
+                scores[trial_id] = result["val_accuracy"]
+                _record_trial(cursor, connection, sweep_name, trial_id, rung, config, result)
+                print(f"   trial {trial_id}: val_accuracy={result['val_accuracy']:.4f} "
+                      f"({result['train_seconds']:.0f}s)")
+
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            if rung == max_rungs - 1 or len(ranked) <= 1:
+                survivors = ranked
+                break
+            keep = max(1, len(ranked) // eta)
+            # Trials that don't make the cut: their last row is marked 'stopped'
+            cursor.executemany(
+                "UPDATE sweep_trials SET status = 'stopped' WHERE sweep_name = %s AND trial_id = %s AND rung = %s",
+                [(sweep_name, trial_id, rung) for trial_id in ranked[keep:]]
+            )
+            connection.commit()
+            survivors = ranked[:keep]
+
+    backend.close(connection, cursor)
+
+    final = [(trial_id, configs[trial_id], scores[trial_id]) for trial_id in survivors]
+    print("\nBest configurations:")
+    for trial_id, config, accuracy in final[:5]:
+        print(f"  trial {trial_id}: {accuracy:.4f} {config}")
+    return final
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving sweep over build_asl_model")
+    parser.add_argument("--name", default="sweep", help="sweep_trials.sweep_name")
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--num-classes", type=int, default=DEFAULT_MODEL_CONFIG["num_classes"])
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--threads-per-trial", type=int)
+    parser.add_argument("--min-epochs", type=int, default=2)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--rungs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--refresh-data", action="store_true", help="Rebuild the cached dataset")
+    parser.add_argument("--balanced", action="store_true", help="Class-balanced, signer-stratified batches")
+    parser.add_argument("--nslt", action="store_true", help="Splits and labels from nslt_<num-classes>.json")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    args = parser.parse_args()
+
+    run_sweep(
+        get_backend(password=args.password),
+        args.name,
+        num_trials=args.trials,
+        num_classes=args.num_classes,
+        workers=args.workers,
+        threads_per_trial=args.threads_per_trial,
+        min_epochs=args.min_epochs,
+        eta=args.eta,
+        max_rungs=args.rungs,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        refresh_data=args.refresh_data,
+        balanced=args.balanced,
+        nslt=args.nslt
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+================================================================================
+CHARGEMENT DES SÉQUENCES DE LANDMARKS
+================================================================================
+Transforme les lignes frames/landmarks d'une vidéo en un tableau
+(num_frames, num_landmarks) prêt pour model.build_asl_model.
+
+Format accepté pour landmarks.landmark_data (JSON):
+  - liste plate de valeurs              [x0, y0, z0, x1, ...]
+  - liste de points                     [[x, y, z], ...]
+  - liste de mains                      [[[x, y, z] * 21], ...]
+Les valeurs sont aplaties dans cet ordre, tronquées ou complétées par des
+zéros à num_landmarks. Les séquences sont rééchantillonnées uniformément à
+num_frames (frames répétées si la vidéo est plus courte).
+
+Flux multiples (modèle multi-flux, model.build_asl_model(streams=...)):
+landmark_data peut aussi être un objet MediaPipe Holistic
+    {"left_hand": [...], "right_hand": [...], "pose": [...], "face": [...]}
+Chaque flux est aplati à sa taille (LANDMARK_STREAMS) et les flux sont
+concaténés dans l'ordre demandé; un flux absent reste à zéro, ce que le
+modèle interprète comme "non détecté". Pour le visage, seul le sous-ensemble
+FACE_SUBSET (contour des lèvres) est conservé sur les 468 points.
+
+Après partition_maintenance.py migrate, landmarks a une colonne video_id:
+la jointure porte alors aussi sur l.video_id = f.video_id pour que MySQL
+n'ouvre que les partitions des vidéos demandées.
+"""
+
+import json
+
+import numpy as np
+
+from db_backend import table_columns
+from metrics import REGISTRY
+
+# Nombre de valeurs (points × 3 coordonnées) par flux
+LANDMARK_STREAMS = {
+    "left_hand": 21 * 3,
+    "right_hand": 21 * 3,
+    "pose": 33 * 3,
+    "face": 40 * 3,
+}
+
+# Indices du maillage facial MediaPipe conservés (lèvres)
+FACE_SUBSET = [
+    61, 185, 40, 39, 37, 0, 267, 269, 270, 409,
+    291, 146, 91, 181, 84, 17, 314, 405, 321, 375,
+    78, 191, 80, 81, 82, 13, 312, 311, 310, 415,
+    95, 88, 178, 87, 14, 317, 402, 318, 324, 308,
+]
+
+
+def flatten_landmarks(landmark_data, num_landmarks=63):
+    """
+    Aplatir le JSON d'une frame en un vecteur de taille fixe
+
+    Args:
+        landmark_data: Chaîne JSON ou liste (éventuellement imbriquée)
+        num_landmarks: Taille du vecteur retourné
+
+    Returns:
+        np.ndarray float32 de forme (num_landmarks,)
+    """
+    values = np.zeros(num_landmarks, dtype=np.float32)
+    if landmark_data is None:
+        return values
+    if isinstance(landmark_data, (str, bytes)):
+        landmark_data = json.loads(landmark_data)
+
+    try:
+        flat = np.asarray(landmark_data, dtype=np.float32).ravel()
+    except ValueError:
+        # Listes irrégulières (ex: une main de 21 points et une vide)
+        flat = np.asarray(list(_iter_values(landmark_data)), dtype=np.float32)
+
+    n = min(num_landmarks, flat.size)
+    values[:n] = flat[:n]
+    return values
+
+
+def _iter_values(data):
+    for item in data:
+        if isinstance(item, (list, tuple)):
+            yield from _iter_values(item)
+        else:
+            yield item
+
+
+def stream_layout(streams):
+    """
+    Position de chaque flux dans le vecteur concaténé
+
+    Returns:
+        Liste de (nom, début, fin), et la taille totale
+    """
+    layout, offset = [], 0
+    for name in streams:
+        if name not in LANDMARK_STREAMS:
+            raise ValueError(f"Flux inconnu: {name} (attendu: {', '.join(LANDMARK_STREAMS)})")
+        layout.append((name, offset, offset + LANDMARK_STREAMS[name]))
+        offset += LANDMARK_STREAMS[name]
+    return layout, offset
+
+
+def flatten_stream_landmarks(landmark_data, streams):
+    """
+    Aplatir le JSON d'une frame en concaténant plusieurs flux
+
+    Args:
+        landmark_data: Objet Holistic {flux: points} (chaîne JSON ou dict),
+            ou ancien format mains seulement (liste), réparti sur les flux
+            de mains en tête de `streams`
+        streams: Liste ordonnée de noms de LANDMARK_STREAMS
+
+    Returns:
+        np.ndarray float32 de forme (somme des tailles des flux,)
+    """
+    layout, total = stream_layout(streams)
+    if isinstance(landmark_data, (str, bytes)):
+        landmark_data = json.loads(landmark_data)
+    if not isinstance(landmark_data, dict):
+        # Ancien format: mains à la suite, dans les premiers flux
+        values = np.zeros(total, dtype=np.float32)
+        hands_end = 0
+        for name, _, end in layout:
+            if not name.endswith("_hand"):
+                break
+            hands_end = end
+        values[:hands_end] = flatten_landmarks(landmark_data, hands_end)
+        return values
+
+    values = np.zeros(total, dtype=np.float32)
+    for name, start, end in layout:
+        points = landmark_data.get(name)
+        if not points:
+            continue
+        if name == "face" and len(points) > len(FACE_SUBSET):
+            points = [points[i] for i in FACE_SUBSET]
+        values[start:end] = flatten_landmarks(points, end - start)
+    return values
+
+
+def sample_frame_indices(num_available, num_frames):
+    """Indices de num_frames frames réparties uniformément parmi num_available"""
+    if num_available <= 0:
+        return np.zeros(num_frames, dtype=np.int64)
+    return np.linspace(0, num_available - 1, num_frames).round().astype(np.int64)
+
+
+def fetch_landmark_sequences(cursor, video_ids, num_frames=30, num_landmarks=63, chunk_size=500,
+                             streams=None):
+    """
+    Charger les séquences de landmarks de plusieurs vidéos
+
+    Les vidéos sont lues par paquets de chunk_size avec une seule requête
+    par paquet (pas de requête par vidéo).
+
+    Args:
+        cursor: Curseur de la base (MySQL ou backend de db_backend)
+        video_ids: Liste de videos.id
+        num_frames: Nombre de frames par séquence
+        num_landmarks: Nombre de valeurs par frame
+        chunk_size: Nombre de vidéos par requête
+        streams: Liste de flux (LANDMARK_STREAMS) à concaténer; num_landmarks
+            est alors la somme de leurs tailles
+
+    Returns:
+        np.ndarray float32 de forme (len(video_ids), num_frames, num_landmarks),
+        dans l'ordre de video_ids. Une vidéo sans landmarks donne des zéros.
+    """
+    video_ids = list(video_ids)
+    if streams:
+        num_landmarks = stream_layout(streams)[1]
+
+    def flatten(data):
+        if streams:
+            return flatten_stream_landmarks(data, streams)
+        return flatten_landmarks(data, num_landmarks)
+
+    sequences = np.zeros((len(video_ids), num_frames, num_landmarks), dtype=np.float32)
+    position = {video_id: i for i, video_id in enumerate(video_ids)}
+    # Élagage des partitions de landmarks (table partitionnée par video_id)
+    join = "l.frame_id = f.id"
+    if "video_id" in table_columns(cursor, "landmarks"):
+        join = "l.video_id = f.video_id AND l.frame_id = f.id"
+
+    for start in range(0, len(video_ids), chunk_size):
+        chunk = video_ids[start:start + chunk_size]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        with REGISTRY.timer("db_round_trip_seconds", op="fetch_landmarks"):
+            cursor.execute(f"""
+                SELECT f.video_id, l.landmark_data
+                FROM frames f
+                JOIN landmarks l ON {join}
+                WHERE f.video_id IN ({placeholders})
+                ORDER BY f.video_id, f.frame_number
+            """, tuple(chunk))
+            rows = cursor.fetchall()
+
+        with REGISTRY.timer("landmark_decode_seconds"):
+            frames_by_video = {}
+            for video_id, landmark_data in rows:
+                frames_by_video.setdefault(video_id, []).append(landmark_data)
+
+            for video_id, frames in frames_by_video.items():
+                indices = sample_frame_indices(len(frames), num_frames)
+                sequences[position[video_id]] = np.stack(
+                    [flatten(frames[i]) for i in indices]
+                )
+        REGISTRY.inc("landmark_sequences_loaded_total", len(chunk))
+
+    return sequences
@@ -0,0 +1,337 @@
+"""
+ASL Sign Language Recognition - Compact metadata index
+Person 4 - Model Architecture
+
+WLASL metadata as parallel NumPy columns instead of one dict per instance:
+
+    video_id     S<n>     WLASL video id (bytes)
+    db_id        int64    videos.id (-1 when built from the JSON)
+    word         int32    index into the interned gloss table
+    split        int8     0 train, 1 val, 2 test, -1 unknown
+    fps          int16
+    frame_start  int32    -1 when unknown
+    frame_end    int32    -1 when unknown
+    signer       int32    -1 when unknown
+    by_video_id  int64    row permutation sorted by video_id (lookups)
+
+Each gloss is stored once (UTF-8 bytes + offsets). About 30 bytes per video
+instead of ~1 KB of Python dicts.
+
+save() writes everything into ONE file:
+
+    magic (8 bytes) | header length (8 bytes) | JSON header | columns
+
+with every column aligned on 64 bytes. load() memory-maps the file
+read-only and returns views into it: forked data-loader workers share the
+same page-cache pages and nothing is copied or unpickled. The format is
+implemented by write_column_file / read_column_file (also used by
+nslt_subsets).
+
+Usage:
+    python metadata_index.py --json database/WLASL_v0.3.json --output metadata.idx
+    python metadata_index.py --from-db --output metadata.idx
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+MAGIC = b"ASLCOL02"
+ALIGNMENT = 64
+SPLITS = ("train", "val", "test")
+
+
+def _split_code(split):
+    return SPLITS.index(split) if split in SPLITS else -1
+
+
+def _or(value, default):
+    return default if value is None else value
+
+
+class MetadataIndex:
+    """Parallel-array metadata of every video, with an interned gloss table."""
+
+    def __init__(self, columns, glosses):
+        """
+        Args:
+            columns: Dictionary {name: np.ndarray}, all of the same length
+            glosses: Either a list of str, or a (bytes, offsets) pair of arrays
+        """
+        self.columns = columns
+        if isinstance(glosses, tuple):
+            self._gloss_bytes, self._gloss_offsets = glosses
+            self._glosses = None
+        else:
+            encoded = [g.encode("utf-8") for g in glosses]
+            self._gloss_bytes = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+            self._gloss_offsets = np.concatenate([[0], np.cumsum([len(e) for e in encoded])]).astype(np.int64)
+            self._glosses = list(glosses)
+        self._gloss_ids = None
+        self._sorted_video_ids = None
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get("columns", {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.columns["word"])
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def _build(cls, rows, glosses):
+        video_ids = [row[0] for row in rows]
+        width = max([len(v) for v in video_ids] + [1])
+        columns = {
+            "video_id": np.array(video_ids, dtype=f"S{width}"),
+            "db_id": np.array([row[1] for row in rows], dtype=np.int64),
+            "word": np.array([row[2] for row in rows], dtype=np.int32),
+            "split": np.array([row[3] for row in rows], dtype=np.int8),
+            "fps": np.array([row[4] for row in rows], dtype=np.int16),
+            "frame_start": np.array([row[5] for row in rows], dtype=np.int32),
+            "frame_end": np.array([row[6] for row in rows], dtype=np.int32),
+            "signer": np.array([row[7] for row in rows], dtype=np.int32),
+        }
+        columns["by_video_id"] = np.argsort(columns["video_id"], kind="stable").astype(np.int64)
+        return cls(columns, glosses)
+
+    @classmethod
+    def from_wlasl(cls, wlasl_data):
+        """
+        Build from parsed WLASL_v0.3.json ([{gloss, instances}, ...]).
+
+        A gloss listed several times gets one word id, as in the database
+        (populate_database upserts words).
+        """
+        word_ids, rows = {}, []
+        for entry in wlasl_data:
+            instances = entry.get("instances") or []
+            if not instances:
+                continue
+            word = word_ids.setdefault(entry["gloss"], len(word_ids))
+            for idx, instance in enumerate(instances):
+                rows.append((
+                    str(instance.get("video_id", f"{entry['gloss']}_{idx}")).encode("utf-8"),
+                    -1,
+                    word,
+                    _split_code(instance.get("split")),
+                    _or(instance.get("fps"), 0),
+                    _or(instance.get("frame_start"), -1),
+                    _or(instance.get("frame_end"), -1),
+                    _or(instance.get("signer_id"), -1),
+                ))
+        return cls._build(rows, list(word_ids))
+
+    @classmethod
+    def from_database(cls, cursor):
+        """Build from the words/videos tables (frame ranges are not stored there)."""
+        cursor.execute("SELECT id, gloss FROM words ORDER BY id")
+        word_ids = {}
+        glosses = []
+        for word_id, gloss in cursor.fetchall():
+            word_ids[word_id] = len(glosses)
+            glosses.append(gloss)
+
+        cursor.execute("SELECT id, video_id, word_id, split, fps, signer_id FROM videos ORDER BY id")
+        rows = [
+            (str(_or(video_id, "")).encode("utf-8"), db_id, word_ids[word_id], _split_code(split),
+             _or(fps, 0), -1, -1, _or(signer_id, -1))
+            for db_id, video_id, word_id, split, fps, signer_id in cursor.fetchall()
+        ]
+        return cls._build(rows, glosses)
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    @property
+    def glosses(self):
+        """Gloss table (decoded on first access)."""
+        if self._glosses is None:
+            data = bytes(self._gloss_bytes)
+            offsets = self._gloss_offsets
+            self._glosses = [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        return self._glosses
+
+    @property
+    def gloss_ids(self):
+        """Dictionary {gloss: index in the gloss table}."""
+        if self._gloss_ids is None:
+            self._gloss_ids = {g: i for i, g in enumerate(self.glosses)}
+        return self._gloss_ids
+
+    def gloss_id(self, gloss):
+        """Index of a gloss in the gloss table (KeyError if absent)."""
+        return self.gloss_ids[gloss]
+
+    def find(self, video_ids):
+        """
+        Row of each WLASL video id (-1 when absent), by binary search.
+
+        Args:
+            video_ids: str or list of str
+        """
+        single = isinstance(video_ids, (str, bytes))
+        values = [video_ids] if single else list(video_ids)
+        # Ids longer than the column width cannot be present (and would be truncated)
+        fits = np.array([len(v) <= self.video_id.dtype.itemsize for v in values], dtype=bool)
+        keys = np.array([v if ok else "" for v, ok in zip(values, fits)], dtype=self.video_id.dtype)
+        if len(self) == 0:
+            return -1 if single else np.full(len(keys), -1, dtype=np.int64)
+        if self._sorted_video_ids is None:
+            # Gathered once per index, not on every lookup
+            self._sorted_video_ids = self.video_id[self.by_video_id]
+        sorted_ids = self._sorted_video_ids
+        position = np.searchsorted(sorted_ids, keys)
+        position = np.minimum(position, len(sorted_ids) - 1)
+        found = (sorted_ids[position] == keys) & fits
+        rows = np.where(found, self.by_video_id[position], -1)
+        return int(rows[0]) if single else rows
+
+    def mask(self, split=None, glosses=None):
+        """Boolean row mask for a split ('train'/'val'/'test') and/or a gloss list."""
+        selected = np.ones(len(self), dtype=bool)
+        if split is not None:
+            selected &= self.split == _split_code(split)
+        if glosses is not None:
+            word_ids = [self.gloss_ids[g] for g in glosses if g in self.gloss_ids]
+            selected &= np.isin(self.word, word_ids)
+        return selected
+
+    def record(self, row):
+        """One row as a dictionary (debugging / display)."""
+        record = {name: column[row].item() for name, column in self.columns.items() if name != "by_video_id"}
+        record["video_id"] = record["video_id"].decode("utf-8")
+        record["gloss"] = self.glosses[record["word"]]
+        record["split"] = SPLITS[record["split"]] if record["split"] >= 0 else None
+        return record
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.columns.values()) + self._gloss_bytes.nbytes + self._gloss_offsets.nbytes
+
+    # ------------------------------------------------------------------
+    # Single-file serialization
+    # ------------------------------------------------------------------
+
+    def save(self, path):
+        """Write the index into one file (atomic rename)."""
+        arrays = dict(self.columns, _gloss_bytes=self._gloss_bytes, _gloss_offsets=self._gloss_offsets)
+        write_column_file(path, arrays, {"rows": len(self)})
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved index (read-only, shared between processes)."""
+        arrays, _ = read_column_file(path)
+        glosses = (arrays.pop("_gloss_bytes"), arrays.pop("_gloss_offsets"))
+        return cls(arrays, glosses)
+
+
+# =============================================================================
+# COLUMN FILE (shared with nslt_subsets)
+# =============================================================================
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_column_file(path, arrays, meta=None):
+    """
+    Write named arrays into one file: magic, JSON header, 64-byte aligned data.
+
+    Args:
+        path: Output file (written to path.tmp, then renamed)
+        arrays: Dictionary {name: np.ndarray}
+        meta: JSON-serializable values stored in the header
+    """
+    # Header offsets are relative to the start of the data section
+    entries, offset = [], 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        entries.append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": offset})
+        offset += array.nbytes
+    header = json.dumps({"meta": meta or {}, "columns": entries}).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for entry, array in zip(entries, arrays.values()):
+            f.seek(data_start + entry["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_column_header(path):
+    """Header of a column file: (meta, column entries, data start offset)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a column file (unknown format, rebuild it)")
+        header_length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_length))
+    return header["meta"], header["columns"], _align(len(MAGIC) + 8 + header_length)
+
+
+def read_column_file(path):
+    """
+    Memory-map a column file read-only.
+
+    Returns:
+        (arrays, meta): arrays are views into one shared np.memmap
+    """
+    meta, entries, data_start = read_column_header(path)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    for entry in entries:
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"])) if entry["shape"] else 1
+        arrays[entry["name"]] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + entry["offset"]
+        ).reshape(entry["shape"])
+    return arrays, meta
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the compact WLASL metadata index")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--json", help="WLASL_v0.3.json")
+    source.add_argument("--from-db", action="store_true", help="Read words/videos from the database")
+    parser.add_argument("--output", default="metadata.idx")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    args = parser.parse_args()
+
+    if args.json:
+        with open(args.json, "r", encoding="utf-8") as f:
+            index = MetadataIndex.from_wlasl(json.load(f))
+    else:
+        from db_backend import get_backend
+        backend = get_backend(password=args.password)
+        connection = backend.connect()
+        cursor = backend.cursor(connection)
+        try:
+            index = MetadataIndex.from_database(cursor)
+        finally:
+            backend.close(connection, cursor)
+
+    index.save(args.output)
+    print(f"{len(index)} videos, {len(index.glosses)} glosses, "
+          f"{index.nbytes / 1024:.0f} KiB -> {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB)")
+    for split in SPLITS:
+        print(f"  {split:<6} {int(index.mask(split=split).sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+================================================================================
+INSTRUMENTATION : TIMERS, COMPTEURS ET EXPORT DES MÉTRIQUES
+================================================================================
+Registre de métriques léger (sans dépendance) pour voir où passe le temps
+d'une exécution réelle: allers-retours base de données, commits de lots,
+téléchargements, extraction de landmarks, inférence.
+
+    from metrics import REGISTRY
+
+    with REGISTRY.timer("db_round_trip_seconds", op="insert_video"):
+        cursor.execute(...)
+    REGISTRY.inc("videos_inserted_total")
+
+    REGISTRY.export("metrics.prom")    # format texte Prometheus
+    REGISTRY.export("metrics.jsonl")   # une ligne JSON par série
+
+track_video() enregistre en plus la durée de traitement d'une vidéo dans
+processing_logs (status success/failed, processing_time_sec).
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+METRIC_PREFIX = "asl_"
+
+
+def _series_key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class MetricsRegistry:
+    """
+    Compteurs et durées, agrégés par (nom, labels)
+
+    Les durées sont agrégées en nombre / somme / max (type summary
+    Prometheus); rien n'est conservé par événement, le coût par mesure reste
+    constant quelle que soit la durée de l'exécution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {}
+
+    def inc(self, name, value=1, **labels):
+        """Incrémenter un compteur"""
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Enregistrer une durée en secondes"""
+        key = _series_key(name, labels)
+        with self._lock:
+            stats = self._timers.get(key)
+            if stats is None:
+                self._timers[key] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Mesurer la durée du bloc `with`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def track_video(self, cursor, video_id, stage="processing"):
+        """
+        Mesurer le traitement d'une vidéo et l'écrire dans processing_logs
+
+        Une ligne success (ou failed avec le message d'erreur) est insérée
+        avec processing_time_sec. L'exception éventuelle est propagée; le
+        commit reste à la charge de l'appelant.
+
+        Args:
+            cursor: Curseur de la base (paramètres %s)
+            video_id: videos.id
+            stage: Nom de l'étape (label des métriques, processing_logs.stage)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            self.observe("video_stage_seconds", seconds, stage=stage, status="failed")
+            self.inc("video_stage_total", stage=stage, status="failed")
+            log_processing(cursor, video_id, "failed", seconds, str(e)[:1000], stage=stage)
+            raise
+        else:
+            seconds = time.perf_counter() - start
+            self.observe("video_stage_seconds", seconds, stage=stage, status="success")
+            self.inc("video_stage_total", stage=stage, status="success")
+            log_processing(cursor, video_id, "success", seconds, stage=stage)
+
+    def reset(self):
+        """Vider le registre"""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def snapshot(self):
+        """Copie des séries: liste de dictionnaires {name, type, labels, ...}"""
+        with self._lock:
+            series = [
+                {"name": name, "type": "counter", "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+            series.extend(
+                {"name": name, "type": "summary", "labels": dict(labels),
+                 "count": count, "sum": total, "max": maximum}
+                for (name, labels), (count, total, maximum) in self._timers.items()
+            )
+        return series
+
+    def to_prometheus(self):
+        """Exporter au format texte Prometheus"""
+        lines = []
+        families = {}
+        for series in self.snapshot():
+            families.setdefault((series["name"], series["type"]), []).append(series)
+
+        for (name, metric_type), members in sorted(families.items()):
+            full_name = METRIC_PREFIX + name
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            for series in members:
+                labels = _format_labels(sorted(series["labels"].items()))
+                if metric_type == "counter":
+                    lines.append(f"{full_name}{labels} {series['value']}")
+                else:
+                    lines.append(f"{full_name}_count{labels} {series['count']}")
+                    lines.append(f"{full_name}_sum{labels} {series['sum']:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self):
+        """Exporter en JSON lines (une série par ligne, horodatée)"""
+        timestamp = time.time()
+        return "".join(
+            json.dumps(dict(series, timestamp=timestamp)) + "\n" for series in self.snapshot()
+        )
+
+    def export(self, path):
+        """Écrire les métriques dans un fichier (.prom: Prometheus, sinon JSON lines)"""
+        if path.endswith(".prom"):
+            content, mode = self.to_prometheus(), 'w'
+        else:
+            content, mode = self.to_json_lines(), 'a'
+        with open(path, mode, encoding='utf-8') as f:
+            f.write(content)
+
+    def summary(self, top=10):
+        """Afficher les durées cumulées les plus importantes"""
+        timers = [s for s in self.snapshot() if s["type"] == "summary"]
+        timers.sort(key=lambda s: s["sum"], reverse=True)
+        print(f"\n⏱️  TEMPS CUMULÉ PAR OPÉRATION")
+        print("-" * 70)
+        for series in timers[:top]:
+            labels = ",".join(f"{k}={v}" for k, v in sorted(series["labels"].items()))
+            name = f"{series['name']}[{labels}]" if labels else series["name"]
+            mean_ms = series["sum"] / series["count"] * 1000
+            print(f"   {name:<50} {series['sum']:>9.2f}s  n={series['count']:<7} moy={mean_ms:.2f}ms")
+
+
+def log_processing(cursor, video_id, status, processing_time_sec=None, error_message=None,
+                   stage="processing"):
+    """
+    Insérer une ligne dans processing_logs
+
+    Args:
+        cursor: Curseur de la base (paramètres %s)
+        video_id: videos.id
+        status: 'pending', 'downloading', 'success' ou 'failed'
+        processing_time_sec: Durée du traitement
+        error_message: Message d'erreur éventuel
+        stage: Étape du pipeline (download, extract...)
+    """
+    with REGISTRY.timer("db_round_trip_seconds", op="log_processing"):
+        cursor.execute("""
+            INSERT INTO processing_logs (video_id, stage, status, error_message, processing_time_sec)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (video_id, stage, status, error_message, processing_time_sec))
+
+
+# Registre partagé par tout le processus
+REGISTRY = MetricsRegistry()
@@ -8,110 +8,83 @@ This model combines CNN and Transformer to recognize ASL signs from hand landmar
 
 Input: (batch_size, num_frames, num_landmarks) -> (batch, 30, 63)
 Output: (batch_size, num_classes) -> probability distribution over words
+
+Multi-stream mode (streams=["left_hand", "right_hand", "pose", ...]): the
+input is the concatenation of the streams (see landmark_dataset) and each
+stream gets its own lightweight encoder, run only on the frames where that
+stream was detected, before the streams are fused.
+
+TensorFlow is imported lazily: the configuration and the class list can be
+used without paying the TensorFlow import. For serving, get_serving_model()
+loads a pre-traced SavedModel cached on disk by hyperparameters instead of
+rebuilding and retracing the graph in every process.
 """
 
-import tensorflow as tf
-from tensorflow.keras import layers, Model
+import hashlib
+import json
+import os
+
 import numpy as np
 
 
-# =============================================================================
-# POSITIONAL ENCODING (for Transformer)
-# =============================================================================
+# Default hyperparameters of build_asl_model
+DEFAULT_MODEL_CONFIG = {
+    "num_frames": 30,
+    "num_landmarks": 63,
+    "num_classes": 100,
+    "cnn_filters": [64, 128],
+    "transformer_heads": 4,
+    "transformer_dim": 128,
+    "ff_dim": 256,
+    "dropout_rate": 0.3,
+    "num_transformer_blocks": 1,
+    "attention_type": "full",
+    "window_size": 16,
+    "streams": None,
+    "stream_embed_dim": 64,
+}
+
+CLASS_LIST_FILE = "database/wlasl_class_list.txt"
+MODEL_CACHE_DIR = "model_cache"
 
-class PositionalEncoding(layers.Layer):
+
+def load_class_list(path=CLASS_LIST_FILE):
     """
-    Adds positional information to the input sequence.
-    The Transformer doesn't know the order of frames without this.
+    Load the WLASL class list (one "index<TAB>gloss" per line).
+
+    Returns:
+        List of glosses, indexed by class id
     """
-    
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-    
-    def call(self, inputs):
-        seq_length = tf.shape(inputs)[1]
-        d_model = tf.shape(inputs)[2]
-        
-        # Create position indices
-        positions = tf.range(seq_length, dtype=tf.float32)[:, tf.newaxis]
-        dimensions = tf.range(d_model, dtype=tf.float32)[tf.newaxis, :]
-        
-        # Calculate angles
-        angles = positions / tf.pow(10000.0, (2 * (dimensions // 2)) / tf.cast(d_model, tf.float32))
-        
-        # Apply sin to even indices, cos to odd indices
-        sines = tf.sin(angles[:, 0::2])
-        cosines = tf.cos(angles[:, 1::2])
-        
-        # Interleave sines and cosines
-        pos_encoding = tf.concat([sines, cosines], axis=-1)
-        pos_encoding = pos_encoding[:, :d_model]  # Ensure correct size
-        
-        return inputs + pos_encoding
-    
-    def get_config(self):
-        return super().get_config()
+    glosses = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) == 2:
+                glosses.append(parts[1])
+    return glosses
 
 
 # =============================================================================
-# TRANSFORMER ENCODER BLOCK
+# LAZY TENSORFLOW IMPORT
 # =============================================================================
 
-class TransformerBlock(layers.Layer):
-    """
-    A single Transformer encoder block with:
-    - Multi-Head Self-Attention
-    - Feed-Forward Network
-    - Residual connections and Layer Normalization
-    """
-    
-    def __init__(self, embed_dim, num_heads, ff_dim, dropout_rate=0.1, **kwargs):
-        super().__init__(**kwargs)
-        self.embed_dim = embed_dim
-        self.num_heads = num_heads
-        self.ff_dim = ff_dim
-        self.dropout_rate = dropout_rate
-        
-        # Multi-Head Attention
-        self.attention = layers.MultiHeadAttention(
-            num_heads=num_heads,
-            key_dim=embed_dim // num_heads
-        )
-        
-        # Feed-Forward Network
-        self.ffn = tf.keras.Sequential([
-            layers.Dense(ff_dim, activation='relu'),
-            layers.Dense(embed_dim)
-        ])
-        
-        # Layer Normalization
-        self.layernorm1 = layers.LayerNormalization(epsilon=1e-6)
-        self.layernorm2 = layers.LayerNormalization(epsilon=1e-6)
-        
-        # Dropout
-        self.dropout1 = layers.Dropout(dropout_rate)
-        self.dropout2 = layers.Dropout(dropout_rate)
-    
-    def call(self, inputs, training=False):
-        # Self-Attention with residual connection
-        attention_output = self.attention(inputs, inputs)
-        attention_output = self.dropout1(attention_output, training=training)
-        x = self.layernorm1(inputs + attention_output)
-        
-        # Feed-Forward with residual connection
-        ffn_output = self.ffn(x)
-        ffn_output = self.dropout2(ffn_output, training=training)
-        return self.layernorm2(x + ffn_output)
-    
-    def get_config(self):
-        config = super().get_config()
-        config.update({
-            "embed_dim": self.embed_dim,
-            "num_heads": self.num_heads,
-            "ff_dim": self.ff_dim,
-            "dropout_rate": self.dropout_rate
-        })
-        return config
+def _keras():
+    """Import TensorFlow on first use and return (tf, layers, Model)."""
+    import tensorflow as tf
+    from tensorflow.keras import layers, Model
+    return tf, layers, Model
+
+
+def __getattr__(name):
+    # Keep `from model import tf, TransformerBlock, ...` working without
+    # importing TensorFlow when the module itself is imported.
+    if name in ("tf", "layers", "Model"):
+        tf, layers, Model = _keras()
+        return {"tf": tf, "layers": layers, "Model": Model}[name]
+    if name in ("PositionalEncoding", "TransformerBlock"):
+        import model_layers
+        return getattr(model_layers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # =============================================================================
@@ -126,7 +99,12 @@ def build_asl_model(
     transformer_heads=4,
     transformer_dim=128,
     ff_dim=256,
-    dropout_rate=0.3
+    dropout_rate=0.3,
+    num_transformer_blocks=1,
+    attention_type="full",
+    window_size=16,
+    streams=None,
+    stream_embed_dim=64
 ):
     """
     Build the ASL Recognition Model combining CNN and Transformer.
@@ -140,18 +118,42 @@ def build_asl_model(
         transformer_dim: Dimension of transformer embeddings
         ff_dim: Dimension of feed-forward network in transformer
         dropout_rate: Dropout rate for regularization
+        num_transformer_blocks: Number of stacked transformer blocks
+        attention_type: 'full', 'local' (windowed, O(T * window_size)) or
+            'linear' (kernelized, O(T)); a list gives one type per block
+        window_size: Attention window of 'local' blocks
+        streams: Optional list of landmark streams (landmark_dataset.LANDMARK_STREAMS,
+            e.g. ["left_hand", "right_hand", "pose"]); num_landmarks is then
+            the sum of their sizes
+        stream_embed_dim: Per-frame embedding size of each stream encoder
     
     Returns:
         Compiled Keras Model
     """
+    tf, layers, Model = _keras()
+    from model_layers import PositionalEncoding, StreamEncoder, TransformerBlock
+    
+    if streams:
+        from landmark_dataset import stream_layout
+        layout, num_landmarks = stream_layout(streams)
     
     # Input layer
     inputs = layers.Input(shape=(num_frames, num_landmarks), name='landmark_input')
+    x = inputs
+    
+    # =========================================================================
+    # STREAM ENCODERS - One per landmark stream, fused by concatenation
+    # =========================================================================
+    if streams:
+        encoded = [
+            StreamEncoder(stream_embed_dim, name=f'{name}_encoder')(inputs[:, :, start:end])
+            for name, start, end in layout
+        ]
+        x = layers.Concatenate(name='stream_fusion')(encoded) if len(encoded) > 1 else encoded[0]
     
     # =========================================================================
     # CNN BLOCK - Extract local patterns
     # =========================================================================
-    x = inputs
     
     # First Conv1D layer
     x = layers.Conv1D(
@@ -188,18 +190,23 @@ def build_asl_model(
     x = layers.Dropout(dropout_rate, name='pos_dropout')(x)
     
     # =========================================================================
-    # TRANSFORMER BLOCK - Capture temporal dependencies
+    # TRANSFORMER BLOCKS - Capture temporal dependencies
     # =========================================================================
-    x = TransformerBlock(
-        embed_dim=transformer_dim,
-        num_heads=transformer_heads,
-        ff_dim=ff_dim,
-        dropout_rate=dropout_rate,
-        name='transformer_block'
-    )(x)
-    
-    # Optional: Add more transformer blocks for deeper model
-    # x = TransformerBlock(transformer_dim, transformer_heads, ff_dim, dropout_rate)(x)
+    if isinstance(attention_type, str):
+        attention_type = [attention_type] * num_transformer_blocks
+    if len(attention_type) != num_transformer_blocks:
+        raise ValueError("attention_type needs one entry per transformer block")
+    
+    for i, block_attention in enumerate(attention_type):
+        x = TransformerBlock(
+            embed_dim=transformer_dim,
+            num_heads=transformer_heads,
+            ff_dim=ff_dim,
+            dropout_rate=dropout_rate,
+            attention_type=block_attention,
+            window_size=window_size,
+            name='transformer_block' if i == 0 else f'transformer_block_{i + 1}'
+        )(x)
     
     # =========================================================================
     # CLASSIFICATION HEAD - Make predictions
@@ -239,6 +246,7 @@ def compile_model(model, learning_rate=0.001):
     Returns:
         Compiled model
     """
+    tf = _keras()[0]
     model.compile(
         optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
         loss='categorical_crossentropy',
@@ -250,6 +258,115 @@ def compile_model(model, learning_rate=0.001):
     return model
 
 
+# =============================================================================
+# WARM START: CACHED PRE-TRACED SAVEDMODEL
+# =============================================================================
+
+_SERVING_MODELS = {}
+
+
+def model_cache_key(weights_path=None, **hparams):
+    """
+    Cache key for a model: hash of the hyperparameters, the weights file
+    (path, size, mtime) and the TensorFlow version.
+    """
+    tf = _keras()[0]
+    config = dict(DEFAULT_MODEL_CONFIG, **hparams)
+    payload = {"config": config, "tensorflow": tf.__version__}
+    if weights_path:
+        stat = os.stat(weights_path)
+        payload["weights"] = [os.path.abspath(weights_path), stat.st_size, int(stat.st_mtime)]
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ServingModel:
+    """
+    Inference wrapper around a loaded SavedModel signature.
+
+    The graph is already traced: no Keras layer is rebuilt and no
+    tf.function is retraced when the model is loaded.
+    """
+
+    def __init__(self, export_dir):
+        tf = _keras()[0]
+        self.export_dir = export_dir
+        # Keep a reference to the loaded object: the signature depends on it
+        self._loaded = tf.saved_model.load(export_dir)
+        self._serve = self._loaded.signatures["serving_default"]
+        self._output_key = list(self._serve.structured_outputs)[0]
+
+    def predict(self, inputs, batch_size=256):
+        """Return class probabilities as a NumPy array."""
+        tf = _keras()[0]
+        inputs = np.asarray(inputs, dtype=np.float32)
+        outputs = []
+        for start in range(0, len(inputs), batch_size):
+            batch = tf.constant(inputs[start:start + batch_size])
+            outputs.append(self._serve(landmark_input=batch)[self._output_key].numpy())
+        if not outputs:
+            return np.zeros((0, self._serve.structured_outputs[self._output_key].shape[-1]), np.float32)
+        return np.concatenate(outputs, axis=0)
+
+
+def export_serving_model(model, export_dir):
+    """
+    Save a Keras model as a SavedModel with a traced serving signature
+    (batch dimension left dynamic).
+    """
+    tf = _keras()[0]
+    input_spec = tf.TensorSpec([None] + list(model.input_shape[1:]), tf.float32, name="landmark_input")
+
+    @tf.function(input_signature=[input_spec])
+    def serve(landmark_input):
+        return {"probabilities": model(landmark_input, training=False)}
+
+    tf.saved_model.save(model, export_dir, signatures={"serving_default": serve})
+    return export_dir
+
+
+def get_serving_model(cache_dir=MODEL_CACHE_DIR, weights_path=None, **hparams):
+    """
+    Return a ready-to-use ServingModel, building it only on a cache miss.
+
+    The first call for a given set of hyperparameters (and weights) builds
+    the model, traces it and saves it under cache_dir/<key>. Later calls,
+    in this process or any other, load the cached SavedModel directly.
+
+    Args:
+        cache_dir: Directory of cached SavedModels
+        weights_path: Optional trained weights (.weights.h5) to load
+        **hparams: Arguments of build_asl_model
+
+    Returns:
+        ServingModel
+    """
+    key = model_cache_key(weights_path, **hparams)
+    if key in _SERVING_MODELS:
+        return _SERVING_MODELS[key]
+
+    export_dir = os.path.join(cache_dir, key)
+    if not os.path.exists(os.path.join(export_dir, "saved_model.pb")):
+        model = build_asl_model(**dict(DEFAULT_MODEL_CONFIG, **hparams))
+        if weights_path:
+            model.load_weights(weights_path)
+        # Export to a temporary directory, then rename: concurrent workers
+        # never see a partially written cache entry
+        tmp_dir = f"{export_dir}.tmp{os.getpid()}"
+        export_serving_model(model, tmp_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            os.rename(tmp_dir, export_dir)
+        except OSError:
+            # Another process won the race: keep its copy
+            import shutil
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    serving_model = ServingModel(export_dir)
+    _SERVING_MODELS[key] = serving_model
+    return serving_model
+
+
 # =============================================================================
 # TEST THE MODEL
 # =============================================================================
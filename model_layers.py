@@ -0,0 +1,290 @@
+"""
+ASL Sign Language Recognition Model - Custom Keras layers
+Person 4 - Model Architecture
+
+Kept separate from model.py so that importing the model configuration
+does not pull in TensorFlow. model.py imports this module lazily.
+"""
+
+import tensorflow as tf
+from tensorflow.keras import layers
+
+
+# =============================================================================
+# POSITIONAL ENCODING (for Transformer)
+# =============================================================================
+
+class PositionalEncoding(layers.Layer):
+    """
+    Adds positional information to the input sequence.
+    The Transformer doesn't know the order of frames without this.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+    
+    def call(self, inputs):
+        seq_length = tf.shape(inputs)[1]
+        d_model = tf.shape(inputs)[2]
+        
+        # Create position indices
+        positions = tf.range(seq_length, dtype=tf.float32)[:, tf.newaxis]
+        dimensions = tf.range(d_model, dtype=tf.float32)[tf.newaxis, :]
+        
+        # Calculate angles
+        angles = positions / tf.pow(10000.0, (2 * (dimensions // 2)) / tf.cast(d_model, tf.float32))
+        
+        # Apply sin to even indices, cos to odd indices
+        sines = tf.sin(angles[:, 0::2])
+        cosines = tf.cos(angles[:, 1::2])
+        
+        # Interleave sines and cosines
+        pos_encoding = tf.concat([sines, cosines], axis=-1)
+        pos_encoding = pos_encoding[:, :d_model]  # Ensure correct size
+        
+        return inputs + pos_encoding
+    
+    def get_config(self):
+        return super().get_config()
+
+
+# =============================================================================
+# LANDMARK STREAM ENCODER (multi-stream input)
+# =============================================================================
+
+class StreamEncoder(layers.Layer):
+    """
+    Per-frame encoder for one landmark stream (a hand, the pose, the face).
+
+    A frame whose values are all zero is treated as missing (the stream was
+    not detected). Only present frames are gathered and run through the MLP,
+    then scattered back into place; missing frames get a learned "missing"
+    embedding instead. Compute therefore scales with the number of frames
+    where the stream is actually visible.
+    """
+    
+    def __init__(self, embed_dim, hidden_dim=None, **kwargs):
+        super().__init__(**kwargs)
+        self.embed_dim = embed_dim
+        self.hidden_dim = hidden_dim or 2 * embed_dim
+        
+        self.hidden = layers.Dense(self.hidden_dim, activation='relu')
+        self.projection = layers.Dense(embed_dim)
+    
+    def build(self, input_shape):
+        self.missing_embedding = self.add_weight(
+            name="missing_embedding",
+            shape=(self.embed_dim,),
+            initializer="zeros"
+        )
+        super().build(input_shape)
+    
+    def call(self, inputs):
+        batch_size = tf.shape(inputs)[0]
+        seq_length = tf.shape(inputs)[1]
+        
+        # (batch, frames) presence mask -> indices of the present frames
+        present = tf.reduce_any(tf.not_equal(inputs, 0.0), axis=-1)
+        indices = tf.where(present)
+        
+        # Encode present frames only, then scatter back to (batch, frames, embed_dim)
+        encoded = self.projection(self.hidden(tf.gather_nd(inputs, indices)))
+        output = tf.scatter_nd(indices, encoded, [batch_size, seq_length, self.embed_dim])
+        
+        missing = 1.0 - tf.cast(present, output.dtype)
+        return output + missing[:, :, None] * self.missing_embedding
+    
+    def get_config(self):
+        config = super().get_config()
+        config.update({
+            "embed_dim": self.embed_dim,
+            "hidden_dim": self.hidden_dim
+        })
+        return config
+
+
+# =============================================================================
+# MEMORY-EFFICIENT SELF-ATTENTION
+# =============================================================================
+
+ATTENTION_TYPES = ("full", "local", "linear")
+
+
+class LocalSelfAttention(layers.Layer):
+    """
+    Windowed multi-head self-attention.
+
+    The sequence is cut into blocks of `window_size` frames; each frame
+    attends to its own block and the two neighbouring blocks. Memory and
+    compute are O(T * window_size) instead of O(T^2).
+    """
+    
+    def __init__(self, embed_dim, num_heads, window_size=16, **kwargs):
+        super().__init__(**kwargs)
+        self.embed_dim = embed_dim
+        self.num_heads = num_heads
+        self.window_size = window_size
+        self.head_dim = embed_dim // num_heads
+        
+        self.qkv = layers.Dense(3 * embed_dim)
+        self.output_dense = layers.Dense(embed_dim)
+    
+    def call(self, inputs):
+        batch_size = tf.shape(inputs)[0]
+        seq_length = tf.shape(inputs)[1]
+        w = self.window_size
+        
+        # Pad the sequence to a whole number of blocks
+        pad = (-seq_length) % w
+        x = tf.pad(inputs, [[0, 0], [0, pad], [0, 0]])
+        num_blocks = (seq_length + pad) // w
+        
+        # (batch, blocks, w, 3, heads, head_dim)
+        qkv = tf.reshape(self.qkv(x), [batch_size, num_blocks, w, 3, self.num_heads, self.head_dim])
+        q, k, v = qkv[:, :, :, 0], qkv[:, :, :, 1], qkv[:, :, :, 2]
+        
+        # Keys/values of the previous, current and next block: (batch, blocks, 3w, heads, head_dim)
+        def with_neighbours(t):
+            padded = tf.pad(t, [[0, 0], [1, 1], [0, 0], [0, 0], [0, 0]])
+            return tf.concat([padded[:, :-2], padded[:, 1:-1], padded[:, 2:]], axis=2)
+        k = with_neighbours(k)
+        v = with_neighbours(v)
+        
+        scores = tf.einsum('bnqhd,bnkhd->bnhqk', q, k) / tf.sqrt(tf.cast(self.head_dim, q.dtype))
+        
+        # Mask keys outside the real sequence (block padding and sequence ends)
+        key_positions = tf.range(num_blocks)[:, None] * w + tf.range(-w, 2 * w)[None, :]
+        valid = tf.logical_and(key_positions >= 0, key_positions < seq_length)
+        scores += (1.0 - tf.cast(valid, scores.dtype))[None, :, None, None, :] * -1e9
+        
+        weights = tf.nn.softmax(scores, axis=-1)
+        output = tf.einsum('bnhqk,bnkhd->bnqhd', weights, v)
+        output = tf.reshape(output, [batch_size, num_blocks * w, self.embed_dim])[:, :seq_length]
+        return self.output_dense(output)
+    
+    def get_config(self):
+        config = super().get_config()
+        config.update({
+            "embed_dim": self.embed_dim,
+            "num_heads": self.num_heads,
+            "window_size": self.window_size
+        })
+        return config
+
+
+class LinearSelfAttention(layers.Layer):
+    """
+    Linear (kernelized) multi-head self-attention.
+
+    softmax(QK^T)V is replaced by phi(Q) (phi(K)^T V) with phi(x) = elu(x) + 1,
+    so the T x T attention matrix is never formed: memory and compute are
+    O(T * head_dim^2).
+    """
+    
+    def __init__(self, embed_dim, num_heads, **kwargs):
+        super().__init__(**kwargs)
+        self.embed_dim = embed_dim
+        self.num_heads = num_heads
+        self.head_dim = embed_dim // num_heads
+        
+        self.qkv = layers.Dense(3 * embed_dim)
+        self.output_dense = layers.Dense(embed_dim)
+    
+    def call(self, inputs):
+        batch_size = tf.shape(inputs)[0]
+        seq_length = tf.shape(inputs)[1]
+        
+        qkv = tf.reshape(self.qkv(inputs), [batch_size, seq_length, 3, self.num_heads, self.head_dim])
+        q = tf.nn.elu(qkv[:, :, 0]) + 1.0
+        k = tf.nn.elu(qkv[:, :, 1]) + 1.0
+        v = qkv[:, :, 2]
+        
+        kv = tf.einsum('bthd,bthe->bhde', k, v)
+        normalizer = 1.0 / (tf.einsum('bthd,bhd->bth', q, tf.reduce_sum(k, axis=1)) + 1e-6)
+        output = tf.einsum('bthd,bhde,bth->bthe', q, kv, normalizer)
+        output = tf.reshape(output, [batch_size, seq_length, self.embed_dim])
+        return self.output_dense(output)
+    
+    def get_config(self):
+        config = super().get_config()
+        config.update({
+            "embed_dim": self.embed_dim,
+            "num_heads": self.num_heads
+        })
+        return config
+
+
+# =============================================================================
+# TRANSFORMER ENCODER BLOCK
+# =============================================================================
+
+class TransformerBlock(layers.Layer):
+    """
+    A single Transformer encoder block with:
+    - Multi-Head Self-Attention ('full', 'local' windowed or 'linear')
+    - Feed-Forward Network
+    - Residual connections and Layer Normalization
+    """
+    
+    def __init__(self, embed_dim, num_heads, ff_dim, dropout_rate=0.1,
+                 attention_type="full", window_size=16, **kwargs):
+        super().__init__(**kwargs)
+        if attention_type not in ATTENTION_TYPES:
+            raise ValueError(f"attention_type must be one of {ATTENTION_TYPES}, got {attention_type!r}")
+        self.embed_dim = embed_dim
+        self.num_heads = num_heads
+        self.ff_dim = ff_dim
+        self.dropout_rate = dropout_rate
+        self.attention_type = attention_type
+        self.window_size = window_size
+        
+        # Multi-Head Attention
+        if attention_type == "local":
+            self.attention = LocalSelfAttention(embed_dim, num_heads, window_size)
+        elif attention_type == "linear":
+            self.attention = LinearSelfAttention(embed_dim, num_heads)
+        else:
+            self.attention = layers.MultiHeadAttention(
+                num_heads=num_heads,
+                key_dim=embed_dim // num_heads
+            )
+        
+        # Feed-Forward Network
+        self.ffn = tf.keras.Sequential([
+            layers.Dense(ff_dim, activation='relu'),
+            layers.Dense(embed_dim)
+        ])
+        
+        # Layer Normalization
+        self.layernorm1 = layers.LayerNormalization(epsilon=1e-6)
+        self.layernorm2 = layers.LayerNormalization(epsilon=1e-6)
+        
+        # Dropout
+        self.dropout1 = layers.Dropout(dropout_rate)
+        self.dropout2 = layers.Dropout(dropout_rate)
+    
+    def call(self, inputs, training=False):
+        # Self-Attention with residual connection
+        if self.attention_type == "full":
+            attention_output = self.attention(inputs, inputs)
+        else:
+            attention_output = self.attention(inputs)
+        attention_output = self.dropout1(attention_output, training=training)
+        x = self.layernorm1(inputs + attention_output)
+        
+        # Feed-Forward with residual connection
+        ffn_output = self.ffn(x)
+        ffn_output = self.dropout2(ffn_output, training=training)
+        return self.layernorm2(x + ffn_output)
+    
+    def get_config(self):
+        config = super().get_config()
+        config.update({
+            "embed_dim": self.embed_dim,
+            "num_heads": self.num_heads,
+            "ff_dim": self.ff_dim,
+            "dropout_rate": self.dropout_rate,
+            "attention_type": self.attention_type,
+            "window_size": self.window_size
+        })
+        return config
@@ -0,0 +1,300 @@
+"""
+ASL Sign Language Recognition - NSLT subset table
+Person 4 - Model Architecture
+
+database/nslt_{100,300,1000,2000}.json map a video id to
+{"subset": split, "action": [class, frame_start, frame_end]}; each subset
+is meant to contain the smaller ones. They are parsed once into a single
+columnar table sorted by video id:
+
+    video_id     int32    WLASL video id ("05237" -> 5237)
+    label        int16    class id (line of wlasl_class_list.txt)
+    frame_start  int32
+    frame_end    int32
+    split        int8     0 train, 1 val, 2 test, -1 unknown
+    tier         int8     index in TIERS of the smallest subset listing the video
+    conflicts    int32    video ids whose entries differ between subsets
+
+The table is cached in the single-file column format of metadata_index
+(database/nslt_table.idx), invalidated when a JSON file changes. Selecting
+a subset and/or a split is one boolean mask over the columns:
+
+    table = load_nslt_table()
+    rows = table.mask(subset=300, split="train")
+    labels = table.label[rows]
+
+check_consistency() verifies that the subsets are nested, that the class
+ids agree with wlasl_class_list.txt and, optionally, with the glosses of a
+MetadataIndex built from WLASL_v0.3.json.
+
+Usage:
+    python nslt_subsets.py
+    python nslt_subsets.py --refresh --metadata metadata.idx
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from metadata_index import SPLITS, MetadataIndex, read_column_file, read_column_header, write_column_file
+from model import CLASS_LIST_FILE, load_class_list
+
+TIERS = (100, 300, 1000, 2000)
+NSLT_DIR = "database"
+NSLT_CACHE = os.path.join(NSLT_DIR, "nslt_table.idx")
+
+ROW_COLUMNS = ("video_id", "label", "frame_start", "frame_end", "split", "tier")
+
+
+def nslt_path(tier, directory=NSLT_DIR):
+    return os.path.join(directory, f"nslt_{tier}.json")
+
+
+def _source_stamps(directory):
+    """(size, mtime) of each JSON file, stored in the cache header."""
+    stamps = {}
+    for tier in TIERS:
+        stat = os.stat(nslt_path(tier, directory))
+        stamps[str(tier)] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def _parse_file(path, tier_index):
+    """One nslt_N.json as columns (in file order)."""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    count = len(entries)
+    actions = np.array([entry["action"] for entry in entries.values()], dtype=np.int64).reshape(count, 3)
+    split_codes = {name: code for code, name in enumerate(SPLITS)}
+    return {
+        "video_id": np.fromiter((int(v) for v in entries), dtype=np.int32, count=count),
+        "label": actions[:, 0].astype(np.int16),
+        "frame_start": actions[:, 1].astype(np.int32),
+        "frame_end": actions[:, 2].astype(np.int32),
+        "split": np.fromiter((split_codes.get(e.get("subset"), -1) for e in entries.values()),
+                             dtype=np.int8, count=count),
+        "tier": np.full(count, tier_index, dtype=np.int8),
+    }
+
+
+class NSLTTable:
+    """All NSLT subsets as one set of parallel columns, sorted by video id."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get("columns", {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.columns["video_id"])
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_json(cls, directory=NSLT_DIR):
+        """Parse the four JSON files and merge them (smallest subset wins)."""
+        parts = [_parse_file(nslt_path(tier, directory), i) for i, tier in enumerate(TIERS)]
+        stacked = {name: np.concatenate([part[name] for part in parts]) for name in ROW_COLUMNS}
+
+        # Sorted by video id, then tier: the first row of each id is its smallest subset
+        order = np.lexsort((stacked["tier"], stacked["video_id"]))
+        stacked = {name: column[order] for name, column in stacked.items()}
+        first = np.r_[True, stacked["video_id"][1:] != stacked["video_id"][:-1]]
+        owner = np.cumsum(first) - 1
+
+        # A later row of the same id must repeat the first one
+        columns = {name: column[first] for name, column in stacked.items()}
+        differs = np.zeros(len(order), dtype=bool)
+        for name in ("label", "frame_start", "frame_end", "split"):
+            differs |= stacked[name] != columns[name][owner]
+        columns["conflicts"] = np.unique(stacked["video_id"][differs]).astype(np.int32)
+        return cls(columns)
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def find(self, video_ids):
+        """Row of each video id (str such as "05237" or int; -1 when absent)."""
+        keys = np.asarray([int(v) if str(v).isdigit() else -1 for v in video_ids], dtype=np.int64)
+        if len(self) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        position = np.minimum(np.searchsorted(self.video_id, keys), len(self) - 1)
+        return np.where(self.video_id[position] == keys, position, -1)
+
+    def mask(self, subset=None, split=None):
+        """
+        Boolean row mask.
+
+        Args:
+            subset: One of TIERS (rows of nslt_<subset>.json), None for all
+            split: 'train', 'val' or 'test', None for all
+        """
+        selected = np.ones(len(self), dtype=bool)
+        if subset is not None:
+            if subset not in TIERS:
+                raise ValueError(f"Unknown NSLT subset {subset} (expected one of {TIERS})")
+            selected &= self.tier <= TIERS.index(subset)
+        if split is not None:
+            selected &= self.split == SPLITS.index(split)
+        return selected
+
+    def counts(self):
+        """Number of videos of each (subset, split): {tier: {split: count}}."""
+        return {
+            tier: {split: int(np.count_nonzero(self.mask(tier, split))) for split in SPLITS}
+            for tier in TIERS
+        }
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def save(self, path, sources=None):
+        write_column_file(path, self.columns, {"rows": len(self), "sources": sources or {}})
+
+    @classmethod
+    def load(cls, path):
+        arrays, _ = read_column_file(path)
+        return cls(arrays)
+
+
+def load_nslt_table(directory=NSLT_DIR, cache_path=NSLT_CACHE, refresh=False):
+    """
+    NSLT table from the cache, rebuilt when missing or when a JSON file changed.
+    """
+    sources = _source_stamps(directory)
+    if not refresh and os.path.exists(cache_path):
+        try:
+            meta, _, _ = read_column_header(cache_path)
+            if meta.get("sources") == sources:
+                return NSLTTable.load(cache_path)
+        except (ValueError, KeyError):
+            pass
+    table = NSLTTable.from_json(directory)
+    table.save(cache_path, sources)
+    return table
+
+
+# =============================================================================
+# CONSISTENCY
+# =============================================================================
+
+def check_consistency(table, glosses, metadata=None):
+    """
+    Cross-check the subsets, the class list and (optionally) WLASL metadata.
+
+    Args:
+        table: NSLTTable
+        glosses: Class list (index = class id), see model.load_class_list
+        metadata: Optional MetadataIndex built from WLASL_v0.3.json
+
+    Returns:
+        List of problem descriptions (empty when everything agrees)
+    """
+    problems = []
+    if len(table.conflicts):
+        sample = ", ".join(f"{v:05d}" for v in table.conflicts[:5])
+        problems.append(f"{len(table.conflicts)} videos differ between subsets (e.g. {sample})")
+
+    if len(glosses) < TIERS[-1]:
+        problems.append(f"class list has {len(glosses)} glosses, nslt_{TIERS[-1]} needs {TIERS[-1]}")
+    out_of_range = np.count_nonzero((table.label < 0) | (table.label >= len(glosses)))
+    if out_of_range:
+        problems.append(f"{out_of_range} videos have a class id outside the class list")
+
+    # nslt_N must hold exactly the videos of classes 0..N-1
+    for i, tier in enumerate(TIERS):
+        in_tier = table.tier <= i
+        in_classes = table.label < tier
+        if np.count_nonzero(in_tier & ~in_classes):
+            problems.append(f"nslt_{tier}: {np.count_nonzero(in_tier & ~in_classes)} videos of a class >= {tier}")
+        if np.count_nonzero(in_classes & ~in_tier):
+            problems.append(f"nslt_{tier}: {np.count_nonzero(in_classes & ~in_tier)} videos of its classes "
+                            f"only appear in a larger subset")
+        labels = table.label[in_tier & (table.label >= 0)]
+        empty = np.flatnonzero(np.bincount(labels, minlength=tier)[:tier] == 0)
+        if len(empty):
+            problems.append(f"nslt_{tier}: {len(empty)} classes without any video (e.g. {empty[:5].tolist()})")
+
+    if metadata is not None:
+        rows = metadata.find([f"{v:05d}" for v in table.video_id])
+        found = rows >= 0
+        if np.count_nonzero(~found):
+            problems.append(f"{np.count_nonzero(~found)} videos are not in the WLASL metadata")
+        class_index = {gloss: i for i, gloss in enumerate(glosses)}
+        class_of_word = np.array([class_index.get(g, -1) for g in metadata.glosses] + [-1], dtype=np.int64)
+        metadata_labels = class_of_word[np.where(found, metadata.word[rows], -1)]
+        mismatch = found & (metadata_labels != table.label)
+        if np.count_nonzero(mismatch):
+            sample = ", ".join(f"{v:05d}" for v in table.video_id[mismatch][:5])
+            problems.append(f"{np.count_nonzero(mismatch)} videos have another gloss in the metadata (e.g. {sample})")
+    return problems
+
+
+# =============================================================================
+# DATABASE
+# =============================================================================
+
+def fetch_nslt_split_videos(cursor, table, subset, split):
+    """
+    List the processed videos of an NSLT subset and split.
+
+    Same contract as evaluate_model.fetch_split_videos, but membership and
+    labels come from the NSLT table instead of videos.split / words.gloss.
+
+    Returns:
+        (video_ids, labels, skipped): NumPy arrays of videos.id and class ids,
+        and the number of videos of the subset that are not processed yet
+    """
+    cursor.execute("SELECT id, video_id FROM videos WHERE processed = TRUE ORDER BY id")
+    db_rows = cursor.fetchall()
+    db_ids = np.fromiter((row[0] for row in db_rows), dtype=np.int64, count=len(db_rows))
+    rows = table.find([row[1] for row in db_rows])
+
+    selected = table.mask(subset, split)
+    keep = rows >= 0
+    keep[keep] = selected[rows[keep]]
+    skipped = int(np.count_nonzero(selected)) - int(np.count_nonzero(keep))
+    return db_ids[keep], table.label[rows[keep]].astype(np.int64), skipped
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and check the NSLT subset table")
+    parser.add_argument("--directory", default=NSLT_DIR, help="Directory of nslt_*.json")
+    parser.add_argument("--cache", default=NSLT_CACHE)
+    parser.add_argument("--class-list", default=CLASS_LIST_FILE)
+    parser.add_argument("--metadata", help="MetadataIndex file (metadata_index.py) to cross-check glosses")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild the cache")
+    args = parser.parse_args()
+
+    table = load_nslt_table(args.directory, args.cache, args.refresh)
+    print(f"{len(table)} videos -> {args.cache} ({os.path.getsize(args.cache) / 1024:.0f} KiB)")
+    print(f"{'subset':<8}" + "".join(f"{split:>8}" for split in SPLITS) + f"{'total':>8}")
+    for tier, counts in table.counts().items():
+        print(f"{tier:<8}" + "".join(f"{counts[split]:>8}" for split in SPLITS) + f"{sum(counts.values()):>8}")
+
+    metadata = MetadataIndex.load(args.metadata) if args.metadata else None
+    problems = check_consistency(table, load_class_list(args.class_list), metadata)
+    if problems:
+        print(f"\n{len(problems)} consistency problems:")
+        for problem in problems:
+            print(f"  - {problem}")
+    else:
+        print("\nSubsets, class list" + (" and metadata" if metadata is not None else "") + " agree")
+
+
+if __name__ == "__main__":
+    main()
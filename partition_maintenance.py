@@ -0,0 +1,528 @@
+"""
+================================================================================
+PARTITIONNEMENT DES TABLES frames / landmarks
+Personne 1 : Base de données & Ingestion
+================================================================================
+Les tables frames et landmarks grossissent de 30 à 60 lignes par vidéo.
+Ce script permet de:
+  - migrer frames/landmarks vers des tables partitionnées par video_id
+    (RANGE ou HASH), avec une clé primaire (video_id, id) qui regroupe
+    physiquement toutes les lignes d'une même vidéo
+  - ajouter des partitions RANGE avant que p_max ne se remplisse
+  - afficher l'état des partitions
+  - mesurer la latence d'insertion en masse et de lecture par vidéo,
+    avant (schéma actuel) et après (schéma partitionné)
+
+Remarque: MySQL n'autorise pas les clés étrangères sur une table
+partitionnée. Les tables partitionnées n'ont donc pas de FOREIGN KEY;
+landmarks reçoit une colonne video_id pour être partitionnée comme frames.
+Un trigger BEFORE INSERT (landmarks_fill_video_id) la remplit à partir de
+frames quand l'écrivain ne la fournit pas: les scripts qui insèrent
+(frame_id, landmark_data, num_hands) continuent de fonctionner après la
+migration.
+
+La migration verrouille frames et landmarks (LOCK TABLES ... WRITE) de la
+copie jusqu'à l'échange: les écrivains (pipeline, extraction) sont bloqués
+pendant la copie au lieu de voir leurs lignes perdues. Il faut MySQL
+8.0.13+ (RENAME TABLE sous LOCK TABLES); mieux vaut arrêter le pipeline
+avant de lancer 'migrate'.
+
+Usage:
+    python partition_maintenance.py migrate --scheme range --partition-size 5000
+    python partition_maintenance.py add-partitions --count 4
+    python partition_maintenance.py status
+    python partition_maintenance.py benchmark --videos 2000 --frames 40
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+
+PARTITIONED_TABLES = ("frames", "landmarks")
+
+FRAMES_PARTITIONED_DDL = """
+    CREATE TABLE {table} (
+        id INT AUTO_INCREMENT,
+        video_id INT NOT NULL,
+        frame_number INT NOT NULL,
+        frame_path VARCHAR(500),
+        timestamp_sec FLOAT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+        PRIMARY KEY (video_id, id),
+        INDEX idx_id (id),
+        UNIQUE KEY unique_video_frame (video_id, frame_number)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    {partition_clause}
+"""
+
+LANDMARKS_PARTITIONED_DDL = """
+    CREATE TABLE {table} (
+        id INT AUTO_INCREMENT,
+        video_id INT NOT NULL DEFAULT 0,
+        frame_id INT NOT NULL,
+        landmark_data JSON,
+        num_hands INT DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+        PRIMARY KEY (video_id, id),
+        INDEX idx_id (id),
+        INDEX idx_frame_id (frame_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    {partition_clause}
+"""
+
+# video_id = 0 (jamais un videos.id): valeur non fournie, prise dans frames.
+# Sans frame correspondante, le NOT NULL rejette la ligne.
+LANDMARKS_VIDEO_ID_TRIGGER = """
+    CREATE TRIGGER landmarks_fill_video_id
+    BEFORE INSERT ON {table}
+    FOR EACH ROW
+    SET NEW.video_id = COALESCE(
+        NULLIF(NEW.video_id, 0),
+        (SELECT f.video_id FROM frames f WHERE f.id = NEW.frame_id)
+    )
+"""
+
+
+def range_partition_clause(max_video_id, partition_size):
+    """
+    Construire la clause PARTITION BY RANGE couvrant les ids existants
+
+    Args:
+        max_video_id: Plus grand videos.id actuellement en base
+        partition_size: Nombre d'ids de vidéos par partition
+
+    Returns:
+        Clause SQL PARTITION BY RANGE (video_id) (...)
+    """
+    # Au moins une partition de marge au-delà des données existantes
+    upper = (max_video_id // partition_size + 2) * partition_size
+    partitions = [
+        f"PARTITION p_lt_{bound} VALUES LESS THAN ({bound})"
+        for bound in range(partition_size, upper + 1, partition_size)
+    ]
+    partitions.append("PARTITION p_max VALUES LESS THAN MAXVALUE")
+    return "PARTITION BY RANGE (video_id) (\n        " + ",\n        ".join(partitions) + "\n    )"
+
+
+def hash_partition_clause(num_partitions):
+    """Construire la clause PARTITION BY HASH"""
+    return f"PARTITION BY HASH (video_id) PARTITIONS {int(num_partitions)}"
+
+
+def partitioned_ddl(table, partition_clause, target_name=None):
+    """Retourner le CREATE TABLE partitionné pour frames ou landmarks"""
+    template = FRAMES_PARTITIONED_DDL if table == "frames" else LANDMARKS_PARTITIONED_DDL
+    return template.format(table=target_name or table, partition_clause=partition_clause)
+
+
+class PartitionManager:
+    def __init__(self, host="localhost", user="root", password="", database="asl_recognition"):
+        """
+        Initialiser le gestionnaire de partitions
+
+        Args:
+            host: Hôte MySQL
+            user: Utilisateur MySQL
+            password: Mot de passe MySQL
+            database: Nom de la base de données
+        """
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        self.connection = None
+        self.cursor = None
+
+    def connect(self, database=None):
+        """Établir la connexion à MySQL"""
+        try:
+            self.connection = mysql.connector.connect(
+                host=self.host,
+                user=self.user,
+                password=self.password,
+                database=database or self.database
+            )
+            self.cursor = self.connection.cursor()
+            return True
+        except Error as e:
+            print(f"❌ Erreur de connexion MySQL: {e}")
+            return False
+
+    def close(self):
+        """Fermer la connexion"""
+        if self.connection and self.connection.is_connected():
+            self.cursor.close()
+            self.connection.close()
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def get_partitions(self, table):
+        """
+        Lister les partitions d'une table
+
+        Returns:
+            Liste de tuples (nom, méthode, borne, nombre de lignes estimé).
+            Liste vide si la table n'est pas partitionnée.
+        """
+        self.cursor.execute("""
+            SELECT PARTITION_NAME, PARTITION_METHOD, PARTITION_DESCRIPTION, TABLE_ROWS
+            FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """, (self.database, table))
+        return self.cursor.fetchall()
+
+    def show_status(self):
+        """Afficher l'état des partitions de frames et landmarks"""
+        print(f"\n📦 ÉTAT DES PARTITIONS")
+        print("=" * 70)
+        for table in PARTITIONED_TABLES:
+            partitions = self.get_partitions(table)
+            if not partitions:
+                print(f"{table}: non partitionnée")
+                continue
+            print(f"{table}: {len(partitions)} partitions ({partitions[0][1]})")
+            for name, _, bound, rows in partitions:
+                print(f"   {name:<16} < {bound or '-':<10} ~{rows} lignes")
+
+    # ------------------------------------------------------------------
+    # Migration
+    # ------------------------------------------------------------------
+
+    def migrate(self, scheme="range", partition_size=5000, hash_partitions=16, drop_old=False):
+        """
+        Migrer frames et landmarks vers des tables partitionnées
+
+        Les nouvelles tables sont créées à côté (suffixe _part), avec le
+        trigger video_id déjà posé sur landmarks_part, remplies par
+        INSERT ... SELECT puis échangées avec RENAME TABLE. Copie et échange
+        se font sous LOCK TABLES: aucune écriture ne peut se glisser entre
+        les deux. Les anciennes tables sont conservées sous le suffixe _old.
+
+        Args:
+            scheme: 'range' ou 'hash'
+            partition_size: Nombre d'ids de vidéos par partition (RANGE)
+            hash_partitions: Nombre de partitions (HASH)
+            drop_old: Supprimer les tables _old après l'échange
+        """
+        if self.get_partitions("frames"):
+            print("ℹ️  frames est déjà partitionnée, rien à faire")
+            return False
+
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM videos")
+        max_video_id = self.cursor.fetchone()[0]
+
+        if scheme == "range":
+            clause = range_partition_clause(max_video_id, partition_size)
+        elif scheme == "hash":
+            clause = hash_partition_clause(hash_partitions)
+        else:
+            raise ValueError(f"Schéma de partitionnement inconnu: {scheme}")
+
+        print(f"\n🔧 Migration vers un partitionnement {scheme.upper()} (max video id: {max_video_id})")
+
+        try:
+            for table in PARTITIONED_TABLES:
+                self.cursor.execute(f"DROP TABLE IF EXISTS {table}_part")
+                self.cursor.execute(partitioned_ddl(table, clause, f"{table}_part"))
+
+            # Le trigger suit la table au RENAME: actif dès l'échange
+            self.cursor.execute("DROP TRIGGER IF EXISTS landmarks_fill_video_id")
+            self.cursor.execute(LANDMARKS_VIDEO_ID_TRIGGER.format(table="landmarks_part"))
+
+            # Les écrivains attendent jusqu'à UNLOCK TABLES (alias l/f verrouillés à part)
+            self.cursor.execute("""
+                LOCK TABLES
+                    frames WRITE, landmarks WRITE,
+                    frames_part WRITE, landmarks_part WRITE,
+                    frames AS f READ, landmarks AS l READ
+            """)
+            start = time.perf_counter()
+            self.cursor.execute("""
+                INSERT INTO frames_part (id, video_id, frame_number, frame_path, timestamp_sec, created_at)
+                SELECT id, video_id, frame_number, frame_path, timestamp_sec, created_at
+                FROM frames
+            """)
+            print(f"   ✅ frames copiée ({self.cursor.rowcount} lignes)")
+
+            self.cursor.execute("""
+                INSERT INTO landmarks_part (id, video_id, frame_id, landmark_data, num_hands, created_at)
+                SELECT l.id, f.video_id, l.frame_id, l.landmark_data, l.num_hands, l.created_at
+                FROM landmarks l
+                JOIN frames f ON l.frame_id = f.id
+            """)
+            print(f"   ✅ landmarks copiée ({self.cursor.rowcount} lignes)")
+            self.connection.commit()
+
+            self.cursor.execute("""
+                RENAME TABLE
+                    landmarks TO landmarks_old,
+                    frames TO frames_old,
+                    frames_part TO frames,
+                    landmarks_part TO landmarks
+            """)
+            self.cursor.execute("UNLOCK TABLES")
+            print(f"   ✅ Tables échangées en {time.perf_counter() - start:.1f}s (écritures bloquées pendant ce temps)")
+
+            if drop_old:
+                self.cursor.execute("DROP TABLE landmarks_old")
+                self.cursor.execute("DROP TABLE frames_old")
+                print("   🗑️  Anciennes tables supprimées")
+            else:
+                print("   ℹ️  Anciennes tables conservées: frames_old, landmarks_old")
+            return True
+
+        except Error as e:
+            print(f"❌ Erreur lors de la migration: {e}")
+            self.connection.rollback()
+            self.cursor.execute("UNLOCK TABLES")
+            return False
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def add_partitions(self, count=4, partition_size=5000):
+        """
+        Ajouter des partitions aux tables frames et landmarks
+
+        RANGE: p_max est découpée (REORGANIZE PARTITION) en `count` nouvelles
+        partitions de `partition_size` ids. p_max étant vide en régime normal,
+        l'opération est quasi instantanée.
+        HASH: `count` partitions sont ajoutées (ADD PARTITION).
+        """
+        for table in PARTITIONED_TABLES:
+            partitions = self.get_partitions(table)
+            if not partitions:
+                print(f"⚠️  {table} n'est pas partitionnée (lancez d'abord 'migrate')")
+                continue
+
+            method = partitions[0][1]
+            try:
+                if method == "HASH":
+                    self.cursor.execute(f"ALTER TABLE {table} ADD PARTITION PARTITIONS {int(count)}")
+                    print(f"✅ {table}: {count} partitions HASH ajoutées")
+                    continue
+
+                bounds = [int(bound) for _, _, bound, _ in partitions if bound != "MAXVALUE"]
+                last_bound = max(bounds) if bounds else 0
+                new_bounds = [last_bound + partition_size * (i + 1) for i in range(count)]
+                definitions = [
+                    f"PARTITION p_lt_{bound} VALUES LESS THAN ({bound})" for bound in new_bounds
+                ]
+                definitions.append("PARTITION p_max VALUES LESS THAN MAXVALUE")
+
+                self.cursor.execute(
+                    f"ALTER TABLE {table} REORGANIZE PARTITION p_max INTO ({', '.join(definitions)})"
+                )
+                print(f"✅ {table}: partitions jusqu'à video_id < {new_bounds[-1]}")
+
+            except Error as e:
+                print(f"❌ Erreur sur {table}: {e}")
+
+    # ------------------------------------------------------------------
+    # Benchmark
+    # ------------------------------------------------------------------
+
+    def benchmark(self, num_videos=2000, frames_per_video=40, batch_size=1000,
+                  lookups=500, partition_size=500, keep=False):
+        """
+        Comparer le schéma actuel et le schéma partitionné
+
+        Une base temporaire <database>_bench est créée avec le schéma de
+        database/schema.sql (words, videos, frames, landmarks), plus les
+        variantes partitionnées frames_part/landmarks_part. On mesure:
+          - l'insertion en masse de frames + landmarks (lignes/s)
+          - la lecture de toutes les landmarks d'une vidéo (p50/p95 en ms)
+
+        Returns:
+            Dictionnaire des résultats par variante
+        """
+        bench_db = f"{self.database}_bench"
+        print(f"\n⏱️  BENCHMARK PARTITIONNEMENT ({num_videos} vidéos × {frames_per_video} frames)")
+        print("=" * 70)
+
+        self.cursor.execute(f"DROP DATABASE IF EXISTS {bench_db}")
+        self.cursor.execute(f"CREATE DATABASE {bench_db}")
+        self.cursor.execute(f"USE {bench_db}")
+
+        # Schéma actuel (avec clés étrangères) tel que défini dans schema.sql
+        for statement in _schema_create_tables("database/schema.sql", ("words", "videos", "frames", "landmarks")):
+            self.cursor.execute(statement)
+
+        clause = range_partition_clause(num_videos, partition_size)
+        for table in PARTITIONED_TABLES:
+            self.cursor.execute(partitioned_ddl(table, clause, f"{table}_part"))
+
+        self.cursor.execute("INSERT INTO words (gloss, sample_count) VALUES ('bench', %s)", (num_videos,))
+        word_id = self.cursor.lastrowid
+        self.cursor.executemany(
+            "INSERT INTO videos (id, word_id, video_id) VALUES (%s, %s, %s)",
+            [(vid, word_id, f"bench_{vid}") for vid in range(1, num_videos + 1)]
+        )
+        self.connection.commit()
+
+        payload = json.dumps([round(random.random(), 4) for _ in range(63)])
+        variants = {
+            "actuel": ("frames", "landmarks", False),
+            "partitionné": ("frames_part", "landmarks_part", True),
+        }
+        results = {}
+
+        for label, (frames_table, landmarks_table, with_video_id) in variants.items():
+            # Insertion en masse, par lots de batch_size lignes
+            frame_rows, landmark_rows = [], []
+            frame_id = 0
+            start = time.perf_counter()
+            for vid in range(1, num_videos + 1):
+                for frame_number in range(frames_per_video):
+                    frame_id += 1
+                    frame_rows.append((frame_id, vid, frame_number, frame_number / 25.0))
+                    if with_video_id:
+                        landmark_rows.append((vid, frame_id, payload, 1))
+                    else:
+                        landmark_rows.append((frame_id, payload, 1))
+                if len(frame_rows) >= batch_size:
+                    self._flush_bench_rows(frames_table, landmarks_table, with_video_id, frame_rows, landmark_rows)
+                    frame_rows, landmark_rows = [], []
+            self._flush_bench_rows(frames_table, landmarks_table, with_video_id, frame_rows, landmark_rows)
+            insert_seconds = time.perf_counter() - start
+
+            # Lecture par vidéo
+            if with_video_id:
+                fetch_query = f"""
+                    SELECT f.frame_number, l.landmark_data
+                    FROM {frames_table} f
+                    JOIN {landmarks_table} l ON l.video_id = f.video_id AND l.frame_id = f.id
+                    WHERE f.video_id = %s
+                    ORDER BY f.frame_number
+                """
+            else:
+                fetch_query = f"""
+                    SELECT f.frame_number, l.landmark_data
+                    FROM {frames_table} f
+                    JOIN {landmarks_table} l ON l.frame_id = f.id
+                    WHERE f.video_id = %s
+                    ORDER BY f.frame_number
+                """
+            latencies = []
+            for vid in random.sample(range(1, num_videos + 1), min(lookups, num_videos)):
+                start = time.perf_counter()
+                self.cursor.execute(fetch_query, (vid,))
+                self.cursor.fetchall()
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+
+            total_rows = num_videos * frames_per_video
+            results[label] = {
+                "insert_seconds": insert_seconds,
+                "insert_rows_per_sec": 2 * total_rows / insert_seconds if insert_seconds > 0 else 0.0,
+                "fetch_p50_ms": statistics.median(latencies),
+                "fetch_p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+            }
+
+        print(f"{'Variante':<14}{'Insertion (s)':>15}{'Lignes/s':>12}{'Lecture p50':>14}{'p95':>10}")
+        for label, r in results.items():
+            print(f"{label:<14}{r['insert_seconds']:>15.2f}{r['insert_rows_per_sec']:>12.0f}"
+                  f"{r['fetch_p50_ms']:>12.2f}ms{r['fetch_p95_ms']:>8.2f}ms")
+
+        if not keep:
+            self.cursor.execute(f"DROP DATABASE {bench_db}")
+        self.cursor.execute(f"USE {self.database}")
+        return results
+
+    def _flush_bench_rows(self, frames_table, landmarks_table, with_video_id, frame_rows, landmark_rows):
+        """Insérer un lot de frames et de landmarks puis valider"""
+        if not frame_rows:
+            return
+        self.cursor.executemany(
+            f"INSERT INTO {frames_table} (id, video_id, frame_number, timestamp_sec) VALUES (%s, %s, %s, %s)",
+            frame_rows
+        )
+        if with_video_id:
+            landmarks_query = f"INSERT INTO {landmarks_table} (video_id, frame_id, landmark_data, num_hands) VALUES (%s, %s, %s, %s)"
+        else:
+            landmarks_query = f"INSERT INTO {landmarks_table} (frame_id, landmark_data, num_hands) VALUES (%s, %s, %s)"
+        self.cursor.executemany(landmarks_query, landmark_rows)
+        self.connection.commit()
+
+
+def _schema_create_tables(schema_file, tables):
+    """Extraire de schema.sql les CREATE TABLE des tables demandées, dans l'ordre"""
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        sql_content = f.read()
+
+    statements = {}
+    for match in re.finditer(r"CREATE TABLE IF NOT EXISTS (\w+) \(.*?\) ENGINE=[^;]*;", sql_content, re.S):
+        statements[match.group(1)] = match.group(0)
+    return [statements[table] for table in tables]
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Partitionnement des tables frames/landmarks")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    parser.add_argument("--database", default="asl_recognition")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Migrer vers des tables partitionnées")
+    migrate_parser.add_argument("--scheme", choices=["range", "hash"], default="range")
+    migrate_parser.add_argument("--partition-size", type=int, default=5000)
+    migrate_parser.add_argument("--hash-partitions", type=int, default=16)
+    migrate_parser.add_argument("--drop-old", action="store_true")
+
+    add_parser = subparsers.add_parser("add-partitions", help="Ajouter des partitions")
+    add_parser.add_argument("--count", type=int, default=4)
+    add_parser.add_argument("--partition-size", type=int, default=5000)
+
+    subparsers.add_parser("status", help="Afficher les partitions")
+
+    bench_parser = subparsers.add_parser("benchmark", help="Comparer schéma actuel et partitionné")
+    bench_parser.add_argument("--videos", type=int, default=2000)
+    bench_parser.add_argument("--frames", type=int, default=40)
+    bench_parser.add_argument("--batch-size", type=int, default=1000)
+    bench_parser.add_argument("--lookups", type=int, default=500)
+    bench_parser.add_argument("--partition-size", type=int, default=500)
+    bench_parser.add_argument("--keep", action="store_true", help="Conserver la base de benchmark")
+
+    args = parser.parse_args()
+
+    manager = PartitionManager(
+        host=args.host,
+        user=args.user,
+        password=args.password,
+        database=args.database
+    )
+    if not manager.connect():
+        return
+
+    try:
+        if args.command == "migrate":
+            manager.migrate(args.scheme, args.partition_size, args.hash_partitions, args.drop_old)
+        elif args.command == "add-partitions":
+            manager.add_partitions(args.count, args.partition_size)
+        elif args.command == "status":
+            manager.show_status()
+        elif args.command == "benchmark":
+            manager.benchmark(args.videos, args.frames, args.batch_size,
+                              args.lookups, args.partition_size, args.keep)
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,585 @@
+"""
+================================================================================
+ORCHESTRATEUR DU PIPELINE : INGESTION → TÉLÉCHARGEMENT → EXTRACTION → EXPORT
+================================================================================
+Enchaîne les étapes du projet sur chaque vidéo, avec reprise automatique:
+
+  ingest   : WLASL_v0.3.json → words/videos (une seule fois, populate_database)
+  download : videos.video_url → fichier local, videos.downloaded = TRUE
+  extract  : landmarks MediaPipe Holistic → frames/landmarks, videos.processed = TRUE
+  export   : séquence (num_frames, num_landmarks) → <export_dir>/<id>.npy
+
+Les étapes par vidéo forment un graphe (download → extract → export). Chaque
+étape a son propre pool de threads et une file d'attente bornée: une vidéo
+passe à l'étape suivante dès qu'elle a fini la précédente, les étapes
+tournent donc en même temps, et une étape lente bloque (backpressure) celle
+qui l'alimente au lieu d'accumuler du travail en mémoire.
+
+Point de reprise: chaque (vidéo, étape) terminée écrit une ligne
+success/failed dans processing_logs (colonne stage). Une étape en échec est
+remise en fin de file pendant l'exécution jusqu'à --max-attempts échecs
+(comptés avec ceux des exécutions précédentes); au redémarrage, les étapes
+déjà en success sont sautées.
+
+Usage:
+    python pipeline_orchestrator.py --json database/WLASL_v0.3.json
+    python pipeline_orchestrator.py --stages download --workers download=16
+    python pipeline_orchestrator.py --stages extract export --workers extract=4 export=2
+"""
+
+import argparse
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import urllib.request
+from urllib.parse import urlparse
+
+from db_backend import get_backend
+from metrics import REGISTRY, log_processing
+from video_availability import AVAILABLE, ensure_availability_columns, is_dead_url_error, mark_unreachable
+
+INGEST_STAGE = "ingest"
+
+
+class UnreachableVideo(Exception):
+    """URL morte: la vidéo est marquée injoignable et n'est pas retentée"""
+
+
+# =============================================================================
+# ÉTAPES
+# =============================================================================
+
+def download_video(cursor, video, config):
+    """Télécharger la vidéo (écriture dans un .part puis renommage)"""
+    url = video["video_url"]
+    if not url:
+        raise ValueError("video_url vide")
+    extension = os.path.splitext(urlparse(url).path)[1] or ".mp4"
+    path = os.path.join(config["video_dir"], f"{video['id']}{extension}")
+
+    if not os.path.exists(path):
+        os.makedirs(config["video_dir"], exist_ok=True)
+        tmp_path = f"{path}.part"
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=config["timeout"]) as response, open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(response, f)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # URL morte: la vidéo sort des files de travail jusqu'à sa re-vérification
+            if is_dead_url_error(e):
+                mark_unreachable(cursor, video["id"])
+                raise UnreachableVideo(str(e)) from e
+            raise
+        os.replace(tmp_path, path)
+        REGISTRY.observe("download_seconds", time.perf_counter() - start)
+
+    cursor.execute("""
+        UPDATE videos
+        SET downloaded = TRUE, local_path = %s, updated_at = CURRENT_TIMESTAMP
+        WHERE id = %s
+    """, (path, video["id"]))
+    video["local_path"] = path
+
+
+def _points(landmark_list):
+    if landmark_list is None:
+        return None
+    return [[round(p.x, 5), round(p.y, 5), round(p.z, 5)] for p in landmark_list.landmark]
+
+
+def extract_landmarks(cursor, video, config):
+    """
+    Extraire les landmarks de chaque frame (format Holistic de landmark_dataset)
+
+    Les frames/landmarks existants de la vidéo sont d'abord supprimés: une
+    extraction interrompue peut être relancée sans doublons.
+    """
+    import cv2
+    import mediapipe as mp
+
+    if not video["local_path"] or not os.path.exists(video["local_path"]):
+        raise FileNotFoundError(f"Fichier vidéo introuvable: {video['local_path']}")
+
+    capture = cv2.VideoCapture(video["local_path"])
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+    frames = []
+    # Un détecteur par vidéo: en mode vidéo, Holistic suit les landmarks
+    # d'une frame à l'autre et ce suivi ne doit pas déborder sur le clip suivant
+    try:
+        with mp.solutions.holistic.Holistic(static_image_mode=False) as holistic:
+            while True:
+                ok, image = capture.read()
+                if not ok:
+                    break
+                results = holistic.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+                data = {
+                    "left_hand": _points(results.left_hand_landmarks),
+                    "right_hand": _points(results.right_hand_landmarks),
+                    "pose": _points(results.pose_landmarks),
+                    "face": _points(results.face_landmarks),
+                }
+                frames.append(data)
+    finally:
+        capture.release()
+    if not frames:
+        raise ValueError("Aucune frame lisible")
+
+    cursor.execute(
+        "DELETE FROM landmarks WHERE frame_id IN (SELECT id FROM frames WHERE video_id = %s)",
+        (video["id"],)
+    )
+    cursor.execute("DELETE FROM frames WHERE video_id = %s", (video["id"],))
+    cursor.executemany(
+        "INSERT INTO frames (video_id, frame_number, timestamp_sec) VALUES (%s, %s, %s)",
+        [(video["id"], n, n / fps) for n in range(len(frames))]
+    )
+    cursor.execute("SELECT id FROM frames WHERE video_id = %s ORDER BY frame_number", (video["id"],))
+    frame_ids = [row[0] for row in cursor.fetchall()]
+    rows = [
+        (frame_id, json.dumps(data), (data["left_hand"] is not None) + (data["right_hand"] is not None))
+        for frame_id, data in zip(frame_ids, frames)
+    ]
+    # landmarks partitionnée (partition_maintenance.py migrate): video_id obligatoire
+    if config.get("landmarks_video_id"):
+        cursor.executemany(
+            "INSERT INTO landmarks (video_id, frame_id, landmark_data, num_hands) VALUES (%s, %s, %s, %s)",
+            [(video["id"],) + row for row in rows]
+        )
+    else:
+        cursor.executemany(
+            "INSERT INTO landmarks (frame_id, landmark_data, num_hands) VALUES (%s, %s, %s)", rows
+        )
+    cursor.execute("""
+        UPDATE videos SET processed = TRUE, updated_at = CURRENT_TIMESTAMP WHERE id = %s
+    """, (video["id"],))
+
+
+def export_sequence(cursor, video, config):
+    """Écrire la séquence de landmarks de la vidéo en .npy pour l'entraînement"""
+    import numpy as np
+    from landmark_dataset import fetch_landmark_sequences
+
+    sequence = fetch_landmark_sequences(
+        cursor, [video["id"]], config["num_frames"], config["num_landmarks"], streams=config["streams"]
+    )[0]
+    os.makedirs(config["export_dir"], exist_ok=True)
+    path = os.path.join(config["export_dir"], f"{video['id']}.npy")
+    tmp_path = f"{path}.part.npy"
+    np.save(tmp_path, sequence)
+    os.replace(tmp_path, path)
+
+
+class Stage:
+    def __init__(self, name, handler, workers=1, depends_on=(), done_column=None):
+        """
+        Étape du pipeline appliquée à chaque vidéo
+
+        Args:
+            name: Nom (processing_logs.stage)
+            handler: Fonction handler(cursor, video, config); video est un
+                dictionnaire {id, video_id, video_url, local_path}
+            workers: Nombre de threads de l'étape
+            depends_on: Étapes qui doivent avoir réussi avant celle-ci
+            done_column: Colonne booléenne de videos indiquant que l'étape est
+                déjà faite (données antérieures à l'orchestrateur)
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.depends_on = tuple(depends_on)
+        self.done_column = done_column
+
+
+def default_stages(workers=None):
+    """Graphe download → extract → export"""
+    workers = workers or {}
+    return [
+        Stage("download", download_video, workers.get("download", 8), done_column="downloaded"),
+        Stage("extract", extract_landmarks, workers.get("extract", 2), ("download",), done_column="processed"),
+        Stage("export", export_sequence, workers.get("export", 2), ("extract",)),
+    ]
+
+
+# =============================================================================
+# ORCHESTRATEUR
+# =============================================================================
+
+class PipelineOrchestrator:
+    def __init__(self, backend, stages, config, enabled=None, queue_size=64, max_attempts=3):
+        """
+        Initialiser l'orchestrateur
+
+        Args:
+            backend: Backend de stockage (db_backend); une connexion par thread
+            stages: Liste d'étapes dans un ordre topologique
+            config: Paramètres passés aux handlers
+            enabled: Noms des étapes à exécuter (par défaut toutes); les autres
+                ne servent que de dépendances et doivent déjà être faites
+            queue_size: Taille maximale de la file de chaque étape
+            max_attempts: Nombre d'échecs après lequel une étape n'est plus
+                retentée (dans l'exécution et d'une exécution à l'autre)
+        """
+        self.backend = backend
+        self.stages = stages
+        self.config = config
+        self.max_attempts = max_attempts
+        self.enabled = set(enabled) if enabled is not None else {s.name for s in stages}
+
+        names = set()
+        for stage in stages:
+            unknown = [d for d in stage.depends_on if d not in names]
+            if unknown:
+                raise ValueError(f"L'étape {stage.name} dépend d'étapes absentes ou placées après: {unknown}")
+            names.add(stage.name)
+
+        self.children = {s.name: [c for c in stages if s.name in c.depends_on] for s in stages}
+        self.queues = {s.name: queue.Queue(maxsize=queue_size) for s in stages}
+        self._lock = threading.Lock()
+        self._done = {}
+        self._queued = {}
+        self._failures = {}
+        self.counts = {s.name: {"success": 0, "failed": 0} for s in stages if s.name in self.enabled}
+
+    # ------------------------------------------------------------------
+    # Point de reprise
+    # ------------------------------------------------------------------
+
+    def load_checkpoint(self, cursor):
+        """
+        Lire processing_logs: étapes réussies et nombre d'échecs par vidéo
+
+        Returns:
+            (done, failures): {video_id: set(étapes)}, {(video_id, étape): n}
+        """
+        stage_names = [s.name for s in self.stages]
+        placeholders = ', '.join(['%s'] * len(stage_names))
+        cursor.execute(f"""
+            SELECT video_id, stage, status, COUNT(*)
+            FROM processing_logs
+            WHERE video_id IS NOT NULL AND stage IN ({placeholders})
+            GROUP BY video_id, stage, status
+        """, tuple(stage_names))
+        done, failures = {}, {}
+        for video_id, stage, status, count in cursor.fetchall():
+            if status == 'success':
+                done.setdefault(video_id, set()).add(stage)
+            elif status == 'failed':
+                failures[(video_id, stage)] = count
+        return done, failures
+
+    def list_videos(self, cursor, limit=None):
+        """
+        Vidéos à faire passer dans le pipeline (ordre des id)
+
+        Les vidéos indisponibles (video_availability) sont exclues, sauf si
+        elles ont déjà été téléchargées.
+        """
+        query = """
+            SELECT id, video_id, video_url, local_path, downloaded, processed
+            FROM videos
+            WHERE availability = %s OR downloaded = TRUE
+            ORDER BY id
+        """
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        cursor.execute(query, (AVAILABLE,))
+        columns = ["id", "video_id", "video_url", "local_path", "downloaded", "processed"]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    # ------------------------------------------------------------------
+    # Ordonnancement
+    # ------------------------------------------------------------------
+
+    def _ready(self, video_id, candidates):
+        """Étapes de candidates prêtes pour la vidéo (à appeler sous self._lock)"""
+        done = self._done[video_id]
+        queued = self._queued[video_id]
+        ready = []
+        for stage in candidates:
+            if stage.name not in self.enabled or stage.name in done or stage.name in queued:
+                continue
+            if not all(d in done for d in stage.depends_on):
+                continue
+            if self._failures.get((video_id, stage.name), 0) >= self.max_attempts:
+                continue
+            queued.add(stage.name)
+            ready.append(stage)
+        return ready
+
+    def _record_failure(self, stage, video, error):
+        """Compter un échec; retourne True s'il reste des tentatives"""
+        key = (video["id"], stage.name)
+        with self._lock:
+            self.counts[stage.name]["failed"] += 1
+            self._failures[key] = self._failures.get(key, 0) + 1
+            attempts = self._failures[key]
+        if isinstance(error, UnreachableVideo):
+            print(f"   ⛔ {stage.name} vidéo {video['id']} injoignable, non retentée: {error}")
+            return False
+        print(f"   ❌ {stage.name} vidéo {video['id']} (tentative {attempts}/{self.max_attempts}): {error}")
+        return attempts < self.max_attempts
+
+    def _run_task(self, stage, connection, cursor, video):
+        """
+        Exécuter une étape pour une vidéo
+
+        Returns:
+            None si l'étape est validée, sinon True/False selon qu'il reste
+            des tentatives
+        """
+        try:
+            with REGISTRY.track_video(cursor, video["id"], stage.name):
+                stage.handler(cursor, video, self.config)
+        except Exception as e:
+            # La ligne 'failed' de processing_logs est gardée comme point de reprise
+            try:
+                connection.commit()
+            except self.backend.Error:
+                connection.rollback()
+            return self._record_failure(stage, video, e)
+
+        try:
+            connection.commit()
+        except self.backend.Error as e:
+            # Sans ce rattrapage, l'exception tuerait le worker et join() bloquerait
+            connection.rollback()
+            return self._record_failure(stage, video, e)
+
+        with self._lock:
+            self.counts[stage.name]["success"] += 1
+            succeeded = self.counts[stage.name]["success"]
+            self._done[video["id"]].add(stage.name)
+            ready = self._ready(video["id"], self.children[stage.name])
+        if succeeded % 100 == 0:
+            print(f"   {stage.name}: {succeeded} vidéos")
+        # Bloquant si la file suivante est pleine (backpressure)
+        for child in ready:
+            self.queues[child.name].put(video)
+        return None
+
+    def _worker(self, stage):
+        connection = self.backend.connect()
+        cursor = self.backend.cursor(connection)
+        tasks = self.queues[stage.name]
+        try:
+            while True:
+                video = tasks.get()
+                try:
+                    if video is None:
+                        return
+                    while self._run_task(stage, connection, cursor, video):
+                        try:
+                            # Remise en fin de file avant le task_done() courant: join() l'attend
+                            tasks.put_nowait(video)
+                            break
+                        except queue.Full:
+                            # Ne jamais bloquer un worker sur sa propre file: nouvel essai ici
+                            continue
+                finally:
+                    tasks.task_done()
+        finally:
+            self.backend.close(connection, cursor)
+
+    def run(self, limit=None):
+        """
+        Faire passer toutes les vidéos dans le graphe d'étapes
+
+        Returns:
+            {étape: {"success": n, "failed": n}} pour cette exécution
+        """
+        connection = self.backend.connect()
+        cursor = self.backend.cursor(connection)
+        try:
+            done, self._failures = self.load_checkpoint(cursor)
+            videos = self.list_videos(cursor, limit)
+        finally:
+            self.backend.close(connection, cursor)
+        names = [s.name for s in self.stages if s.name in self.enabled]
+        print(f"📋 {len(videos)} vidéos, étapes: {' → '.join(names)}")
+
+        threads = {
+            stage.name: [
+                threading.Thread(target=self._worker, args=(stage,), name=f"{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers if stage.name in self.enabled else 0)
+            ]
+            for stage in self.stages
+        }
+        for stage_threads in threads.values():
+            for thread in stage_threads:
+                thread.start()
+
+        skipped = 0
+        for video in videos:
+            video_done = set(done.get(video["id"], ()))
+            for stage in self.stages:
+                if stage.done_column and video.get(stage.done_column):
+                    video_done.add(stage.name)
+            with self._lock:
+                self._done[video["id"]] = video_done
+                self._queued[video["id"]] = set()
+                ready = self._ready(video["id"], self.stages)
+            if not ready:
+                skipped += 1
+            for stage in ready:
+                self.queues[stage.name].put(video)
+
+        # Arrêt dans l'ordre topologique: quand les étapes parentes sont
+        # terminées et la file vide, l'étape ne recevra plus rien
+        for stage in self.stages:
+            self.queues[stage.name].join()
+            for _ in threads[stage.name]:
+                self.queues[stage.name].put(None)
+            for thread in threads[stage.name]:
+                thread.join()
+
+        print(f"   Vidéos sans travail en attente au démarrage: {skipped}")
+        return self.counts
+
+
+def run_ingest(backend, json_path):
+    """
+    Étape ingest: exécutée une seule fois (ligne processing_logs sans video_id)
+
+    Une ingestion interrompue reprend là où elle s'est arrêtée: les vidéos
+    déjà validées sont ignorées par insert_words_and_videos.
+
+    Returns:
+        True si l'ingestion est faite (maintenant ou lors d'une exécution précédente)
+    """
+    from populate_database import WLASLDatabaseManager
+
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        cursor.execute(
+            "SELECT COUNT(*) FROM processing_logs WHERE stage = %s AND status = 'success'",
+            (INGEST_STAGE,)
+        )
+        if cursor.fetchone()[0] > 0:
+            print("⏭️  Ingestion déjà faite (processing_logs)")
+            return True
+
+        manager = WLASLDatabaseManager(backend=backend)
+        manager.connection, manager.cursor = connection, cursor
+        wlasl_data = manager.parse_wlasl_json(json_path)
+        if wlasl_data is None:
+            return False
+
+        start = time.perf_counter()
+        if not manager.insert_words_and_videos(wlasl_data):
+            log_processing(cursor, None, "failed", time.perf_counter() - start, stage=INGEST_STAGE)
+            connection.commit()
+            return False
+        log_processing(cursor, None, "success", time.perf_counter() - start, stage=INGEST_STAGE)
+        connection.commit()
+        return True
+    finally:
+        backend.close(connection, cursor)
+
+
+def ensure_stage_column(backend):
+    """Ajouter processing_logs.stage aux bases créées avant l'orchestrateur"""
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        try:
+            cursor.execute("SELECT stage FROM processing_logs WHERE 1 = 0")
+            cursor.fetchall()
+        except backend.Error:
+            connection.rollback()
+            print("🔧 Ajout de la colonne processing_logs.stage")
+            cursor.execute("ALTER TABLE processing_logs ADD COLUMN stage VARCHAR(20) DEFAULT 'processing'")
+            connection.commit()
+    finally:
+        backend.close(connection, cursor)
+
+
+def landmarks_has_video_id(backend):
+    """Vrai si landmarks a une colonne video_id (table partitionnée par partition_maintenance.py)"""
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        cursor.execute("SELECT video_id FROM landmarks WHERE 1 = 0")
+        cursor.fetchall()
+        return True
+    except backend.Error:
+        connection.rollback()
+        return False
+    finally:
+        backend.close(connection, cursor)
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def _parse_workers(values):
+    workers = {}
+    for value in values or []:
+        name, _, count = value.partition("=")
+        workers[name] = int(count)
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline ingest → download → extract → export avec reprise")
+    parser.add_argument("--json", help="WLASL_v0.3.json (lance l'étape ingest si elle n'est pas faite)")
+    parser.add_argument("--stages", nargs="+", default=["download", "extract", "export"],
+                        choices=["download", "extract", "export"])
+    parser.add_argument("--workers", nargs="+", metavar="ÉTAPE=N",
+                        help="Threads par étape (défaut download=8 extract=2 export=2)")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--limit", type=int, help="Nombre maximal de vidéos")
+    parser.add_argument("--video-dir", default="videos")
+    parser.add_argument("--export-dir", default="exports")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout HTTP (s)")
+    parser.add_argument("--num-frames", type=int, default=30)
+    parser.add_argument("--num-landmarks", type=int, default=63)
+    parser.add_argument("--streams", nargs="+", help="Flux de landmarks exportés (voir landmark_dataset)")
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  PIPELINE ASL")
+    print("=" * 70)
+
+    backend = get_backend(password=args.password)
+    print(f"✅ {backend.describe()}")
+    ensure_stage_column(backend)
+    ensure_availability_columns(backend)
+
+    if args.json and not run_ingest(backend, args.json):
+        print("❌ Ingestion échouée, pipeline arrêté")
+        return
+
+    config = {
+        "video_dir": args.video_dir,
+        "export_dir": args.export_dir,
+        "timeout": args.timeout,
+        "num_frames": args.num_frames,
+        "num_landmarks": args.num_landmarks,
+        "streams": args.streams,
+        "landmarks_video_id": landmarks_has_video_id(backend),
+    }
+    orchestrator = PipelineOrchestrator(
+        backend, default_stages(_parse_workers(args.workers)), config,
+        enabled=args.stages, queue_size=args.queue_size, max_attempts=args.max_attempts
+    )
+    start = time.perf_counter()
+    counts = orchestrator.run(limit=args.limit)
+
+    print(f"\n📊 RÉSULTATS ({time.perf_counter() - start:.1f}s)")
+    print("-" * 70)
+    for name, count in counts.items():
+        print(f"   {name:<10} ✅ {count['success']:<8} ❌ {count['failed']}")
+    REGISTRY.summary()
+
+
+if __name__ == "__main__":
+    main()
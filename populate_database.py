@@ -4,17 +4,58 @@ SCRIPT D'INGESTION DE DONNÉES WLASL VERS MySQL
 Personne 1 : Base de données & Ingestion
 ================================================================================
 Ce script parse le fichier WLASL_v0.3.json et insère les données dans MySQL
+(ou dans un backend embarqué SQLite/DuckDB, voir db_backend.py)
 """
 
-import mysql.connector
-from mysql.connector import Error
 import json
 import os
 from datetime import datetime
 import random
 
+from db_backend import MySQLBackend, get_backend
+from metrics import REGISTRY
+from video_availability import AVAILABLE, AvailabilityIndex
+
+
+def prepare_video_row(gloss, idx, instance):
+    """
+    Préparer les colonnes d'une vidéo à partir d'une instance WLASL
+    
+    Args:
+        gloss: Mot auquel appartient l'instance
+        idx: Position de l'instance dans la liste du mot
+        instance: Dictionnaire de l'instance (video_id, url, fps, ...)
+    
+    Returns:
+        Tuple (video_id, url, duration, fps, signer_id, split)
+    """
+    video_id = instance.get('video_id', f"{gloss}_{idx}")
+    url = instance.get('url', '')
+    fps = instance.get('fps')
+    frame_start = instance.get('frame_start')
+    frame_end = instance.get('frame_end')
+    signer_id = instance.get('signer_id')
+    
+    # Calculer la durée estimée si possible
+    duration = None
+    if fps and frame_start is not None and frame_end is not None:
+        duration = (frame_end - frame_start) / fps
+    
+    # Assigner aléatoirement à train/val/test (70/15/15)
+    rand = random.random()
+    if rand < 0.70:
+        split = 'train'
+    elif rand < 0.85:
+        split = 'val'
+    else:
+        split = 'test'
+    
+    return video_id, url, duration, fps, signer_id, split
+
+
 class WLASLDatabaseManager:
-    def __init__(self, host="localhost", user="root", password="", database="asl_recognition"):
+    def __init__(self, host="localhost", user="root", password="", database="asl_recognition", backend=None,
+                 availability=None):
         """
         Initialiser la connexion à MySQL
         
@@ -23,39 +64,39 @@ class WLASLDatabaseManager:
             user: Utilisateur MySQL (par défaut root)
             password: Mot de passe MySQL
             database: Nom de la base de données
+            backend: Backend de stockage (db_backend.StorageBackend). Par
+                défaut, MySQL avec les paramètres ci-dessus.
+            availability: Index des vidéos indisponibles
+                (video_availability.AvailabilityIndex). Par défaut,
+                database/missing.txt.
         """
         self.host = host
         self.user = user
         self.password = password
         self.database = database
+        self.backend = backend or MySQLBackend(host=host, user=user, password=password, database=database)
+        self.availability = availability or AvailabilityIndex.load()
         self.connection = None
         self.cursor = None
         
     def connect(self):
-        """Établir la connexion à MySQL"""
+        """Établir la connexion à la base"""
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
-            
-            if self.connection.is_connected():
-                self.cursor = self.connection.cursor()
-                print(f"✅ Connecté à MySQL - Base: {self.database}")
-                return True
+            self.connection = self.backend.connect()
+            self.cursor = self.backend.cursor(self.connection)
+            print(f"✅ Connecté à {self.backend.describe()}")
+            return True
                 
-        except Error as e:
-            print(f"❌ Erreur de connexion MySQL: {e}")
+        except self.backend.Error as e:
+            print(f"❌ Erreur de connexion: {e}")
             return False
     
     def close(self):
         """Fermer la connexion"""
-        if self.connection and self.connection.is_connected():
-            self.cursor.close()
-            self.connection.close()
-            print("✅ Connexion MySQL fermée")
+        if self.connection:
+            self.backend.close(self.connection, self.cursor)
+            self.connection = None
+            print("✅ Connexion fermée")
     
     def parse_wlasl_json(self, json_file_path):
         """
@@ -90,16 +131,28 @@ class WLASLDatabaseManager:
         """
         Insérer les mots et vidéos dans la base de données
         
+        Reprise possible après une interruption: les mots sont upsertés et
+        les vidéos dont le video_id est déjà en base (lots déjà validés
+        d'une exécution précédente) sont ignorées.
+        
         Args:
             wlasl_data: Données parsées du JSON WLASL
+        
+        Returns:
+            True si l'insertion a réussi, False sinon
         """
-        print(f"\n📊 Insertion des données dans MySQL...")
+        print(f"\n📊 Insertion des données dans la base...")
         
         total_words = 0
         total_videos = 0
+        total_unavailable = 0
         skipped_words = 0
+        skipped_videos = 0
         
         try:
+            self.cursor.execute("SELECT video_id FROM videos")
+            existing_videos = {row[0] for row in self.cursor.fetchall()}
+            
             for entry in wlasl_data:
                 gloss = entry.get('gloss')
                 instances = entry.get('instances', [])
@@ -109,83 +162,73 @@ class WLASLDatabaseManager:
                     skipped_words += 1
                     continue
                 
-                # Insérer le mot dans la table words
-                insert_word_query = """
-                    INSERT INTO words (gloss, sample_count) 
-                    VALUES (%s, %s)
-                    ON DUPLICATE KEY UPDATE sample_count = %s
-                """
-                
+                # Insérer le mot dans la table words (ou récupérer son ID s'il existe déjà)
                 sample_count = len(instances)
-                self.cursor.execute(insert_word_query, (gloss, sample_count, sample_count))
-                word_id = self.cursor.lastrowid
-                
-                # Si le mot existait déjà, récupérer son ID
-                if word_id == 0:
-                    self.cursor.execute("SELECT id FROM words WHERE gloss = %s", (gloss,))
-                    word_id = self.cursor.fetchone()[0]
+                with REGISTRY.timer("db_round_trip_seconds", op="upsert_word"):
+                    word_id = self.backend.upsert_word(self.cursor, gloss, sample_count)
                 
                 total_words += 1
+                REGISTRY.inc("words_inserted_total")
                 
                 # Insérer les vidéos pour ce mot
                 for idx, instance in enumerate(instances):
-                    video_id = instance.get('video_id', f"{gloss}_{idx}")
-                    url = instance.get('url', '')
-                    fps = instance.get('fps')
-                    frame_start = instance.get('frame_start')
-                    frame_end = instance.get('frame_end')
-                    signer_id = instance.get('signer_id')
-                    
-                    # Calculer la durée estimée si possible
-                    duration = None
-                    if fps and frame_start is not None and frame_end is not None:
-                        duration = (frame_end - frame_start) / fps
-                    
-                    # Assigner aléatoirement à train/val/test (70/15/15)
-                    rand = random.random()
-                    if rand < 0.70:
-                        split = 'train'
-                    elif rand < 0.85:
-                        split = 'val'
-                    else:
-                        split = 'test'
+                    video_id, url, duration, fps, signer_id, split = prepare_video_row(gloss, idx, instance)
+                    if video_id in existing_videos:
+                        skipped_videos += 1
+                        continue
+                    # Vidéos connues comme indisponibles: marquées dès l'insertion
+                    availability, next_probe_at = self.availability.initial_columns(video_id)
                     
                     insert_video_query = """
                         INSERT INTO videos 
-                        (word_id, video_id, video_url, duration_sec, fps, signer_id, split, downloaded, processed)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        (word_id, video_id, video_url, duration_sec, fps, signer_id, split, downloaded, processed,
+                         availability, next_probe_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     """
                     
-                    self.cursor.execute(insert_video_query, (
-                        word_id, 
-                        video_id, 
-                        url, 
-                        duration, 
-                        fps, 
-                        signer_id, 
-                        split, 
-                        False, 
-                        False
-                    ))
+                    with REGISTRY.timer("db_round_trip_seconds", op="insert_video"):
+                        self.cursor.execute(insert_video_query, (
+                            word_id, 
+                            video_id, 
+                            url, 
+                            duration, 
+                            fps, 
+                            signer_id, 
+                            split, 
+                            False, 
+                            False,
+                            availability,
+                            next_probe_at
+                        ))
                     
                     total_videos += 1
+                    if availability != AVAILABLE:
+                        total_unavailable += 1
+                    REGISTRY.inc("videos_inserted_total")
                 
                 # Commit tous les 100 mots pour éviter les transactions trop longues
                 if total_words % 100 == 0:
-                    self.connection.commit()
+                    with REGISTRY.timer("batch_commit_seconds"):
+                        self.connection.commit()
                     print(f"   Progression: {total_words} mots, {total_videos} vidéos insérées...")
             
             # Commit final
-            self.connection.commit()
+            with REGISTRY.timer("batch_commit_seconds"):
+                self.connection.commit()
             
             print(f"\n✅ Insertion terminée!")
             print(f"   Mots insérés: {total_words}")
             print(f"   Mots ignorés (sans vidéos): {skipped_words}")
             print(f"   Vidéos insérées: {total_videos}")
+            print(f"   Vidéos déjà présentes (ignorées): {skipped_videos}")
+            print(f"   Vidéos marquées indisponibles (missing.txt): {total_unavailable}")
+            return True
             
-        except Error as e:
+        except self.backend.Error as e:
+            REGISTRY.inc("ingestion_errors_total")
             print(f"❌ Erreur lors de l'insertion: {e}")
             self.connection.rollback()
+            return False
     
     def get_database_statistics(self):
         """Afficher les statistiques de la base de données"""
@@ -238,7 +281,7 @@ class WLASLDatabaseManager:
             
             print("=" * 60)
             
-        except Error as e:
+        except self.backend.Error as e:
             print(f"❌ Erreur lors de la récupération des statistiques: {e}")
     
     def export_connection_info(self, output_file="db_connection_info.txt"):
@@ -314,18 +357,31 @@ def main():
     MYSQL_PASSWORD = "1234"  # METTEZ VOTRE MOT DE PASSE ICI
     MYSQL_DATABASE = "asl_recognition"
     WLASL_JSON_PATH = "database/WLASL_v0.3.json"  # Chemin vers votre fichier JSON
+    # Backend: "mysql" (par défaut), "sqlite" ou "duckdb" (sans serveur)
+    DB_BACKEND = os.environ.get("ASL_DB_BACKEND", "mysql")
+    # Export des métriques (.prom: format Prometheus, sinon JSON lines)
+    METRICS_FILE = os.environ.get("ASL_METRICS_FILE")
+    
+    backend = get_backend(
+        DB_BACKEND,
+        host=MYSQL_HOST,
+        user=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        database=MYSQL_DATABASE
+    )
     
     # Créer l'instance du gestionnaire
     db_manager = WLASLDatabaseManager(
         host=MYSQL_HOST,
         user=MYSQL_USER,
         password=MYSQL_PASSWORD,
-        database=MYSQL_DATABASE
+        database=MYSQL_DATABASE,
+        backend=backend
     )
     
     # Étape 1: Connexion
     if not db_manager.connect():
-        print("❌ Impossible de se connecter à MySQL. Vérifiez vos paramètres.")
+        print("❌ Impossible de se connecter à la base. Vérifiez vos paramètres.")
         return
     
     # Étape 2: Parser le JSON
@@ -335,7 +391,12 @@ def main():
         return
     
     # Étape 3: Insérer les données
-    db_manager.insert_words_and_videos(wlasl_data)
+    with REGISTRY.timer("stage_seconds", stage="ingest"):
+        db_manager.insert_words_and_videos(wlasl_data)
+    REGISTRY.summary()
+    if METRICS_FILE:
+        REGISTRY.export(METRICS_FILE)
+        print(f"   Métriques exportées vers: {METRICS_FILE}")
     
     # Étape 4: Afficher les statistiques
     db_manager.get_database_statistics()
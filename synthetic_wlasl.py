@@ -0,0 +1,121 @@
+"""
+================================================================================
+GÉNÉRATEUR DE DONNÉES WLASL SYNTHÉTIQUES
+================================================================================
+Produit des métadonnées au format WLASL_v0.3.json (liste de
+{gloss, instances: [...]}) à une échelle configurable, ainsi que des
+séquences de landmarks synthétiques, pour les benchmarks hors ligne.
+
+Échelle 1 = la taille du dump 2000 glosses (≈ 21 000 vidéos, 2000 mots);
+échelle 10 ou 100 multiplie le nombre de mots en gardant la même
+distribution (très déséquilibrée) du nombre de vidéos par mot.
+"""
+
+import json
+import random
+
+CLASS_LIST_FILE = "database/wlasl_class_list.txt"
+NUM_GLOSSES = 2000
+NUM_SIGNERS = 120
+
+
+def load_glosses(class_list_file=CLASS_LIST_FILE):
+    """Lire les glosses de wlasl_class_list.txt (index<TAB>gloss)"""
+    glosses = []
+    with open(class_list_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) == 2:
+                glosses.append(parts[1])
+    return glosses
+
+
+def _sample_count(rng):
+    """Nombre de vidéos d'un mot: quelques-unes pour la plupart, des dizaines pour les plus fréquents"""
+    return max(1, min(40, int(rng.paretovariate(1.8) * 6)))
+
+
+def generate_wlasl_data(scale=1, seed=0, class_list_file=CLASS_LIST_FILE):
+    """
+    Générer des métadonnées au format WLASL_v0.3.json
+
+    Args:
+        scale: Multiple de la taille du dump 2000 glosses (1, 10, 100...)
+        seed: Graine aléatoire (résultats reproductibles)
+        class_list_file: Source des vrais glosses (complétés par gloss_<n>)
+
+    Returns:
+        Liste de dictionnaires {gloss, instances}
+    """
+    rng = random.Random(seed)
+    try:
+        base_glosses = load_glosses(class_list_file)
+    except FileNotFoundError:
+        base_glosses = []
+
+    num_words = int(NUM_GLOSSES * scale)
+    data = []
+    video_counter = 0
+    for i in range(num_words):
+        gloss = base_glosses[i] if i < len(base_glosses) else f"gloss_{i}"
+        instances = []
+        for _ in range(_sample_count(rng)):
+            video_counter += 1
+            frame_start = 1
+            frame_end = frame_start + rng.randint(30, 200)
+            instances.append({
+                "video_id": f"{video_counter:07d}",
+                "url": f"https://example.invalid/wlasl/{video_counter:07d}.mp4",
+                "fps": 25,
+                "frame_start": frame_start,
+                "frame_end": frame_end,
+                "signer_id": rng.randrange(NUM_SIGNERS),
+                "split": rng.choice(("train", "train", "train", "val", "test")),
+                "bbox": [0, 0, 256, 256],
+            })
+        data.append({"gloss": gloss, "instances": instances})
+    return data
+
+
+def generate_landmark_sequences(num_videos, num_frames=30, num_landmarks=63, seed=0):
+    """
+    Générer des séquences de landmarks (marche aléatoire lissée)
+
+    Returns:
+        np.ndarray float32 de forme (num_videos, num_frames, num_landmarks)
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(0.2, 0.8, size=(num_videos, 1, num_landmarks))
+    steps = rng.normal(0.0, 0.01, size=(num_videos, num_frames, num_landmarks))
+    return (start + np.cumsum(steps, axis=1)).astype(np.float32)
+
+
+def insert_synthetic_landmarks(connection, cursor, video_ids, frames_per_video=40, num_landmarks=63, seed=0):
+    """
+    Insérer des frames et landmarks synthétiques pour des vidéos existantes
+
+    Args:
+        connection: Connexion à la base
+        cursor: Curseur (paramètres %s)
+        video_ids: Liste de videos.id
+        frames_per_video: Nombre de frames par vidéo
+        num_landmarks: Nombre de valeurs par frame
+    """
+    sequences = generate_landmark_sequences(len(video_ids), frames_per_video, num_landmarks, seed)
+    for video_id, sequence in zip(video_ids, sequences):
+        cursor.executemany(
+            "INSERT INTO frames (video_id, frame_number, timestamp_sec) VALUES (%s, %s, %s)",
+            [(video_id, n, n / 25.0) for n in range(frames_per_video)]
+        )
+        cursor.execute(
+            "SELECT id FROM frames WHERE video_id = %s ORDER BY frame_number", (video_id,)
+        )
+        frame_ids = [row[0] for row in cursor.fetchall()]
+        cursor.executemany(
+            "INSERT INTO landmarks (frame_id, landmark_data, num_hands) VALUES (%s, %s, %s)",
+            [(frame_id, json.dumps(values.round(4).tolist()), 1)
+             for frame_id, values in zip(frame_ids, sequence)]
+        )
+    connection.commit()
@@ -0,0 +1,331 @@
+"""
+================================================================================
+INDEX DE DISPONIBILITÉ DES VIDÉOS (missing.txt + URLs mortes)
+================================================================================
+Environ 9 000 vidéos WLASL ne sont plus téléchargeables (database/missing.txt).
+Ce module évite de leur donner des créneaux de téléchargement:
+
+  - videos.availability: 'available', 'missing' (listée dans missing.txt)
+    ou 'unreachable' (échec de téléchargement définitif: 404, 410, DNS...)
+  - marquage dès l'ingestion (populate_database, fast_bootstrap) à partir
+    de l'index en mémoire (set des video_id WLASL)
+  - toutes les requêtes de travail en attente (vue videos_to_download,
+    get_videos_to_download, pipeline_orchestrator) ignorent ces vidéos
+  - re-vérification périodique: une vidéo indisponible est re-sondée
+    (requête HEAD) à videos.next_probe_at, avec un délai doublé à chaque
+    échec (probe_attempts), de BASE_PROBE_DELAY jusqu'à MAX_PROBE_DELAY
+
+Usage:
+    python video_availability.py mark      # appliquer missing.txt à une base existante
+    python video_availability.py probe --limit 500 --workers 32
+    python video_availability.py stats
+"""
+
+import argparse
+import os
+import socket
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from db_backend import get_backend, parse_sql_commands, table_columns
+
+MISSING_FILE = "database/missing.txt"
+
+AVAILABLE = "available"
+MISSING = "missing"
+UNREACHABLE = "unreachable"
+
+BASE_PROBE_DELAY = timedelta(days=1)
+MAX_PROBE_DELAY = timedelta(days=60)
+
+# Codes HTTP considérés comme définitifs (les autres échecs sont retentés normalement)
+DEAD_HTTP_CODES = {401, 403, 404, 410, 451}
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Colonnes ajoutées aux bases existantes: mêmes types que dans le schéma de
+# chaque backend (ENUM sur MySQL), plus l'index des re-vérifications
+_STATUS_VALUES = f"'{AVAILABLE}', '{MISSING}', '{UNREACHABLE}'"
+AVAILABILITY_MIGRATION = {
+    "mysql": [
+        f"ALTER TABLE videos ADD COLUMN availability ENUM({_STATUS_VALUES}) DEFAULT '{AVAILABLE}'",
+        "ALTER TABLE videos ADD COLUMN probe_attempts INT DEFAULT 0",
+        "ALTER TABLE videos ADD COLUMN next_probe_at DATETIME NULL",
+        "CREATE INDEX idx_availability ON videos (availability, next_probe_at)",
+    ],
+    "sqlite": [
+        f"ALTER TABLE videos ADD COLUMN availability TEXT DEFAULT '{AVAILABLE}' "
+        f"CHECK (availability IN ({_STATUS_VALUES}))",
+        "ALTER TABLE videos ADD COLUMN probe_attempts INTEGER DEFAULT 0",
+        "ALTER TABLE videos ADD COLUMN next_probe_at TIMESTAMP NULL",
+        "CREATE INDEX IF NOT EXISTS idx_videos_availability ON videos (availability, next_probe_at)",
+    ],
+    # Pas d'index secondaire ni de CHECK ajouté après coup sur DuckDB (voir schema_duckdb.sql)
+    "duckdb": [
+        f"ALTER TABLE videos ADD COLUMN availability VARCHAR DEFAULT '{AVAILABLE}'",
+        "ALTER TABLE videos ADD COLUMN probe_attempts INTEGER DEFAULT 0",
+        "ALTER TABLE videos ADD COLUMN next_probe_at TIMESTAMP",
+    ],
+}
+
+
+def backoff_delay(attempts, base=BASE_PROBE_DELAY, maximum=MAX_PROBE_DELAY):
+    """Délai avant la prochaine vérification après `attempts` échecs"""
+    return min(base * (2 ** attempts), maximum)
+
+
+def next_probe_time(attempts, now=None):
+    """Date de la prochaine vérification, au format accepté par les trois backends"""
+    now = now or datetime.now()
+    return (now + backoff_delay(attempts)).strftime(TIMESTAMP_FORMAT)
+
+
+class AvailabilityIndex:
+    def __init__(self, missing=(), unreachable=()):
+        """
+        Ensemble des video_id WLASL indisponibles
+
+        Args:
+            missing: video_id listés dans missing.txt
+            unreachable: video_id dont le téléchargement a échoué définitivement
+        """
+        self.missing = set(missing)
+        self.unreachable = set(unreachable)
+
+    @classmethod
+    def load(cls, missing_file=MISSING_FILE, cursor=None):
+        """
+        Charger missing.txt (un video_id par ligne) et, si un curseur est
+        fourni, les vidéos déjà marquées 'unreachable' dans la base
+        """
+        missing = set()
+        if os.path.exists(missing_file):
+            with open(missing_file, 'r', encoding='utf-8') as f:
+                missing = {line.strip() for line in f if line.strip()}
+
+        unreachable = set()
+        if cursor is not None:
+            cursor.execute("SELECT video_id FROM videos WHERE availability = %s", (UNREACHABLE,))
+            unreachable = {row[0] for row in cursor.fetchall()}
+        return cls(missing, unreachable)
+
+    def __contains__(self, video_id):
+        return video_id in self.missing or video_id in self.unreachable
+
+    def __len__(self):
+        return len(self.missing | self.unreachable)
+
+    def status(self, video_id):
+        """Valeur de videos.availability pour un video_id WLASL"""
+        if video_id in self.unreachable:
+            return UNREACHABLE
+        if video_id in self.missing:
+            return MISSING
+        return AVAILABLE
+
+    def initial_columns(self, video_id, now=None):
+        """(availability, next_probe_at) à l'insertion d'une vidéo"""
+        status = self.status(video_id)
+        if status == AVAILABLE:
+            return status, None
+        return status, next_probe_time(0, now)
+
+
+# =============================================================================
+# ÉCHECS ET RE-VÉRIFICATION
+# =============================================================================
+
+def is_dead_url_error(error):
+    """Vrai si l'erreur de téléchargement indique une URL morte (pas un échec passager)"""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in DEAD_HTTP_CODES
+    if isinstance(error, urllib.error.URLError):
+        return isinstance(error.reason, (socket.gaierror, ConnectionRefusedError))
+    return False
+
+
+def mark_unreachable(cursor, video_pk, now=None):
+    """
+    Marquer une vidéo (videos.id) comme injoignable et planifier sa re-vérification
+
+    Le commit reste à la charge de l'appelant.
+    """
+    cursor.execute("SELECT probe_attempts FROM videos WHERE id = %s", (video_pk,))
+    row = cursor.fetchone()
+    attempts = (row[0] or 0) if row else 0
+    cursor.execute("""
+        UPDATE videos
+        SET availability = %s, probe_attempts = %s, next_probe_at = %s
+        WHERE id = %s
+    """, (UNREACHABLE, attempts + 1, next_probe_time(attempts, now), video_pk))
+
+
+def probe_url(url, timeout=10.0):
+    """Vérifier qu'une URL répond (HEAD, puis GET du premier octet si HEAD est refusé)"""
+    for method, headers in (("HEAD", {}), ("GET", {"Range": "bytes=0-0"})):
+        request = urllib.request.Request(url, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.status < 400
+        except urllib.error.HTTPError as e:
+            if e.code not in (405, 501):
+                return False
+        except (urllib.error.URLError, OSError):
+            return False
+    return False
+
+
+def reprobe_due(backend, limit=500, workers=32, timeout=10.0, now=None):
+    """
+    Re-sonder les vidéos indisponibles dont next_probe_at est passé
+
+    Les requêtes HTTP sont faites en parallèle; les mises à jour sont faites
+    ensuite sur une seule connexion.
+
+    Returns:
+        (nombre de vidéos redevenues disponibles, nombre toujours indisponibles)
+    """
+    now = now or datetime.now()
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        cursor.execute(f"""
+            SELECT id, video_url, probe_attempts
+            FROM videos
+            WHERE availability <> %s
+              AND (next_probe_at IS NULL OR next_probe_at <= %s)
+              AND video_url IS NOT NULL AND video_url <> ''
+            ORDER BY next_probe_at
+            LIMIT {int(limit)}
+        """, (AVAILABLE, now.strftime(TIMESTAMP_FORMAT)))
+        due = cursor.fetchall()
+        print(f"🔎 {len(due)} vidéos à re-vérifier")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            alive = list(executor.map(lambda row: probe_url(row[1], timeout), due))
+
+        revived = 0
+        for (video_pk, _, attempts), ok in zip(due, alive):
+            if ok:
+                revived += 1
+                cursor.execute("""
+                    UPDATE videos
+                    SET availability = %s, probe_attempts = 0, next_probe_at = NULL
+                    WHERE id = %s
+                """, (AVAILABLE, video_pk))
+            else:
+                attempts = attempts or 0
+                cursor.execute("""
+                    UPDATE videos SET probe_attempts = %s, next_probe_at = %s WHERE id = %s
+                """, (attempts + 1, next_probe_time(attempts, now), video_pk))
+        connection.commit()
+        return revived, len(due) - revived
+    finally:
+        backend.close(connection, cursor)
+
+
+# =============================================================================
+# BASES EXISTANTES
+# =============================================================================
+
+def ensure_availability_columns(backend):
+    """
+    Ajouter availability / probe_attempts / next_probe_at aux bases créées
+    avant ce module, et recréer la vue videos_to_download
+    """
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        if "availability" in table_columns(cursor, "videos"):
+            return False
+
+        print("🔧 Ajout des colonnes de disponibilité à videos")
+        for statement in AVAILABILITY_MIGRATION[backend.name]:
+            cursor.execute(statement)
+
+        with open(backend.schema_file, 'r', encoding='utf-8') as f:
+            view = next(c for c in parse_sql_commands(f.read()) if "VIEW" in c and "videos_to_download" in c)
+        cursor.execute("DROP VIEW IF EXISTS videos_to_download")
+        cursor.execute(view)
+        connection.commit()
+        return True
+    finally:
+        backend.close(connection, cursor)
+
+
+def apply_missing_list(backend, index, chunk_size=1000, now=None):
+    """
+    Marquer 'missing' les vidéos encore 'available' et non téléchargées
+    dont le video_id est dans missing.txt
+
+    Returns:
+        Nombre de vidéos marquées
+    """
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    next_probe_at = next_probe_time(0, now)
+    marked = 0
+    try:
+        video_ids = sorted(index.missing)
+        for start in range(0, len(video_ids), chunk_size):
+            chunk = video_ids[start:start + chunk_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"""
+                UPDATE videos
+                SET availability = %s, next_probe_at = %s
+                WHERE availability = %s AND downloaded = FALSE AND video_id IN ({placeholders})
+            """, (MISSING, next_probe_at, AVAILABLE) + tuple(chunk))
+            marked += cursor.rowcount
+        connection.commit()
+        return marked
+    finally:
+        backend.close(connection, cursor)
+
+
+def show_availability_stats(backend):
+    connection = backend.connect()
+    cursor = backend.cursor(connection)
+    try:
+        cursor.execute("""
+            SELECT availability, COUNT(*), SUM(CASE WHEN downloaded THEN 1 ELSE 0 END)
+            FROM videos
+            GROUP BY availability
+            ORDER BY availability
+        """)
+        print(f"\n📊 DISPONIBILITÉ DES VIDÉOS:")
+        print("-" * 50)
+        for availability, count, downloaded in cursor.fetchall():
+            print(f"   {availability:<15} {count:>8} vidéos ({downloaded or 0} téléchargées)")
+    finally:
+        backend.close(connection, cursor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index de disponibilité des vidéos WLASL")
+    parser.add_argument("command", choices=["mark", "probe", "stats"])
+    parser.add_argument("--missing-file", default=MISSING_FILE)
+    parser.add_argument("--limit", type=int, default=500, help="Vidéos re-sondées par exécution")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--password", default=os.environ.get("MYSQL_PASSWORD", ""))
+    args = parser.parse_args()
+
+    backend = get_backend(password=args.password)
+    print(f"✅ {backend.describe()}")
+    ensure_availability_columns(backend)
+
+    if args.command == "mark":
+        index = AvailabilityIndex.load(args.missing_file)
+        print(f"📄 {len(index.missing)} video_id dans {args.missing_file}")
+        print(f"✅ {apply_missing_list(backend, index)} vidéos marquées 'missing'")
+    elif args.command == "probe":
+        revived, still_dead = reprobe_due(backend, args.limit, args.workers, args.timeout)
+        print(f"✅ {revived} vidéos de nouveau disponibles, {still_dead} toujours indisponibles")
+
+    show_availability_stats(backend)
+
+
+if __name__ == "__main__":
+    main()